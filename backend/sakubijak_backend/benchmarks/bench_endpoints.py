@@ -0,0 +1,160 @@
+"""
+Benchmark per endpoint pada aplikasi lengkap (semua tween, renderer dan
+autentikasi JWT aktif). Setiap benchmark juga memeriksa status respons agar
+angka dari respons error tidak ikut terukur.
+"""
+import datetime
+import itertools
+
+from sakubijak_backend.views.api_dashboard import closed_month_cache, summary_cache
+
+from conftest import BENCH_PASSWORD
+
+_unique = itertools.count()
+
+
+def new_transaction_payload(auth):
+    return {
+        'description': 'Kopi',
+        'amount': '18000',
+        'date': '2024-06-15',
+        'category_id': str(auth['category_id']),
+    }
+
+
+# --- Autentikasi -----------------------------------------------------------
+
+def test_login(benchmark, app, auth):
+    payload = {'email': auth['email'], 'password': BENCH_PASSWORD}
+    response = benchmark(app.post_json, '/api/auth/login', payload)
+    assert response.status_int == 200
+
+
+def test_register(benchmark, app):
+    def register():
+        n = next(_unique)
+        return app.post_json('/api/auth/register', {
+            'name': f'Baru {n}', 'email': f'baru{n}@example.com', 'password': BENCH_PASSWORD,
+        })
+    response = benchmark(register)
+    assert response.status_int == 201
+
+
+def test_users_me(benchmark, app, auth):
+    response = benchmark(app.get, '/api/users/me', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+# --- Kategori --------------------------------------------------------------
+
+def test_categories_list(benchmark, app, auth):
+    response = benchmark(app.get, '/api/categories', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_category_detail(benchmark, app, auth):
+    response = benchmark(app.get, f"/api/categories/{auth['category_id']}", headers=auth['headers'])
+    assert response.status_int == 200
+
+
+# --- Transaksi -------------------------------------------------------------
+
+def test_transactions_list(benchmark, app, auth):
+    response = benchmark(app.get, '/api/transactions', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_transactions_list_page(benchmark, app, auth):
+    response = benchmark(app.get, '/api/transactions?limit=50', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_transactions_search(benchmark, app, auth):
+    response = benchmark(app.get, '/api/transactions?q=makan&limit=50', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_transaction_detail(benchmark, app, auth):
+    response = benchmark(app.get, f"/api/transactions/{auth['transaction_id']}", headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_transaction_create(benchmark, app, auth):
+    payload = new_transaction_payload(auth)
+    response = benchmark(app.post_json, '/api/transactions', payload, headers=auth['headers'])
+    assert response.status_int == 201
+
+
+def test_transaction_update(benchmark, app, auth):
+    url = f"/api/transactions/{auth['transaction_id']}"
+    response = benchmark(app.put_json, url, {'description': 'Diperbarui'}, headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_transaction_delete(benchmark, app, auth):
+    def setup():
+        created = app.post_json('/api/transactions', new_transaction_payload(auth), headers=auth['headers'])
+        return (f"/api/transactions/{created.json['transaction']['id']}",), {'headers': auth['headers']}
+
+    response = benchmark.pedantic(app.delete, setup=setup, rounds=50)
+    assert response.status_int == 204
+
+
+def test_transactions_batch(benchmark, app, auth):
+    payload = [new_transaction_payload(auth) for _ in range(50)]
+    response = benchmark(app.post_json, '/api/transactions/batch', payload, headers=auth['headers'])
+    assert response.status_int == 201
+
+
+def test_transactions_export(benchmark, app, auth):
+    response = benchmark(app.get, '/api/transactions/export?format=ndjson', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+# --- Dashboard -------------------------------------------------------------
+
+def test_analytics_timeseries_daily(benchmark, app, auth):
+    url = '/api/analytics/timeseries?bucket=day&from=2024-01-01&to=2024-12-31'
+    response = benchmark(app.get, url, headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_dashboard_cold(benchmark, app, auth):
+    # Cache ringkasan dikosongkan setiap putaran: mengukur query agregat penuh
+    response = benchmark.pedantic(
+        app.get, args=('/api/dashboard/summary',), kwargs={'headers': auth['headers']},
+        setup=summary_cache.clear, rounds=100,
+    )
+    assert response.status_int == 200
+
+
+def test_dashboard_warm(benchmark, app, auth):
+    response = benchmark(app.get, '/api/dashboard/summary', headers=auth['headers'])
+    assert response.status_int == 200
+
+
+def test_dashboard_not_modified(benchmark, app, auth):
+    etag = app.get('/api/dashboard/summary', headers=auth['headers']).headers['ETag']
+    headers = dict(auth['headers'], **{'If-None-Match': etag})
+    response = benchmark(app.get, '/api/dashboard/summary', headers=headers, status=304)
+    assert response.status_int == 304
+
+
+def previous_month_url():
+    last_month = datetime.date.today().replace(day=1) - datetime.timedelta(days=1)
+    return f"/api/dashboard/summary?month={last_month.strftime('%Y-%m')}"
+
+
+def test_dashboard_closed_month_cold(benchmark, app, auth):
+    # Bulan lalu tanpa cache: query agregat rollup untuk bulan tersebut
+    response = benchmark.pedantic(
+        app.get, args=(previous_month_url(),), kwargs={'headers': auth['headers']},
+        setup=closed_month_cache.clear, rounds=100,
+    )
+    assert response.status_int == 200
+
+
+def test_dashboard_closed_month_warm(benchmark, app, auth):
+    # Body dari closed_month_cache; hanya satu query versi bulan
+    response = benchmark(app.get, previous_month_url(), headers=auth['headers'])
+    assert response.status_int == 200
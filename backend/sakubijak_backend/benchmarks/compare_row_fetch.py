@@ -0,0 +1,153 @@
+"""
+Membandingkan cara lama (instance ORM penuh) dan cara baru (row kolom saja)
+untuk daftar transaksi dan kategori.
+
+Penggunaan:
+    python benchmarks/compare_row_fetch.py [--rows 10000] [--repeat 5]
+
+Untuk setiap varian dicetak median latensi, puncak memori (tracemalloc) dan
+jumlah blok memori yang dialokasikan selama satu kali pengambilan.
+"""
+import argparse
+import datetime
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy.orm import Session
+
+from sakubijak_backend.models import Base, Category, Transaction, User, get_engine
+from sakubijak_backend.views.api_categories import CATEGORY_COLUMNS, category_row_to_dict
+from sakubijak_backend.views.api_transactions import TRANSACTION_COLUMNS, transaction_row_to_dict
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='Jumlah transaksi (dan kategori) yang dibuat')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan untuk median latensi')
+    return parser.parse_args(argv)
+
+
+def seed(engine, rows):
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(name='Bench', email='bench@example.com', hashed_password='x')
+        session.add(user)
+        session.flush()
+        categories = [
+            {'name': f'Kategori {i}', 'description': 'Benchmark', 'user_id': user.id}
+            for i in range(rows)
+        ]
+        session.execute(Category.__table__.insert(), categories)
+        category_ids = session.query(Category.id).filter_by(user_id=user.id).limit(20).all()
+        now = datetime.datetime.utcnow()
+        start = datetime.date(2024, 1, 1)
+        session.execute(Transaction.__table__.insert(), [
+            {
+                'description': f'Transaksi {i}',
+                'amount': (i % 500) + 0.25,
+                'date': start + datetime.timedelta(days=i % 365),
+                'category_id': category_ids[i % len(category_ids)].id,
+                'user_id': user.id,
+                'created_at': now,
+                'updated_at': now,
+            } for i in range(rows)
+        ])
+        session.commit()
+        return user.id
+
+
+def transactions_entities(session, user_id):
+    """Cara lama: Transaction penuh + nama kategori, dikonversi per field."""
+    result = (
+        session.query(Transaction, Category.name.label('category_name'))
+        .outerjoin(Category, Category.id == Transaction.category_id)
+        .filter(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+        .all()
+    )
+    return [
+        {
+            'id': t.id,
+            'description': t.description,
+            'amount': t.amount,
+            'date': t.date,
+            'category_id': t.category_id,
+            'category_name': category_name or "N/A",
+            'user_id': t.user_id,
+            'created_at': t.created_at,
+            'updated_at': t.updated_at,
+        } for t, category_name in result
+    ]
+
+
+def transactions_rows(session, user_id):
+    """Cara baru: hanya kolom yang dikirim, serializer bersama."""
+    result = (
+        session.query(*TRANSACTION_COLUMNS, Category.name.label('category_name'))
+        .outerjoin(Category, Category.id == Transaction.category_id)
+        .filter(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+        .all()
+    )
+    return [transaction_row_to_dict(row) for row in result]
+
+
+def categories_entities(session, user_id):
+    categories = session.query(Category).filter_by(user_id=user_id).order_by(Category.name).all()
+    return [
+        {
+            'id': c.id,
+            'name': c.name,
+            'description': c.description,
+            'created_at': c.created_at,
+            'updated_at': c.updated_at,
+        } for c in categories
+    ]
+
+
+def categories_rows(session, user_id):
+    categories = session.query(*CATEGORY_COLUMNS).filter(Category.user_id == user_id).order_by(Category.name).all()
+    return [category_row_to_dict(row) for row in categories]
+
+
+def measure(engine, fetch, user_id, repeat):
+    timings = []
+    for _ in range(repeat):
+        # Session baru per putaran agar identity map tidak terbawa antar putaran
+        with Session(engine) as session:
+            started = time.perf_counter()
+            fetch(session, user_id)
+            timings.append(time.perf_counter() - started)
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        data = fetch(session, user_id)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    # Blok yang masih hidup setelah fetch (hasil + identity map) dihitung dari selisih snapshot
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return len(data), statistics.median(timings), peak, blocks
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    engine = get_engine({'sqlalchemy.url': 'sqlite://'})
+    user_id = seed(engine, args.rows)
+
+    variants = [
+        ('transactions / entity', transactions_entities),
+        ('transactions / rows', transactions_rows),
+        ('categories / entity', categories_entities),
+        ('categories / rows', categories_rows),
+    ]
+    print(f'{"varian":<24}{"baris":>8}{"median ms":>12}{"peak KiB":>12}{"blok":>10}')
+    for name, fetch in variants:
+        count, median, peak, blocks = measure(engine, fetch, user_id, args.repeat)
+        print(f'{name:<24}{count:>8}{median * 1000:>12.1f}{peak / 1024:>12.0f}{blocks:>10}')
+
+
+if __name__ == '__main__':
+    main()
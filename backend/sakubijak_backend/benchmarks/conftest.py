@@ -0,0 +1,96 @@
+"""
+Fixture benchmark: aplikasi WSGI asli dari ``main()`` di atas database yang
+diisi data sintetis (pengguna x kategori x transaksi) secara deterministik.
+
+Ukuran data diatur lewat opsi pytest (lihat ``pytest --help`` di direktori
+ini) atau environment variable dengan nama yang sama, misalnya
+``SAKUBIJAK_BENCH_TRANSACTIONS=50000``.
+"""
+import os
+
+import pytest
+import transaction
+from webtest import TestApp
+
+from sakubijak_backend import main
+from sakubijak_backend.models import Base, get_engine, get_session_factory, get_tm_session
+from sakubijak_backend.passwords import make_context
+from sakubijak_backend.scripts.seed_db import seed_database, seed_email
+
+BENCH_PASSWORD = 'password123'
+BENCH_SECRET = 'sakubijak-benchmark-secret-key-0123456789'
+
+OPTIONS = [
+    # (opsi, environment variable, default, tipe, bantuan)
+    ('--bench-db-url', 'SAKUBIJAK_BENCH_DB_URL', None, str,
+     'URL database (default: file SQLite sementara). Skema dibuat ulang!'),
+    ('--bench-users', 'SAKUBIJAK_BENCH_USERS', 5, int, 'Jumlah pengguna'),
+    ('--bench-categories', 'SAKUBIJAK_BENCH_CATEGORIES', 8, int, 'Kategori per pengguna'),
+    ('--bench-transactions', 'SAKUBIJAK_BENCH_TRANSACTIONS', 10000, int, 'Total transaksi'),
+    ('--bench-seed', 'SAKUBIJAK_BENCH_SEED', 1, int, 'Seed data sintetis'),
+    ('--bench-bcrypt-rounds', 'SAKUBIJAK_BENCH_BCRYPT_ROUNDS', 10, int, 'Rounds bcrypt untuk login/register'),
+]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('sakubijak', 'Data benchmark SakuBijak')
+    for name, env, default, kind, help_text in OPTIONS:
+        group.addoption(name, type=kind, default=kind(os.environ[env]) if env in os.environ else default,
+                        help=f'{help_text} (env {env}, default {default})')
+
+
+@pytest.fixture(scope='session')
+def bench_settings(pytestconfig, tmp_path_factory):
+    url = pytestconfig.getoption('bench_db_url')
+    if not url:
+        url = f"sqlite:///{tmp_path_factory.mktemp('bench') / 'bench.sqlite'}"
+    rounds = pytestconfig.getoption('bench_bcrypt_rounds')
+    settings = {
+        'sqlalchemy.url': url,
+        'jwt.secret_key': BENCH_SECRET,
+        'jwt.algorithm': 'HS256',
+        'jwt.expiration_delta_seconds': '3600',
+        # Hashing inline agar angka login tidak bergantung pada start-up process pool
+        'auth.hash_workers': '0',
+        'auth.bcrypt_rounds': str(rounds),
+    }
+
+    engine = get_engine(settings)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    dbsession = get_tm_session(get_session_factory(engine), transaction.manager)
+    with transaction.manager:
+        seed_database(
+            dbsession,
+            users=pytestconfig.getoption('bench_users'),
+            transactions=pytestconfig.getoption('bench_transactions'),
+            categories=pytestconfig.getoption('bench_categories'),
+            seed=pytestconfig.getoption('bench_seed'),
+            hashed_password=make_context(rounds).hash(BENCH_PASSWORD),
+        )
+    engine.dispose()
+    return settings
+
+
+@pytest.fixture(scope='session')
+def app(bench_settings):
+    return TestApp(main({}, **bench_settings))
+
+
+@pytest.fixture(scope='session')
+def auth(app, pytestconfig):
+    """
+    Login sebagai pengguna seed pertama; mengembalikan header Authorization
+    beserta satu kategori dan satu transaksi miliknya.
+    """
+    email = seed_email(pytestconfig.getoption('bench_seed'), 0)
+    response = app.post_json('/api/auth/login', {'email': email, 'password': BENCH_PASSWORD})
+    headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+    category_id = app.get('/api/categories', headers=headers).json['categories'][0]['id']
+    transaction_id = app.get('/api/transactions?limit=1', headers=headers).json['transactions'][0]['id']
+    return {
+        'headers': headers,
+        'email': email,
+        'category_id': category_id,
+        'transaction_id': transaction_id,
+    }
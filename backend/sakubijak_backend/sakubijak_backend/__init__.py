@@ -26,19 +26,26 @@ def main(global_config, **settings):
     with Configurator(settings=settings) as config:
         config.include('pyramid_jinja2')
         config.add_jinja2_renderer('.jinja2')
+        config.include('.renderers') # Renderer 'json' berbasis orjson
 
         config.include('.models') 
         config.include('.routes') 
+        config.include('.passwords')
 
         # 1. Ambil secret key dan algoritma dari settings
         jwt_secret = settings.get('jwt.secret_key')
         jwt_algorithm = settings.get('jwt.algorithm', 'HS256') # Default ke HS256 jika tidak ada
+        jwt_cache_size = int(settings.get('jwt.cache_size', 1024)) # 0 = tanpa cache token
 
         if not jwt_secret:
             raise ValueError("JWT Secret Key tidak diatur dalam konfigurasi.")
 
         # 2. Buat instance dari JWTAuthenticationPolicy
-        authn_policy = JWTAuthenticationPolicy(secret_key=jwt_secret, algorithm=jwt_algorithm)
+        authn_policy = JWTAuthenticationPolicy(
+            secret_key=jwt_secret,
+            algorithm=jwt_algorithm,
+            cache_size=jwt_cache_size
+        )
         
         # 3. Atur authentication policy
         config.set_authentication_policy(authn_policy)
@@ -50,6 +57,14 @@ def main(global_config, **settings):
 
         # Konfigurasi CORS
         config.include('.cors_tween')
+        # Jumlah query dan waktu DB per request (header Server-Timing + log anggaran)
+        config.include('.sql_timing_tween')
+        # Kompresi gzip/deflate untuk respons besar dan export streaming
+        config.include('.compression_tween')
+        # Request id + konteks log per request dan access log
+        config.include('.request_log_tween')
+        # Cache ringkasan dashboard untuk bulan yang sudah lewat (memori + disk opsional)
+        config.include('.views.api_dashboard')
 
         config.scan() 
         
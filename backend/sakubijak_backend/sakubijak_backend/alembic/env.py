@@ -3,7 +3,9 @@ from alembic import context
 from pyramid.paster import get_appsettings, setup_logging
 from sqlalchemy import engine_from_config
 
+from sakubijak_backend.models.engine import engine_settings
 from sakubijak_backend.models.meta import Base # Pastikan ini benar
+from sakubijak_backend.models.search import FTS_TABLE
 target_metadata = Base.metadata
 
 config = context.config
@@ -13,6 +15,13 @@ setup_logging(config.config_file_name)
 settings = get_appsettings(config.config_file_name)
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Tabel FTS5 (dan tabel bayangannya) dikelola lewat DDL manual, bukan metadata
+    if type_ == 'table' and reflected and name.startswith(FTS_TABLE):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -37,12 +46,14 @@ def run_migrations_online():
     and associate a connection with the context.
 
     """
-    engine = engine_from_config(settings, prefix='sqlalchemy.')
+    # Tanpa statement timeout aplikasi: migrasi/backfill boleh berjalan lama
+    engine = engine_from_config(engine_settings(settings), prefix='sqlalchemy.')
 
     connection = engine.connect()
     context.configure(
         connection=connection,
-        target_metadata=target_metadata
+        target_metadata=target_metadata,
+        include_object=include_object
     )
 
     try:
@@ -0,0 +1,35 @@
+"""add_monthly_data_versions
+
+Revision ID: 2e8c4b7a9d15
+Revises: f19b6d3a7c52
+Create Date: 2026-10-18 12:05:44.310927
+
+Versi data per (user_id, year_month), dinaikkan oleh setiap penulisan yang
+menyentuh transaksi di bulan tersebut. Dipakai sebagai ETag dan validasi
+cache ringkasan dashboard bulan yang sudah lewat (?month=YYYY-MM). Tabel
+dimulai kosong; bulan tanpa baris dianggap versi 0.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8c4b7a9d15'
+down_revision = 'f19b6d3a7c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('monthly_data_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year_month', sa.String(length=7), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_monthly_data_versions_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', 'year_month', name=op.f('pk_monthly_data_versions'))
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_data_versions')
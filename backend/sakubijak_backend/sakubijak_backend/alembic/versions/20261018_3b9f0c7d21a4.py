@@ -0,0 +1,69 @@
+"""add_transaction_composite_indexes
+
+Revision ID: 3b9f0c7d21a4
+Revises: 6672a03e3f11
+Create Date: 2026-10-18 09:12:41.204518
+
+Composite index untuk jalur query transaksi yang paling sering dipakai:
+
+- ix_transactions_user_id_date_created_at (user_id, date, created_at, id)
+  Dipakai daftar transaksi, keyset pagination, dan latest_transactions di
+  dashboard. Di PostgreSQL kolom category_id dan amount disimpan sebagai
+  INCLUDE sehingga agregat bulanan dashboard cukup dengan index-only scan.
+- ix_transactions_user_id_category_id_date (user_id, category_id, date)
+  Dipakai filter category_id pada daftar transaksi.
+
+Pemeriksaan EXPLAIN (PostgreSQL), setelah ``ANALYZE transactions``::
+
+    EXPLAIN SELECT * FROM transactions
+     WHERE user_id = 1
+     ORDER BY date DESC, created_at DESC, id DESC LIMIT 51;
+
+    -- Sebelum: Limit -> Sort -> Bitmap Heap Scan on transactions
+    --          (Sort Method: top-N heapsort / external merge)
+    -- Sesudah: Limit -> Index Scan Backward using
+    --          ix_transactions_user_id_date_created_at (tidak ada node Sort)
+
+    EXPLAIN SELECT category_id, sum(amount), count(id) FROM transactions
+     WHERE user_id = 1 AND date >= '2026-10-01' AND date < '2026-11-01'
+     GROUP BY category_id;
+
+    -- Sesudah: HashAggregate -> Index Only Scan using
+    --          ix_transactions_user_id_date_created_at
+
+Pemeriksaan yang sama untuk SQLite dijalankan otomatis oleh
+``TestTransactionIndexes`` di tests_views.py (EXPLAIN QUERY PLAN tidak boleh
+berisi "USE TEMP B-TREE FOR ORDER BY").
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9f0c7d21a4'
+down_revision = '6672a03e3f11'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        op.f('ix_transactions_user_id_date_created_at'),
+        'transactions',
+        ['user_id', 'date', 'created_at', 'id'],
+        unique=False,
+        postgresql_include=['category_id', 'amount'],
+    )
+    op.create_index(
+        op.f('ix_transactions_user_id_category_id_date'),
+        'transactions',
+        ['user_id', 'category_id', 'date'],
+        unique=False,
+        postgresql_include=['amount'],
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_transactions_user_id_category_id_date'), table_name='transactions')
+    op.drop_index(op.f('ix_transactions_user_id_date_created_at'), table_name='transactions')
@@ -0,0 +1,37 @@
+"""add_monthly_data_version_token
+
+Revision ID: 7a4c91e0b3d8
+Revises: 2e8c4b7a9d15
+Create Date: 2026-10-18 14:02:17.519384
+
+Token acak per baris monthly_data_versions, diacak ulang setiap kali versi
+naik dan ikut masuk ETag bulan yang sudah lewat. Counter versi saja bisa
+mulai ulang setelah database di-reset/restore sehingga body lama di cache
+disk dashboard cocok lagi. Baris yang sudah ada diberi satu token acak yang
+sama per database.
+
+"""
+import secrets
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4c91e0b3d8'
+down_revision = '2e8c4b7a9d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('monthly_data_versions') as batch_op:
+        batch_op.add_column(sa.Column('token', sa.String(length=16), nullable=True))
+    op.execute(
+        sa.text('UPDATE monthly_data_versions SET token = :token').bindparams(token=secrets.token_hex(8))
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('monthly_data_versions') as batch_op:
+        batch_op.drop_column('token')
@@ -0,0 +1,72 @@
+"""add_monthly_category_totals
+
+Revision ID: 8d2e5a41c6f0
+Revises: 3b9f0c7d21a4
+Create Date: 2026-10-18 10:03:17.551092
+
+Tabel rollup total pengeluaran per (user_id, year_month, category_id). Upgrade
+langsung mengisi tabel dari data transactions yang sudah ada; setelah itu
+rollup dipelihara oleh view transaksi. Untuk membangun ulang secara manual
+gunakan ``rebuild_sakubijak_backend_rollups development.ini``.
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e5a41c6f0'
+down_revision = '3b9f0c7d21a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    monthly_totals = op.create_table('monthly_category_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year_month', sa.String(length=7), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], name=op.f('fk_monthly_category_totals_category_id_categories')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_monthly_category_totals_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', 'year_month', 'category_id', name=op.f('pk_monthly_category_totals'))
+    )
+
+    if context.is_offline_mode():
+        # Mode --sql tidak bisa membaca data; jalankan rebuild_sakubijak_backend_rollups setelahnya
+        return
+
+    # Backfill dari transaksi yang sudah ada
+    transactions = sa.table('transactions',
+        sa.column('user_id', sa.Integer()),
+        sa.column('category_id', sa.Integer()),
+        sa.column('date', sa.Date()),
+        sa.column('amount', sa.Numeric(15, 2)),
+    )
+    year = sa.extract('year', transactions.c.date)
+    month = sa.extract('month', transactions.c.date)
+    grouped = op.get_bind().execute(
+        sa.select(
+            transactions.c.user_id,
+            transactions.c.category_id,
+            year.label('year'),
+            month.label('month'),
+            sa.func.sum(transactions.c.amount).label('total'),
+            sa.func.count().label('count'),
+        ).group_by(transactions.c.user_id, transactions.c.category_id, year, month)
+    ).fetchall()
+    if grouped:
+        op.bulk_insert(monthly_totals, [
+            {
+                'user_id': row.user_id,
+                'year_month': f'{int(row.year):04d}-{int(row.month):02d}',
+                'category_id': row.category_id,
+                'total': row.total,
+                'count': row.count,
+            } for row in grouped
+        ])
+
+
+def downgrade():
+    op.drop_table('monthly_category_totals')
@@ -0,0 +1,66 @@
+"""transactions_created_at_not_null
+
+Revision ID: b82f4d6e1a07
+Revises: 7a4c91e0b3d8
+Create Date: 2026-10-18 14:31:52.208613
+
+transactions.created_at ikut urutan keyset pagination (date, created_at, id).
+Perbandingan ``created_at < :x`` / ``created_at = :x`` tidak pernah benar
+untuk NULL, sehingga baris tanpa created_at terlewat atau berulang antar
+halaman. Baris lama diisi dari updated_at (atau waktu migrasi) lalu kolom
+dibuat NOT NULL.
+
+Di SQLite kolom diubah dengan menyalin ulang tabel (batch), yang ikut
+menghapus trigger FTS5 transactions_fts (lihat f19b6d3a7c52); trigger itu
+dibuat ulang setelahnya. Isi index FTS tidak berubah karena id dipertahankan.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b82f4d6e1a07'
+down_revision = '7a4c91e0b3d8'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+
+def set_created_at_nullable(nullable):
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=nullable)
+    if op.get_context().dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade():
+    op.execute(
+        'UPDATE transactions SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) '
+        'WHERE created_at IS NULL'
+    )
+    set_created_at_nullable(False)
+
+
+def downgrade():
+    set_created_at_nullable(True)
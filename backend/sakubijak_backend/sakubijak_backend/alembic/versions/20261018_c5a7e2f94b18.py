@@ -0,0 +1,29 @@
+"""add_users_data_version
+
+Revision ID: c5a7e2f94b18
+Revises: 8d2e5a41c6f0
+Create Date: 2026-10-18 10:41:56.018733
+
+Versi data per pengguna, dinaikkan oleh setiap penulisan transaksi atau
+kategori. Dipakai sebagai dasar ETag dan kunci cache ringkasan dashboard.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e2f94b18'
+down_revision = '8d2e5a41c6f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,84 @@
+"""add_transaction_description_search
+
+Revision ID: f19b6d3a7c52
+Revises: c5a7e2f94b18
+Create Date: 2026-10-18 11:27:09.842216
+
+Index full-text untuk ``GET /api/transactions?q=`` (lihat models/search.py):
+
+- PostgreSQL: index GIN ix_transactions_description_search pada
+  ``to_tsvector('simple', coalesce(description, ''))``.
+- SQLite: tabel virtual FTS5 transactions_fts (external content) beserta
+  trigger insert/update/delete, lalu diisi dari transaksi yang sudah ada.
+
+Dialek lain tidak mendapat index; pencarian jatuh ke LIKE.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19b6d3a7c52'
+down_revision = 'c5a7e2f94b18'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE transactions_fts USING fts5(
+        description, content='transactions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    # Backfill index dari isi tabel transactions
+    "INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS transactions_fts_au',
+    'DROP TRIGGER IF EXISTS transactions_fts_ad',
+    'DROP TRIGGER IF EXISTS transactions_fts_ai',
+    'DROP TABLE IF EXISTS transactions_fts',
+]
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        op.create_index(
+            'ix_transactions_description_search',
+            'transactions',
+            [sa.text("to_tsvector('simple', coalesce(description, ''))")],
+            unique=False,
+            postgresql_using='gin',
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_transactions_description_search', table_name='transactions')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
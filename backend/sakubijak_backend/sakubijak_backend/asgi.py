@@ -0,0 +1,314 @@
+"""
+Entry point ASGI di samping ``main()`` (WSGI).
+
+Aplikasi Pyramid yang sama (route, tween, policy JWT, ACL, renderer) dibungkus
+sehingga bisa dijalankan server ASGI seperti uvicorn::
+
+    pip install -e ".[asgi]"
+    SAKUBIJAK_CONFIG=production.ini uvicorn --factory sakubijak_backend.asgi:from_config
+
+Request GET/HEAD ke route baca (``sakubijak.asgi.routes``) dijalankan di event
+loop: seluruh pipeline Pyramid berjalan di dalam greenlet SQLAlchemy dan
+``request.dbsession`` terikat ke engine asyncio (asyncpg/aiosqlite), sehingga
+setiap tunggu ke database menyerahkan event loop ke request lain alih-alih
+menahan thread OS. Request lain (tulis, import, export streaming, login dengan
+hash password) tetap dijalankan sebagai WSGI di thread pool berukuran
+``sakubijak.asgi.threads``; body request mereka dibaca bertahap dari
+``receive()`` sehingga upload besar (import CSV) tidak ditampung di memori.
+
+Kode yang berjalan di event loop tidak boleh memakai state thread-local
+(``pyramid.threadlocal.get_current_request`` dan sejenisnya) karena beberapa
+request bergantian di thread yang sama; gunakan ``request`` atau ContextVar.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pyramid.interfaces import IRoutesMapper
+from pyramid.request import Request
+from pyramid.settings import aslist
+from sqlalchemy.util import await_only, greenlet_spawn
+
+from . import main as wsgi_main
+from .models import (
+    ASYNC_SESSION_FACTORY_KEY,
+    get_async_engine,
+    get_session_factory,
+    install_session_timeouts,
+)
+from .models.replica import (
+    REPLICA_PREFIX,
+    REPLICA_SESSION_KEY,
+    SAFE_METHODS,
+    SessionRouter,
+    has_replica,
+)
+
+SETTINGS_PREFIX = 'sakubijak.asgi.'
+
+# Route baca yang dilayani di event loop. Export tidak termasuk karena body-nya
+# di-stream per baris dan lebih cocok di thread WSGI.
+DEFAULT_ASYNC_ROUTES = (
+    'api_users_me',
+    'api_categories_collection',
+    'api_category_item',
+    'api_transactions_collection',
+    'api_transaction_item',
+    'api_dashboard_summary',
+    'api_analytics_timeseries',
+)
+DEFAULT_THREADS = 8
+
+CONFIG_ENV = 'SAKUBIJAK_CONFIG'
+
+
+class ReceiveStream(io.RawIOBase):
+    """
+    ``wsgi.input`` untuk request di thread pool: setiap potongan body diambil
+    dari ``receive()`` di event loop saat aplikasi WSGI membacanya.
+    """
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.buffer = b''
+        self.more_body = True
+
+    def readable(self):
+        return True
+
+    def _next_chunk(self):
+        message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+        if message['type'] == 'http.disconnect':
+            self.more_body = False
+            return b''
+        self.more_body = message.get('more_body', False)
+        return message.get('body', b'')
+
+    def readinto(self, b):
+        while not self.buffer and self.more_body:
+            self.buffer = self._next_chunk()
+        size = min(len(b), len(self.buffer))
+        b[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+def build_environ(scope):
+    """
+    Environ WSGI (PEP 3333) dari scope HTTP ASGI. ``wsgi.input`` diisi
+    pemanggil (body lengkap atau ReceiveStream).
+    """
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        # String environ WSGI adalah byte yang dibaca sebagai latin-1
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        # Stream input selalu berakhir dengan EOF, jadi body tanpa
+        # Content-Length (chunked) tetap bisa dibaca WebOb
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = name
+        else:
+            key = 'HTTP_' + name
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+def run_wsgi(app, environ, send):
+    """
+    Memanggil aplikasi WSGI secara sinkron dan meneruskan respons lewat
+    ``send(message)`` (fungsi sinkron yang mengirim pesan ASGI).
+    """
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and started.get('sent'):
+            raise exc_info[1].with_traceback(exc_info[2])
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [
+            (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+        ]
+
+    def send_start():
+        if not started.get('sent'):
+            started['sent'] = True
+            send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+
+    app_iter = app(environ, start_response)
+    try:
+        for chunk in app_iter:
+            if chunk:
+                send_start()
+                send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        send_start()
+        send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        close = getattr(app_iter, 'close', None)
+        if close is not None:
+            close()
+
+
+class ASGIApp:
+    """
+    Aplikasi ASGI di atas router WSGI Pyramid. Request yang dilayani di event
+    loop memakai ``session_factory`` (terikat ke engine asyncio), atau pilihan
+    ``session_router`` jika read replica dikonfigurasi.
+    """
+    def __init__(self, wsgi_app, session_factory, session_router=None, engines=(),
+                 routes=DEFAULT_ASYNC_ROUTES, threads=DEFAULT_THREADS):
+        self.wsgi_app = wsgi_app
+        self.registry = wsgi_app.registry
+        self.session_factory = session_factory
+        self.session_router = session_router
+        self.engines = list(engines)
+        self.routes = frozenset(routes)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='sakubijak-wsgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Tipe scope ASGI '{scope['type']}' tidak didukung.")
+
+        environ = build_environ(scope)
+        factory = self.async_session_factory(environ)
+        if factory is None:
+            await self.call_in_thread(environ, receive, send)
+            return
+
+        # Hanya GET/HEAD yang sampai di sini; body-nya (biasanya kosong) cukup dibaca penuh
+        body = await read_body(receive)
+        environ['wsgi.input'] = io.BytesIO(body)
+        if body or 'CONTENT_LENGTH' in environ:
+            environ['CONTENT_LENGTH'] = str(len(body))
+        environ[ASYNC_SESSION_FACTORY_KEY] = factory
+        await greenlet_spawn(run_wsgi, self.wsgi_app, environ, lambda message: await_only(send(message)))
+
+    def async_session_factory(self, environ):
+        """
+        Session factory asyncio jika request dilayani di event loop, None
+        jika harus lewat thread WSGI.
+        """
+        if environ['REQUEST_METHOD'] not in SAFE_METHODS:
+            return None
+        request = Request(environ)
+        request.registry = self.registry
+        route = self.registry.getUtility(IRoutesMapper)(request)['route']
+        if route is None or route.name not in self.routes:
+            return None
+        if self.session_router is None:
+            return self.session_factory
+        request.matched_route = route
+        return self.session_router.factory_for(request)
+
+    async def call_in_thread(self, environ, receive, send):
+        loop = asyncio.get_running_loop()
+        environ['wsgi.input'] = io.BufferedReader(ReceiveStream(receive, loop))
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        await loop.run_in_executor(self.executor, run_wsgi, self.wsgi_app, environ, send_from_thread)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def close(self):
+        for engine in self.engines:
+            await engine.dispose()
+        self.executor.shutdown(wait=False)
+
+
+def main(global_config, **settings):
+    """
+    Membuat aplikasi ASGI dari setting yang sama dengan ``main()`` WSGI.
+
+    Setting tambahan (semua opsional)::
+
+        sakubijak.asgi.routes = api_dashboard_summary ...
+        sakubijak.asgi.threads = 8
+    """
+    wsgi_app = wsgi_main(global_config, **settings)
+    settings = wsgi_app.registry.settings
+
+    engine = get_async_engine(settings)
+    factory = get_session_factory(engine.sync_engine)
+    install_session_timeouts(factory, engine.sync_engine)
+    engines = [engine]
+    session_router = None
+
+    if has_replica(settings):
+        replica_engine = get_async_engine(settings, prefix=REPLICA_PREFIX)
+        replica_factory = get_session_factory(replica_engine.sync_engine)
+        replica_factory.configure(info={REPLICA_SESSION_KEY: True})
+        install_session_timeouts(replica_factory, replica_engine.sync_engine)
+        engines.append(replica_engine)
+        session_router = SessionRouter.from_settings(settings, factory, replica_factory)
+
+    routes = settings.get(SETTINGS_PREFIX + 'routes')
+    threads = settings.get(SETTINGS_PREFIX + 'threads')
+    return ASGIApp(
+        wsgi_app,
+        factory,
+        session_router=session_router,
+        engines=engines,
+        routes=aslist(routes) if routes is not None else DEFAULT_ASYNC_ROUTES,
+        threads=int(threads) if threads not in (None, '') else DEFAULT_THREADS,
+    )
+
+
+def from_config(config_uri=None):
+    """
+    Factory tanpa argumen untuk ``uvicorn --factory``; file konfigurasi dari
+    argumen atau environment ``SAKUBIJAK_CONFIG`` (default production.ini).
+    """
+    from pyramid.paster import get_appsettings, setup_logging
+
+    config_uri = config_uri or os.environ.get(CONFIG_ENV, 'production.ini')
+    setup_logging(config_uri)
+    settings = get_appsettings(config_uri)
+    return main({'__file__': os.path.abspath(config_uri)}, **settings)
@@ -0,0 +1,157 @@
+"""
+Utilitas cache in-process dan conditional GET yang dipakai bersama oleh view.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from webob.etag import ETagMatcher
+
+log = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Cache LRU sederhana yang thread-safe dengan ukuran maksimum tetap.
+    Entri boleh diberi waktu kedaluwarsa (epoch detik) dan dibuang saat
+    kedaluwarsa. Menyimpan counter hits/misses untuk observabilitas.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at=None):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+
+class SpillCache:
+    """
+    Cache body respons ``key -> (etag, body)``: LRU in-process, dengan salinan
+    opsional di ``directory`` agar entri yang tergeser dari memori (atau hilang
+    karena worker restart) tidak perlu dihitung ulang. ``key`` berupa tuple;
+    setiap elemennya menjadi satu level path. File di disk bisa dipakai
+    bersama oleh beberapa proses worker karena penulisannya atomik
+    (file sementara lalu rename). Pemanggil tetap wajib membandingkan etag.
+    """
+    def __init__(self, maxsize=1024, directory=None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.directory = directory
+
+    def configure(self, maxsize=None, directory=None):
+        if maxsize is not None:
+            self.memory = LRUCache(maxsize=maxsize)
+        self.directory = directory or None
+
+    def _path(self, key):
+        return os.path.join(self.directory, *(str(part) for part in key)) + '.cache'
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None or not self.directory:
+            return entry
+        try:
+            with open(self._path(key), 'rb') as f:
+                etag, body = f.read().split(b'\n', 1)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.warning('Gagal membaca entri cache %s dari disk', key, exc_info=True)
+            return None
+        entry = (etag.decode('utf-8'), body)
+        self.memory.set(key, entry)
+        return entry
+
+    def set(self, key, value):
+        """
+        ``value`` berupa tuple ``(etag, body)``, sama dengan isi LRUCache
+        yang dipakai view lain, sehingga pemanggil bisa memakai keduanya.
+        """
+        self.memory.set(key, value)
+        if not self.directory:
+            return
+        etag, body = value
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(etag.encode('utf-8') + b'\n' + body)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Disk hanya pelengkap; entri tetap ada di memori
+            log.warning('Gagal menulis entri cache %s ke disk', key, exc_info=True)
+
+    def pop(self, key):
+        self.memory.pop(key)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """
+        Mengosongkan cache memori; file di disk dibiarkan (tervalidasi etag).
+        """
+        self.memory.clear()
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __contains__(self, key):
+        return key in self.memory
+
+
+def etag_matches(request, etag):
+    """
+    True jika header If-None-Match pada request cocok dengan etag (tanpa tanda kutip).
+    Perbandingan weak sesuai RFC 7232 untuk If-None-Match.
+    """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    return etag in ETagMatcher.parse(header, strong=False)
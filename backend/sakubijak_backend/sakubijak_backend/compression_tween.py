@@ -0,0 +1,129 @@
+"""
+Kompresi respons gzip/deflate sesuai ``Accept-Encoding`` klien.
+
+Body yang panjangnya diketahui hanya dikompres jika minimal ``min_size``
+byte. Body streaming (``app_iter`` tanpa Content-Length, misalnya export
+transaksi) selalu dikompres per chunk tanpa menampung seluruh isi di memori.
+
+Setting::
+
+    sakubijak.compression.enabled = true
+    sakubijak.compression.min_size = 1024    # byte
+    sakubijak.compression.level = 6          # 1 (cepat) .. 9 (kecil)
+    sakubijak.compression.content_types = application/json application/x-ndjson text/csv ...
+"""
+import zlib
+
+from pyramid.settings import asbool, aslist
+from pyramid.tweens import EXCVIEW
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+DEFAULT_CONTENT_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'application/javascript',
+)
+
+# wbits zlib: 16 + MAX_WBITS menghasilkan format gzip, MAX_WBITS format zlib
+# (yang dimaksud "deflate" di HTTP)
+ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+SKIP_STATUS = (204, 304)
+
+
+def compressor(encoding, level):
+    return zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+
+
+class CompressedAppIter:
+    """
+    Membungkus app_iter dan mengompres chunk-nya satu per satu. ``close()``
+    diteruskan ke app_iter asli agar sumber daya (misalnya koneksi database
+    export) tetap dilepas oleh server WSGI.
+    """
+    def __init__(self, app_iter, encoding, level):
+        self.app_iter = app_iter
+        self.encoding = encoding
+        self.level = level
+
+    def __iter__(self):
+        compress = compressor(self.encoding, self.level)
+        for chunk in self.app_iter:
+            data = compress.compress(chunk)
+            if data:
+                yield data
+        yield compress.flush()
+
+    def close(self):
+        close = getattr(self.app_iter, 'close', None)
+        if close is not None:
+            close()
+
+
+class CompressionTweenFactory:
+    def __init__(self, handler, registry):
+        self.handler = handler
+        self.registry = registry
+        settings = registry.settings
+        self.enabled = asbool(settings.get('sakubijak.compression.enabled', True))
+        self.min_size = int(settings.get('sakubijak.compression.min_size', DEFAULT_MIN_SIZE))
+        self.level = int(settings.get('sakubijak.compression.level', DEFAULT_LEVEL))
+        content_types = settings.get('sakubijak.compression.content_types')
+        self.content_types = frozenset(aslist(content_types) if content_types else DEFAULT_CONTENT_TYPES)
+
+    def __call__(self, request):
+        response = self.handler(request)
+        if not self.enabled or not self.compressible(request, response):
+            return response
+
+        # Representasi berbeda per Accept-Encoding, termasuk saat tidak dikompres
+        vary = tuple(response.vary or ())
+        if 'Accept-Encoding' not in vary:
+            response.vary = vary + ('Accept-Encoding',)
+
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.content_length is not None:
+            if response.content_length < self.min_size:
+                return response
+            compress = compressor(encoding, self.level)
+            response.body = compress.compress(response.body) + compress.flush()
+        else:
+            response.app_iter = CompressedAppIter(response.app_iter, encoding, self.level)
+            response.content_length = None
+        response.content_encoding = encoding
+
+        # Byte yang dikirim berbeda dari versi tanpa kompresi, jadi ETag kuat
+        # diturunkan menjadi weak (If-None-Match tetap cocok, lihat cache.etag_matches)
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
+
+    def compressible(self, request, response):
+        if request.method == 'HEAD' or response.status_code in SKIP_STATUS or response.status_code < 200:
+            return False
+        if response.content_encoding or response.content_type not in self.content_types:
+            return False
+        return not response.cache_control.no_transform
+
+    def choose_encoding(self, request):
+        if 'Accept-Encoding' not in request.headers:
+            return None
+        offers = request.accept_encoding.acceptable_offers(list(ENCODINGS))
+        return offers[0][0] if offers else None
+
+
+def includeme(config):
+    config.add_tween('sakubijak_backend.compression_tween.CompressionTweenFactory',
+                     over=EXCVIEW)
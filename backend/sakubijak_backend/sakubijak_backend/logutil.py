@@ -0,0 +1,158 @@
+"""
+Logging non-blocking dan terstruktur.
+
+``QueueingHandler`` hanya memasukkan record ke antrean di thread request;
+penulisan ke stream dilakukan oleh ``QueueListener`` di thread terpisah.
+Record diperkaya dengan konteks request (request_id, route, latency_ms) dan
+event DEBUG bisa di-sampling. Dipasang dari file ini seperti handler biasa::
+
+    [handler_console]
+    class = sakubijak_backend.logutil.QueueingHandler
+    args = (sys.stderr,)
+    kwargs = {'debug_sample_rate': 0.1}
+    formatter = json
+
+    [formatter_json]
+    class = sakubijak_backend.logutil.JSONFormatter
+
+Level per logger tetap diatur lewat bagian ``[logger_*]`` di file ini.
+"""
+import atexit
+import contextvars
+import datetime
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+# Request yang sedang diproses oleh thread/task ini (diisi oleh request_log_tween)
+current_request = contextvars.ContextVar('sakubijak_current_request', default=None)
+
+# Atribut bawaan LogRecord; atribut lain dianggap field tambahan (extra=...)
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'route', 'latency_ms', 'sample_rate',
+}
+
+
+def request_context():
+    """
+    Mengembalikan (request_id, route, latency_ms) untuk request aktif, atau
+    ('-', '-', None) di luar request.
+    """
+    request = current_request.get()
+    if request is None:
+        return '-', '-', None
+    matched_route = getattr(request, 'matched_route', None)
+    route = matched_route.name if matched_route is not None else '-'
+    started = getattr(request, 'log_started', None)
+    latency_ms = round((time.perf_counter() - started) * 1000.0, 1) if started else None
+    return getattr(request, 'request_id', '-'), route, latency_ms
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Meloloskan hanya sebagian record DEBUG: satu dari setiap ``1 / rate``
+    kemunculan per (logger, template pesan). Record bisa membawa
+    ``extra={'sample_rate': ...}`` sendiri. Level INFO ke atas selalu lolos.
+    """
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, 'sample_rate', self.rate)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        key = (record.name, record.msg)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = itertools.count()
+            seen = next(counter)
+        return seen % round(1 / rate) == 0
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Satu objek JSON per baris: ts, level, logger, msg, request_id, route,
+    latency_ms, exc (jika ada) dan field tambahan dari ``extra=...``.
+    """
+    def format(self, record):
+        payload = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'route': getattr(record, 'route', '-'),
+        }
+        if getattr(record, 'latency_ms', None) is not None:
+            payload['latency_ms'] = record.latency_ms
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler yang membawa handler tujuannya sendiri (StreamHandler ke
+    ``stream``) dan QueueListener yang menulis dari thread latar.
+    Formatter yang dipasang ke handler ini diteruskan ke handler tujuan
+    sehingga formatting juga terjadi di thread listener.
+    """
+    def __init__(self, stream=None, debug_sample_rate=1.0, maxsize=10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = logging.StreamHandler(stream)
+        self.addFilter(SamplingFilter(debug_sample_rate))
+        self.dropped = 0
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Konteks request diambil sekarang (di thread request), formatting ditunda
+        # ke thread listener. exc_info dirender ke teks karena traceback tidak aman
+        # dibawa lintas thread setelah frame-nya selesai.
+        record.request_id, record.route, record.latency_ms = request_context()
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Antrean penuh: log dibuang daripada menahan thread request
+            self.dropped += 1
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
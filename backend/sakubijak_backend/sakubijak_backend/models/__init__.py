@@ -1,4 +1,3 @@
-from sqlalchemy import engine_from_config
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import configure_mappers # Penting untuk relasi
 import zope.sqlalchemy # Untuk integrasi dengan pyramid_tm
@@ -8,17 +7,26 @@ from .meta import Base
 
 # Impor semua model Anda dari mymodel.py agar terdaftar ke Base.metadata
 # Ini adalah baris yang memastikan User, Category, dan Transaction dikenali.
-from .mymodel import User, Category, Transaction 
+from .mymodel import User, Category, Transaction, MonthlyCategoryTotal, MonthlyDataVersion
+# Tabel FTS5 + trigger untuk SQLite ikut dibuat oleh metadata.create_all()
+from . import search
+
+# Pembuatan engine (pool, pre-ping, statement timeout) ada di engine.py
+from .engine import (
+    ASYNC_SESSION_FACTORY_KEY,
+    get_async_engine,
+    get_engine,
+    install_session_timeouts,
+    statement_timeout_view,
+)
+# Read replica opsional untuk view baca (sqlalchemy.replica.*)
+from .replica import REPLICA_SESSION_KEY, SessionRouter, get_replica_engine, has_replica
 
 # configure_mappers() dijalankan setelah semua model didefinisikan dan diimpor
 # untuk memastikan semua relasi (relationships) antar model bisa di-setup dengan benar.
 configure_mappers()
 
 
-def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
-
-
 def get_session_factory(engine):
     factory = sessionmaker()
     factory.configure(bind=engine)
@@ -72,13 +80,38 @@ def includeme(config):
     # Baris ini bisa di-uncomment jika Anda ingin menggunakan pyramid_retry dan sudah menginstalnya
     # config.include('pyramid_retry')
 
-    session_factory = get_session_factory(get_engine(settings))
+    engine = get_engine(settings)
+    session_factory = get_session_factory(engine)
     config.registry['dbsession_factory'] = session_factory
 
+    # Batas waktu statement per route (sakubijak.db.statement_timeout.<route_name>)
+    install_session_timeouts(session_factory, engine)
+    config.add_view_deriver(statement_timeout_view)
+
+    if has_replica(settings):
+        replica_engine = get_replica_engine(settings)
+        replica_factory = get_session_factory(replica_engine)
+        replica_factory.configure(info={REPLICA_SESSION_KEY: True})
+        install_session_timeouts(replica_factory, replica_engine)
+        config.registry['dbsession_replica_factory'] = replica_factory
+        router = SessionRouter.from_settings(settings, session_factory, replica_factory)
+        config.registry['dbsession_router'] = router
+        choose_factory = router.factory_for
+    else:
+        def choose_factory(request):
+            return session_factory
+
+    def dbsession(request):
+        # Di bawah asgi.py request baca sudah membawa factory untuk engine asyncio
+        factory = request.environ.get(ASYNC_SESSION_FACTORY_KEY)
+        if factory is None:
+            factory = choose_factory(request)
+        return get_tm_session(factory, request.tm)
+
     # Membuat request.dbsession tersedia untuk digunakan dalam view Pyramid
+    # (r.tm adalah transaction manager yang digunakan oleh pyramid_tm)
     config.add_request_method(
-        # r.tm adalah transaction manager yang digunakan oleh pyramid_tm
-        lambda r: get_tm_session(session_factory, r.tm),
+        dbsession,
         'dbsession',
         reify=True # dbsession akan dibuat sekali per request
     )
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+Pembuatan engine database: ukuran pool, pre-ping, recycle dan batas waktu
+statement dari setting ``sakubijak.db.*``.
+
+Setting yang dikenali (semua opsional)::
+
+    sakubijak.db.pool_size = 5
+    sakubijak.db.max_overflow = 10
+    sakubijak.db.pool_timeout = 10            # detik menunggu koneksi bebas
+    sakubijak.db.pool_recycle = 1800          # detik
+    sakubijak.db.pool_pre_ping = true
+    sakubijak.db.statement_timeout = 15000    # ms, 0 = tanpa batas
+    sakubijak.db.statement_timeout.<route_name> = 3000
+
+Di PostgreSQL batas waktu default dipasang saat koneksi dibuka dan override
+per route memakai ``SET LOCAL`` di awal transaksi. SQLite tidak mengenal
+statement_timeout sehingga diemulasikan dengan progress handler sqlite3.
+
+``get_async_engine`` membuat engine asyncio (asyncpg/aiosqlite) dari setting
+yang sama untuk entry point ASGI (lihat asgi.py). Emulasi batas waktu SQLite
+tidak tersedia di sana karena koneksi aiosqlite berjalan di thread miliknya.
+"""
+import time
+
+from pyramid.settings import asbool
+from sqlalchemy import engine_from_config, event
+from sqlalchemy.engine import make_url
+
+SETTINGS_PREFIX = 'sakubijak.db.'
+ROUTE_TIMEOUT_PREFIX = SETTINGS_PREFIX + 'statement_timeout.'
+
+# Kunci di Session.info / Connection.info untuk override batas waktu per route
+STATEMENT_TIMEOUT_KEY = 'sakubijak.statement_timeout'
+
+# Kunci di environ WSGI: session factory yang terikat ke engine asyncio, diisi
+# oleh asgi.py untuk request yang dilayani di event loop
+ASYNC_SESSION_FACTORY_KEY = 'sakubijak.async_session_factory'
+
+# Driver asyncio per database; URL dengan driver lain diganti saat mode ASGI
+ASYNC_DRIVERS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
+ASYNC_DRIVER_NAMES = frozenset(['asyncpg', 'aiosqlite', 'psycopg'])
+
+# Progress handler sqlite3 dipanggil setiap N instruksi VM
+SQLITE_PROGRESS_STEPS = 1000
+
+POOL_SETTINGS = {
+    'pool_size': int,
+    'max_overflow': int,
+    'pool_timeout': int,
+    'pool_recycle': int,
+}
+
+
+def engine_settings(settings, prefix='sqlalchemy.'):
+    """
+    Mengambil setting ``<prefix>*`` untuk engine_from_config. Kunci bertingkat
+    (misalnya ``sqlalchemy.replica.url``) dilewati karena milik engine lain.
+    """
+    return {
+        key: value for key, value in settings.items()
+        if key.startswith(prefix) and '.' not in key[len(prefix):]
+    }
+
+
+def statement_timeout(settings, route_name=None):
+    """
+    Batas waktu statement (ms) untuk route tertentu, atau default jika route
+    tidak punya override. Mengembalikan None jika tidak dibatasi.
+    """
+    value = None
+    if route_name:
+        value = settings.get(ROUTE_TIMEOUT_PREFIX + route_name)
+    if value is None:
+        value = settings.get(SETTINGS_PREFIX + 'statement_timeout')
+    timeout = int(value) if value not in (None, '') else 0
+    return timeout or None
+
+
+def has_route_timeouts(settings):
+    return any(key.startswith(ROUTE_TIMEOUT_PREFIX) for key in settings)
+
+
+def pool_options(settings, backend):
+    kwargs = {}
+    if backend != 'sqlite':
+        # SQLite memakai SingletonThreadPool/QueuePool bawaan dialek; ukuran pool
+        # hanya berarti untuk server database
+        for name, convert in POOL_SETTINGS.items():
+            value = settings.get(SETTINGS_PREFIX + name)
+            if value not in (None, ''):
+                kwargs[name] = convert(value)
+    elif settings.get(SETTINGS_PREFIX + 'pool_recycle') not in (None, ''):
+        kwargs['pool_recycle'] = int(settings[SETTINGS_PREFIX + 'pool_recycle'])
+    kwargs['pool_pre_ping'] = asbool(settings.get(SETTINGS_PREFIX + 'pool_pre_ping', True))
+    return kwargs
+
+
+def get_engine(settings, prefix='sqlalchemy.'):
+    options = engine_settings(settings, prefix)
+    backend = make_url(options[prefix + 'url']).get_backend_name()
+
+    kwargs = pool_options(settings, backend)
+    default_timeout = statement_timeout(settings)
+    if backend == 'postgresql' and default_timeout:
+        # Dipasang sebagai parameter koneksi agar tidak ikut ter-rollback oleh reset pool
+        kwargs['connect_args'] = {'options': f'-c statement_timeout={default_timeout}'}
+
+    engine = engine_from_config(options, prefix, **kwargs)
+    if backend == 'sqlite' and (default_timeout or has_route_timeouts(settings)):
+        install_sqlite_timeout(engine, default_timeout)
+    return engine
+
+
+def async_url(url):
+    """
+    URL ``url`` dengan driver asyncio (postgresql+asyncpg, sqlite+aiosqlite).
+    Driver yang sudah async dibiarkan.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Database '{backend}' tidak didukung di mode ASGI.")
+    if url.get_driver_name() in ASYNC_DRIVER_NAMES:
+        return url
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+def get_async_engine(settings, prefix='sqlalchemy.'):
+    """
+    Engine asyncio untuk ``<prefix>url`` dengan opsi pool yang sama seperti
+    get_engine. ``engine.sync_engine`` dipakai oleh Session biasa yang berjalan
+    di dalam greenlet (asgi.py).
+    """
+    from sqlalchemy.ext.asyncio import async_engine_from_config
+
+    options = engine_settings(settings, prefix)
+    url = async_url(options[prefix + 'url'])
+    options[prefix + 'url'] = url
+    backend = url.get_backend_name()
+
+    kwargs = pool_options(settings, backend)
+    default_timeout = statement_timeout(settings)
+    if backend == 'postgresql' and default_timeout:
+        if url.get_driver_name() == 'asyncpg':
+            kwargs['connect_args'] = {'server_settings': {'statement_timeout': str(default_timeout)}}
+        else:
+            kwargs['connect_args'] = {'options': f'-c statement_timeout={default_timeout}'}
+    return async_engine_from_config(options, prefix, **kwargs)
+
+
+def install_sqlite_timeout(engine, default_timeout):
+    """
+    Emulasi statement_timeout untuk SQLite: selama statement berjalan, progress
+    handler membatalkan eksekusi (OperationalError: interrupted) setelah tenggat.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_deadline(conn, cursor, statement, parameters, context, executemany):
+        timeout = conn.info.get(STATEMENT_TIMEOUT_KEY, default_timeout)
+        if not timeout:
+            return
+        deadline = time.monotonic() + timeout / 1000.0
+        conn.connection.driver_connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS
+        )
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def clear_deadline(conn, cursor, statement, parameters, context, executemany):
+        conn.connection.driver_connection.set_progress_handler(None, 0)
+
+    @event.listens_for(engine, 'handle_error')
+    def clear_deadline_on_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and not conn.invalidated:
+            conn.connection.driver_connection.set_progress_handler(None, 0)
+
+
+def apply_session_timeout(session, transaction, connection):
+    """
+    Listener ``after_begin`` Session: meneruskan override per route dari
+    Session.info ke koneksi yang baru memulai transaksi.
+    """
+    timeout = session.info.get(STATEMENT_TIMEOUT_KEY)
+    if timeout is None:
+        return
+    connection.info[STATEMENT_TIMEOUT_KEY] = timeout
+    if connection.dialect.name == 'postgresql':
+        # SET LOCAL hanya berlaku sampai transaksi selesai
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+
+def clear_connection_timeout(dbapi_connection, connection_record):
+    # Connection.info hidup selama koneksi DBAPI ada di pool; override tidak boleh terbawa
+    connection_record.info.pop(STATEMENT_TIMEOUT_KEY, None)
+
+
+def install_session_timeouts(session_factory, engine):
+    event.listen(session_factory, 'after_begin', apply_session_timeout)
+    event.listen(engine, 'checkin', clear_connection_timeout)
+
+
+def statement_timeout_view(view, info):
+    """
+    View deriver: route dengan ``sakubijak.db.statement_timeout.<route_name>``
+    menjalankan query-nya dengan batas waktu tersebut.
+    """
+    route_name = info.options.get('route_name')
+    if not route_name or ROUTE_TIMEOUT_PREFIX + route_name not in info.settings:
+        return view
+    timeout = statement_timeout(info.settings, route_name) or 0
+
+    def wrapper(context, request):
+        session = request.dbsession
+        session.info[STATEMENT_TIMEOUT_KEY] = timeout
+        if session.in_transaction():
+            # Transaksi sudah dimulai sebelum view (misalnya oleh policy autentikasi)
+            apply_session_timeout(session, None, session.connection())
+        return view(context, request)
+    return wrapper
@@ -9,6 +9,7 @@ from sqlalchemy import (
     Numeric,
     Date,
     Index, 
+    text,
 )
 from sqlalchemy.orm import relationship 
 from .meta import Base 
@@ -20,6 +21,8 @@ class User(Base):
     name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False) # Password yang sudah di-hash
+    # Naik setiap ada penulisan transaksi/kategori milik user ini (lihat models/versioning.py)
+    data_version = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
@@ -43,6 +46,8 @@ class Category(Base):
     user_owner = relationship("User", back_populates="categories")
     # Relasi: Satu Category memiliki banyak Transaction
     transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
+    # Rollup bulanan ikut terhapus bersama kategorinya
+    monthly_totals = relationship("MonthlyCategoryTotal", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Category(id={self.id}, name='{self.name}', user_id={self.user_id})>"
@@ -58,12 +63,79 @@ class Transaction(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False, index=True) # Kategori wajib untuk transaksi
     
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # NOT NULL karena ikut urutan keyset pagination (date, created_at, id):
+    # perbandingan dengan NULL tidak pernah benar sehingga barisnya terlewat
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     # Relasi: Satu Transaction dimiliki oleh satu User dan satu Category
     user_owner = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
 
+    __table_args__ = (
+        # Daftar transaksi (termasuk keyset pagination) dan transaksi terakhir di dashboard:
+        # filter user_id lalu urut (date, created_at, id) langsung dari index, tanpa sort.
+        # Di PostgreSQL category_id dan amount ikut disimpan (INCLUDE) agar agregat
+        # bulanan dashboard bisa dijawab dengan index-only scan.
+        Index(
+            'ix_transactions_user_id_date_created_at',
+            'user_id', 'date', 'created_at', 'id',
+            postgresql_include=['category_id', 'amount'],
+        ),
+        # Filter category_id pada daftar transaksi dan agregat per kategori
+        Index(
+            'ix_transactions_user_id_category_id_date',
+            'user_id', 'category_id', 'date',
+            postgresql_include=['amount'],
+        ),
+        # Pencarian full-text deskripsi (?q=) di PostgreSQL; SQLite memakai
+        # tabel FTS5, lihat models/search.py
+        Index(
+            'ix_transactions_description_search',
+            text("to_tsvector('simple', coalesce(description, ''))"),
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+    )
+
     def __repr__(self):
         return f"<Transaction(id={self.id}, description='{self.description}', amount={self.amount}, date='{self.date}')>"
+
+class MonthlyCategoryTotal(Base):
+    """
+    Rollup total pengeluaran per pengguna, bulan dan kategori. Diperbarui dalam
+    transaksi database yang sama dengan setiap penulisan Transaction
+    (lihat models/rollup.py) sehingga dashboard tidak perlu memindai tabel transactions.
+    """
+    __tablename__ = 'monthly_category_totals'
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    year_month = Column(String(7), primary_key=True) # Format 'YYYY-MM'
+    category_id = Column(Integer, ForeignKey('categories.id'), primary_key=True)
+    total = Column(Numeric(15, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyCategoryTotal(user_id={self.user_id}, year_month='{self.year_month}', category_id={self.category_id}, total={self.total})>"
+
+class MonthlyDataVersion(Base):
+    """
+    Versi data per pengguna per bulan. Naik setiap kali penulisan menyentuh
+    transaksi yang tanggalnya (lama atau baru) jatuh di bulan tersebut, atau
+    saat kategori pengguna diubah/dihapus (lihat models/versioning.py). Dipakai
+    sebagai ETag dan validasi cache ringkasan dashboard bulan yang sudah lewat.
+    Bulan tanpa baris dianggap versi 0.
+
+    ``token`` diacak ulang setiap kali versi naik. Counter ``version`` bisa
+    mulai lagi dari 1 setelah database di-reset/restore atau ID pengguna
+    dipakai ulang, sehingga ETag memakai keduanya agar body lama di cache disk
+    tidak cocok lagi.
+    """
+    __tablename__ = 'monthly_data_versions'
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    year_month = Column(String(7), primary_key=True) # Format 'YYYY-MM'
+    version = Column(Integer, nullable=False, default=0, server_default='0')
+    token = Column(String(16), nullable=True)
+
+    def __repr__(self):
+        return f"<MonthlyDataVersion(user_id={self.user_id}, year_month='{self.year_month}', version={self.version})>"
@@ -0,0 +1,112 @@
+"""
+Routing ``request.dbsession`` ke read replica untuk view yang hanya membaca.
+
+Aktif jika ``sqlalchemy.replica.url`` diatur (opsi engine lain dengan awalan
+yang sama, misalnya ``sqlalchemy.replica.echo``, ikut diteruskan). Setting
+lain (semua opsional)::
+
+    sakubijak.db.replica_routes = api_transactions_collection ...
+    sakubijak.db.replica_pin_seconds = 5
+
+Hanya request GET/HEAD ke route di ``replica_routes`` yang memakai replica.
+Setelah request tulis yang berhasil, pengguna yang terautentikasi dipin ke
+primary di sisi server selama ``replica_pin_seconds`` detik, sehingga
+pembacaan berikutnya tetap ke primary (read-your-writes selama replica masih
+tertinggal). SPA memanggil API lintas origin tanpa cookie, jadi pin dicatat
+per ``user_id``; pin ini per proses worker. Respons juga diberi cookie pendek
+(``sakubijak_primary``) untuk klien same-origin, yang berlaku lintas worker.
+"""
+import time
+
+from pyramid.settings import aslist
+
+from ..cache import LRUCache
+from .engine import get_engine
+
+REPLICA_PREFIX = 'sqlalchemy.replica.'
+SETTINGS_PREFIX = 'sakubijak.db.'
+
+# View baca yang aman dilayani replica (tidak menulis apa pun ke database)
+DEFAULT_REPLICA_ROUTES = (
+    'api_users_me',
+    'api_categories_collection',
+    'api_category_item',
+    'api_transactions_collection',
+    'api_transaction_item',
+    'api_transactions_export',
+    'api_dashboard_summary',
+    'api_analytics_timeseries',
+)
+DEFAULT_PIN_SECONDS = 5
+# Jumlah maksimum pengguna yang dipin bersamaan (yang tertua dibuang lebih dulu)
+DEFAULT_PIN_CACHE_SIZE = 10000
+
+PIN_COOKIE = 'sakubijak_primary'
+SAFE_METHODS = frozenset(['GET', 'HEAD'])
+
+# Kunci di Session.info, berguna untuk log/debug: True jika sesi terikat ke replica
+REPLICA_SESSION_KEY = 'sakubijak.replica'
+
+
+def has_replica(settings):
+    return bool(settings.get(REPLICA_PREFIX + 'url'))
+
+
+def get_replica_engine(settings):
+    return get_engine(settings, prefix=REPLICA_PREFIX)
+
+
+class SessionRouter:
+    """
+    Memilih session factory (primary atau replica) untuk sebuah request.
+    """
+    def __init__(self, primary_factory, replica_factory, routes=DEFAULT_REPLICA_ROUTES,
+                 pin_seconds=DEFAULT_PIN_SECONDS):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.routes = frozenset(routes)
+        self.pin_seconds = pin_seconds
+        # user_id -> True, kedaluwarsa pin_seconds setelah tulis terakhir
+        self.pinned_users = LRUCache(maxsize=DEFAULT_PIN_CACHE_SIZE)
+
+    @classmethod
+    def from_settings(cls, settings, primary_factory, replica_factory):
+        routes = settings.get(SETTINGS_PREFIX + 'replica_routes')
+        pin_seconds = settings.get(SETTINGS_PREFIX + 'replica_pin_seconds')
+        return cls(
+            primary_factory,
+            replica_factory,
+            routes=aslist(routes) if routes is not None else DEFAULT_REPLICA_ROUTES,
+            pin_seconds=int(pin_seconds) if pin_seconds not in (None, '') else DEFAULT_PIN_SECONDS,
+        )
+
+    def use_replica(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        # request.dbsession biasanya pertama kali diakses oleh policy autentikasi
+        # atau view, keduanya setelah route dicocokkan
+        route = getattr(request, 'matched_route', None)
+        if route is None or route.name not in self.routes:
+            return False
+        if PIN_COOKIE in request.cookies:
+            return False
+        user_id = request.authenticated_userid
+        return user_id is None or self.pinned_users.get(user_id) is None
+
+    def factory_for(self, request):
+        if self.use_replica(request):
+            return self.replica_factory
+        if request.method not in SAFE_METHODS and self.pin_seconds > 0:
+            request.add_response_callback(self.pin_to_primary)
+        return self.primary_factory
+
+    def pin_to_primary(self, request, response):
+        # Request yang gagal tidak mengubah data, jadi tidak perlu dipin
+        if response.status_code >= 400:
+            return
+        user_id = request.authenticated_userid
+        if user_id is not None:
+            self.pinned_users.set(user_id, True, expires_at=time.time() + self.pin_seconds)
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=self.pin_seconds, path='/', httponly=True, samesite='Lax',
+        )
@@ -0,0 +1,187 @@
+"""
+Pemeliharaan tabel rollup ``monthly_category_totals``.
+
+Setiap view yang menulis Transaction menghitung delta (total, count) per
+(user_id, year_month, category_id) lalu memanggil ``apply_rollup_deltas`` dengan
+session request yang sama, sehingga rollup ikut di-commit atau di-abort
+bersama transaksinya.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import delete, extract, func, insert, select, update
+from zope.sqlalchemy import mark_changed
+
+from .mymodel import MonthlyCategoryTotal, Transaction
+from .versioning import bump_month_versions, rollup_months
+
+CENT = Decimal('0.01')
+
+
+def to_cents(amount):
+    """
+    Membulatkan jumlah ke dua desimal dengan ROUND_HALF_UP (menjauhi nol),
+    sama dengan kolom Numeric(15, 2) di PostgreSQL. Baris transactions dan
+    delta rollup harus memakai Decimal hasil fungsi ini agar tidak selisih.
+    """
+    return Decimal(str(amount)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def year_month(day):
+    return day.strftime('%Y-%m')
+
+
+def rollup_snapshot(t):
+    """
+    Menyimpan nilai Transaction yang relevan untuk rollup. Ambil snapshot
+    sebelum objek diubah agar bulan dan kategori lama tetap diketahui.
+    """
+    return (t.user_id, t.date, t.category_id, t.amount)
+
+
+def add_rollup_delta(deltas, user_id, day, category_id, amount, count=1):
+    """
+    Menambahkan delta ke dict ``{(user_id, year_month, category_id): (total, count)}``.
+    Untuk menghapus kontribusi sebuah transaksi, kirim amount negatif dan count=-1.
+    """
+    key = (user_id, year_month(day), category_id)
+    total, n = deltas.get(key, (Decimal(0), 0))
+    deltas[key] = (total + to_cents(amount), n + count)
+    return deltas
+
+
+def transaction_deltas(before=None, after=None):
+    """
+    Delta rollup untuk satu transaksi: ``before``/``after`` adalah hasil
+    ``rollup_snapshot`` (None untuk create atau delete).
+    """
+    deltas = {}
+    if before is not None:
+        user_id, day, category_id, amount = before
+        add_rollup_delta(deltas, user_id, day, category_id, -to_cents(amount), count=-1)
+    if after is not None:
+        user_id, day, category_id, amount = after
+        add_rollup_delta(deltas, user_id, day, category_id, amount)
+    return deltas
+
+
+def apply_transaction_change(dbsession, before=None, after=None):
+    apply_rollup_deltas(dbsession, transaction_deltas(before, after))
+
+
+def _upsert_statement(dialect_name, values):
+    table = MonthlyCategoryTotal.__table__
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year_month, table.c.category_id],
+        set_={
+            'total': table.c.total + stmt.excluded.total,
+            'count': table.c.count + stmt.excluded.count,
+        },
+    )
+
+
+def apply_rollup_deltas(dbsession, deltas):
+    """
+    Menerapkan delta ke ``monthly_category_totals`` dengan upsert, lalu menghapus
+    baris yang tidak lagi memiliki transaksi. Versi setiap bulan yang muncul di
+    ``deltas`` ikut dinaikkan, termasuk delta nol (misalnya hanya deskripsi
+    yang berubah) karena isi ringkasan bulan itu tetap berubah.
+    """
+    table = MonthlyCategoryTotal.__table__
+    dialect_name = dbsession.get_bind().dialect.name
+    emptied = []
+
+    for (user_id, ym, category_id), (total, count) in deltas.items():
+        if not total and not count:
+            continue
+        key = dict(user_id=user_id, year_month=ym, category_id=category_id)
+        stmt = _upsert_statement(dialect_name, dict(key, total=total, count=count))
+        if stmt is not None:
+            dbsession.execute(stmt)
+        else:
+            # Fallback untuk database tanpa ON CONFLICT: update dulu, insert jika belum ada
+            result = dbsession.execute(
+                update(table)
+                .where(table.c.user_id == user_id, table.c.year_month == ym, table.c.category_id == category_id)
+                .values(total=table.c.total + total, count=table.c.count + count)
+            )
+            if result.rowcount == 0:
+                dbsession.execute(insert(table).values(**key, total=total, count=count))
+        if count < 0:
+            emptied.append(key)
+
+    for key in emptied:
+        dbsession.execute(
+            delete(table).where(
+                table.c.user_id == key['user_id'],
+                table.c.year_month == key['year_month'],
+                table.c.category_id == key['category_id'],
+                table.c.count <= 0,
+            )
+        )
+
+    if deltas:
+        bump_month_versions(dbsession, ((user_id, ym) for user_id, ym, _ in deltas))
+        # Statement Core tidak ditandai otomatis oleh zope.sqlalchemy
+        mark_changed(dbsession)
+
+
+def rebuild_monthly_totals(dbsession, user_id=None, chunk_size=1000, user_ids=None):
+    """
+    Menghitung ulang rollup dari tabel transactions (semua pengguna, satu
+    pengguna, atau daftar ``user_ids``). Dipakai untuk backfill dan perbaikan data.
+    """
+    if user_id is not None:
+        user_ids = [user_id]
+    table = MonthlyCategoryTotal.__table__
+    cleanup = delete(table)
+    source = select(
+        Transaction.user_id,
+        Transaction.category_id,
+        extract('year', Transaction.date).label('year'),
+        extract('month', Transaction.date).label('month'),
+        func.sum(Transaction.amount).label('total'),
+        func.count(Transaction.id).label('count'),
+    ).group_by(
+        Transaction.user_id,
+        Transaction.category_id,
+        extract('year', Transaction.date),
+        extract('month', Transaction.date),
+    )
+    if user_ids is not None:
+        cleanup = cleanup.where(table.c.user_id.in_(user_ids))
+        source = source.where(Transaction.user_id.in_(user_ids))
+
+    # Bulan sebelum dan sesudah rebuild dianggap berubah: data bisa saja
+    # dimuat di luar API sehingga versi bulannya belum pernah dinaikkan
+    touched = rollup_months(dbsession, user_ids=user_ids)
+    dbsession.execute(cleanup)
+
+    rows_written = 0
+    batch = []
+    for row in dbsession.execute(source):
+        batch.append({
+            'user_id': row.user_id,
+            'year_month': f'{int(row.year):04d}-{int(row.month):02d}',
+            'category_id': row.category_id,
+            'total': row.total,
+            'count': row.count,
+        })
+        if len(batch) >= chunk_size:
+            dbsession.execute(insert(table), batch)
+            rows_written += len(batch)
+            batch = []
+    if batch:
+        dbsession.execute(insert(table), batch)
+        rows_written += len(batch)
+
+    bump_month_versions(dbsession, touched + rollup_months(dbsession, user_ids=user_ids))
+    mark_changed(dbsession)
+    return rows_written
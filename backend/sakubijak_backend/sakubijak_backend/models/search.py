@@ -0,0 +1,104 @@
+"""
+Pencarian full-text deskripsi transaksi (``GET /api/transactions?q=``).
+
+- PostgreSQL: index GIN ekspresi ``to_tsvector('simple', coalesce(description, ''))``
+  (didefinisikan di Transaction.__table_args__). Konfigurasi 'simple' dipakai
+  karena deskripsi berbahasa campuran dan tidak perlu stemming.
+- SQLite: tabel virtual FTS5 ``transactions_fts`` (external content) yang
+  dijaga sinkron oleh trigger insert/update/delete pada ``transactions``.
+- Dialek lain: LIKE per kata, tanpa index dan tanpa ranking.
+
+Setiap kata pada ``q`` dicocokkan sebagai prefix dan semua kata harus ada
+(AND), sehingga "kop sus" menemukan "Kopi susu".
+"""
+import re
+
+from sqlalchemy import DDL, and_, column, event, func, literal_column, table
+
+from .mymodel import Transaction
+
+SEARCH_CONFIG = 'simple'
+MAX_SEARCH_TERMS = 8
+
+FTS_TABLE = 'transactions_fts'
+
+# Kata: huruf/angka unicode; tanda baca dan operator sintaks FTS dibuang
+_SEARCH_TERM = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description, content='transactions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+fts = table(FTS_TABLE, column('rowid'), column('rank'))
+
+# metadata.create_all()/drop_all() (test, benchmark) ikut membuat/menghapus
+# tabel FTS di SQLite; database yang dikelola alembic memakai migrasinya
+for statement in SQLITE_FTS_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(
+    Transaction.__table__, 'before_drop',
+    DDL(f'DROP TABLE IF EXISTS {FTS_TABLE}').execute_if(dialect='sqlite'),
+)
+
+
+def search_terms(text):
+    """
+    Memecah input pencarian menjadi kata (huruf kecil, maksimal MAX_SEARCH_TERMS).
+    """
+    return [term.lower() for term in _SEARCH_TERM.findall(text or '')][:MAX_SEARCH_TERMS]
+
+
+def description_vector():
+    # Harus identik dengan ekspresi index GIN agar planner memakainya
+    return func.to_tsvector(
+        literal_column(f"'{SEARCH_CONFIG}'"), func.coalesce(Transaction.description, literal_column("''"))
+    )
+
+
+def apply_search(statement, dialect_name, terms):
+    """
+    Menambahkan kondisi pencarian ke ``statement`` (Query ORM atau Select).
+    Mengembalikan (statement, rank); ``rank`` diurutkan naik (nilai kecil =
+    lebih relevan) atau None jika dialek tidak mendukung ranking.
+    """
+    if dialect_name == 'postgresql':
+        tsquery = func.to_tsquery(
+            literal_column(f"'{SEARCH_CONFIG}'"), ' & '.join(f'{term}:*' for term in terms)
+        )
+        vector = description_vector()
+        return statement.where(vector.op('@@')(tsquery)), -func.ts_rank(vector, tsquery)
+
+    if dialect_name == 'sqlite':
+        # Setiap kata dikutip agar tidak dibaca sebagai operator FTS5 (AND, NEAR, ...)
+        match = ' '.join(f'"{term}"*' for term in terms)
+        hits = (
+            statement.join(fts, fts.c.rowid == Transaction.id)
+            .where(literal_column(FTS_TABLE).op('MATCH')(match))
+        )
+        # rank FTS5 = bm25(), negatif; makin kecil makin relevan
+        return hits, fts.c.rank
+
+    return statement.where(and_(*(
+        func.lower(Transaction.description).contains(term, autoescape=True) for term in terms
+    ))), None
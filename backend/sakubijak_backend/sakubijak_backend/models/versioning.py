@@ -0,0 +1,122 @@
+"""
+Versi data per pengguna (``users.data_version``) dan per bulan
+(``monthly_data_versions``).
+
+Setiap penulisan transaksi atau kategori menaikkan versi dalam transaksi
+database yang sama. View baca memakai versi ini sebagai dasar ETag dan kunci
+cache sehingga respons yang di-cache otomatis usang begitu data berubah, juga
+lintas proses worker.
+
+Versi per bulan lebih sempit: hanya naik untuk bulan yang benar-benar
+tersentuh (tanggal lama dan baru transaksi, lihat rollup.apply_rollup_deltas),
+sehingga ringkasan bulan lalu tetap valid meskipun pengguna terus mencatat
+transaksi bulan ini. Versi bulan disertai token acak (lihat
+``MonthlyDataVersion``) karena body-nya disimpan di disk dan bertahan
+melewati restart maupun reset database.
+"""
+import secrets
+
+from sqlalchemy import insert, select, update
+from zope.sqlalchemy import mark_changed
+
+from .mymodel import MonthlyCategoryTotal, MonthlyDataVersion, User
+
+
+def bump_data_version(dbsession, user_id):
+    dbsession.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    mark_changed(dbsession)
+
+
+def get_data_version(dbsession, user_id):
+    return dbsession.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+
+def get_month_version(dbsession, user_id, ym):
+    return dbsession.query(MonthlyDataVersion.version).filter(
+        MonthlyDataVersion.user_id == user_id,
+        MonthlyDataVersion.year_month == ym,
+    ).scalar() or 0
+
+
+def get_month_stamp(dbsession, user_id, ym):
+    """
+    Versi bulan beserta tokennya (``'<version>.<token>'``), atau ``'0'`` untuk
+    bulan tanpa baris. Dipakai sebagai bagian ETag yang divalidasi cache disk.
+    """
+    row = dbsession.query(MonthlyDataVersion.version, MonthlyDataVersion.token).filter(
+        MonthlyDataVersion.user_id == user_id,
+        MonthlyDataVersion.year_month == ym,
+    ).first()
+    if row is None:
+        return '0'
+    return f'{row.version}.{row.token}'
+
+
+def rollup_months(dbsession, user_id=None, user_ids=None):
+    """
+    Pasangan (user_id, year_month) yang punya baris rollup, yaitu bulan yang
+    ringkasannya bisa memuat data (dan nama kategori) pengguna.
+    """
+    query = select(MonthlyCategoryTotal.user_id, MonthlyCategoryTotal.year_month).distinct()
+    if user_id is not None:
+        query = query.where(MonthlyCategoryTotal.user_id == user_id)
+    if user_ids is not None:
+        query = query.where(MonthlyCategoryTotal.user_id.in_(user_ids))
+    return [tuple(row) for row in dbsession.execute(query)]
+
+
+def _upsert_statement(dialect_name):
+    table = MonthlyDataVersion.__table__
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year_month],
+        set_={'version': table.c.version + 1, 'token': stmt.excluded.token},
+    )
+
+
+def bump_month_versions(dbsession, keys):
+    """
+    Menaikkan versi untuk setiap pasangan (user_id, year_month) di ``keys``.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    table = MonthlyDataVersion.__table__
+    stmt = _upsert_statement(dbsession.get_bind().dialect.name)
+    rows = [
+        {'user_id': user_id, 'year_month': ym, 'version': 1, 'token': secrets.token_hex(8)}
+        for user_id, ym in keys
+    ]
+    if stmt is not None:
+        dbsession.execute(stmt, rows)
+    else:
+        # Fallback untuk database tanpa ON CONFLICT: update dulu, insert jika belum ada
+        for row in rows:
+            result = dbsession.execute(
+                update(table)
+                .where(table.c.user_id == row['user_id'], table.c.year_month == row['year_month'])
+                .values(version=table.c.version + 1, token=row['token'])
+            )
+            if result.rowcount == 0:
+                dbsession.execute(insert(table).values(**row))
+    mark_changed(dbsession)
+
+
+def bump_user_month_versions(dbsession, user_id):
+    """
+    Menaikkan versi semua bulan milik pengguna, untuk perubahan yang tampil di
+    setiap bulan (nama kategori) atau yang bulannya tidak diketahui.
+    """
+    bump_month_versions(dbsession, rollup_months(dbsession, user_id))
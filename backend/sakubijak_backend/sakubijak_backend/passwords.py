@@ -0,0 +1,170 @@
+"""
+Hashing password bcrypt di luar thread WSGI.
+
+bcrypt sengaja dibuat mahal (ratusan milidetik per hash). Jika dijalankan
+langsung di thread waitress, lonjakan login membuat semua thread sibuk dan
+request CRUD yang murah ikut tertahan. ``PasswordHasher`` menjalankan hashing
+di process pool berukuran tetap dengan batas antrean; jika pool penuh, pemanggil
+langsung mendapat ``HasherSaturated`` sehingga view bisa menjawab 503 +
+Retry-After alih-alih mengantre tanpa batas. Hash yang melewati batas waktu
+atau worker yang mati dilaporkan sebagai ``HasherUnavailable`` (induk
+``HasherSaturated``) agar view menjawab dengan 503 yang sama.
+"""
+import math
+import multiprocessing
+import threading
+import time
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+# Batas bawah/atas rounds bcrypt saat kalibrasi otomatis. Batas bawah sama
+# dengan default passlib (12): kalibrasi hanya boleh menaikkan biaya hash
+MIN_ROUNDS = 12
+MAX_ROUNDS = 16
+
+
+class HasherUnavailable(Exception):
+    """Hashing tidak bisa dilayani saat ini (pool penuh, timeout, atau worker mati)."""
+
+
+class HasherSaturated(HasherUnavailable):
+    """Pool hashing dan antreannya penuh."""
+
+
+def make_context(rounds=None):
+    """
+    CryptContext bcrypt. Jika ``rounds`` diberikan, hash dengan rounds lebih kecil
+    dianggap usang (needs_update) sehingga di-rehash saat login berikutnya.
+    """
+    if rounds:
+        return CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+        )
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def calibrate_rounds(target_ms, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """
+    Memilih rounds bcrypt terbesar yang waktu hash-nya masih <= ``target_ms`` di
+    mesin ini. Setiap kenaikan satu round menggandakan biaya, jadi cukup satu
+    pengukuran pada rounds kecil lalu diekstrapolasi.
+    """
+    probe_rounds = 8
+    context = make_context(probe_rounds)
+    started = time.perf_counter()
+    context.hash('kalibrasi-bcrypt')
+    probe_ms = max((time.perf_counter() - started) * 1000, 0.01)
+    rounds = probe_rounds + int(math.floor(math.log2(target_ms / probe_ms)))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+# Fungsi-fungsi di bawah dijalankan di proses worker pool
+_worker_context = None
+
+
+def _init_worker(rounds):
+    global _worker_context
+    _worker_context = make_context(rounds)
+
+
+def _hash(password):
+    return _worker_context.hash(password)
+
+
+def _verify_and_update(password, hashed_password):
+    return _worker_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Hash/verifikasi password bcrypt. Dengan ``workers=0`` hashing berjalan
+    inline di thread pemanggil (dipakai di test dan script).
+    """
+    def __init__(self, rounds=None, workers=0, queue_depth=0, timeout=10.0):
+        self.rounds = rounds
+        self.context = make_context(rounds)
+        self.timeout = timeout
+        self.executor = None
+        self.slots = None
+        if workers > 0:
+            # 'spawn' agar proses worker tidak mewarisi koneksi database dari proses induk
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(rounds,),
+            )
+            # Admission control: maksimal `workers` hash berjalan + `queue_depth` menunggu
+            self.slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def _run(self, func, inline, *args):
+        if self.executor is None:
+            return inline(*args)
+        if not self.slots.acquire(blocking=False):
+            raise HasherSaturated()
+        try:
+            future = self.executor.submit(func, *args)
+        except BrokenProcessPool:
+            self.slots.release()
+            raise HasherUnavailable()
+        # Slot baru dikembalikan saat job selesai (atau batal), bukan saat pemanggil
+        # berhenti menunggu: job yang timeout tetap memakai worker sampai selesai
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            # Hanya berhasil untuk job yang masih di antrean
+            future.cancel()
+            raise HasherUnavailable()
+        except BrokenProcessPool:
+            raise HasherUnavailable()
+
+    def hash(self, password):
+        return self._run(_hash, self.context.hash, password)
+
+    def verify_and_update(self, password, hashed_password):
+        """
+        Mengembalikan (valid, new_hash). ``new_hash`` berisi hash baru jika hash
+        tersimpan sudah usang (misalnya rounds lebih kecil dari konfigurasi saat ini).
+        """
+        return self._run(_verify_and_update, self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+
+def hasher_from_settings(settings):
+    """
+    Membuat PasswordHasher dari settings ``auth.*``:
+
+    - auth.hash_workers: jumlah proses bcrypt (0 = inline, default). Pool
+      hanya dibuat jika diatur eksplisit, sehingga script dan test yang
+      memanggil ``main()`` tidak menjalankan proses tambahan
+    - auth.hash_queue_depth: jumlah permintaan yang boleh menunggu sebelum 503
+    - auth.hash_timeout: batas waktu tunggu hasil hash (detik)
+    - auth.bcrypt_rounds: rounds bcrypt tetap, atau
+    - auth.bcrypt_target_ms: kalibrasi rounds otomatis ke target latensi ini
+    """
+    workers = int(settings.get('auth.hash_workers', 0))
+    queue_depth = int(settings.get('auth.hash_queue_depth', workers * 4))
+    timeout = float(settings.get('auth.hash_timeout', 10))
+    rounds = settings.get('auth.bcrypt_rounds')
+    target_ms = settings.get('auth.bcrypt_target_ms')
+    if rounds:
+        rounds = int(rounds)
+    elif target_ms:
+        rounds = calibrate_rounds(float(target_ms))
+    else:
+        rounds = None
+    return PasswordHasher(rounds=rounds, workers=workers, queue_depth=queue_depth, timeout=timeout)
+
+
+def includeme(config):
+    config.registry['password_hasher'] = hasher_from_settings(config.get_settings())
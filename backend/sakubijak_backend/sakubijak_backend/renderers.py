@@ -0,0 +1,53 @@
+"""
+Renderer JSON proyek. Memakai orjson jika terpasang (jauh lebih cepat untuk
+daftar besar) dan jatuh ke modul json standar jika tidak. Decimal, date dan
+datetime di-encode langsung oleh renderer sehingga view cukup mengembalikan
+nilai kolom apa adanya.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+
+def _default(obj):
+    # Decimal dikirim sebagai angka (bukan string) agar kompatibel dengan frontend
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f'Objek bertipe {type(obj).__name__} tidak bisa di-encode ke JSON')
+
+
+def dumps(value):
+    """
+    Meng-encode ``value`` menjadi bytes JSON (UTF-8).
+    """
+    if orjson is not None:
+        # orjson menangani date/datetime sendiri; _default hanya dipanggil untuk Decimal
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class JSONRenderer:
+    """
+    Pengganti renderer 'json' bawaan Pyramid yang memakai ``dumps`` di atas.
+    """
+    def __init__(self, info):
+        pass
+
+    def __call__(self, value, system):
+        request = system.get('request')
+        if request is not None:
+            response = request.response
+            if response.content_type == response.default_content_type:
+                response.content_type = 'application/json'
+        return dumps(value)
+
+
+def includeme(config):
+    config.add_renderer('json', JSONRenderer)
@@ -0,0 +1,45 @@
+"""
+Tween terluar yang memberi setiap request sebuah request id, menjadikannya
+konteks untuk semua log selama request (lihat logutil.QueueingHandler) dan
+menulis satu baris access log dengan status dan latensi.
+"""
+import logging
+import re
+import time
+import uuid
+
+from pyramid.tweens import INGRESS
+
+from .logutil import current_request
+
+access_log = logging.getLogger('sakubijak_backend.access')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Request id dari proxy hanya dipakai jika formatnya wajar
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestLogTweenFactory:
+    def __init__(self, handler, registry):
+        self.handler = handler
+        self.registry = registry
+
+    def __call__(self, request):
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        request.request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        request.log_started = time.perf_counter()
+        token = current_request.set(request)
+        try:
+            response = self.handler(request)
+            response.headers[REQUEST_ID_HEADER] = request.request_id
+            if access_log.isEnabledFor(logging.INFO):
+                access_log.info('%s %s %s', request.method, request.path, response.status_code,
+                                extra={'status': response.status_code})
+            return response
+        finally:
+            current_request.reset(token)
+
+
+def includeme(config):
+    config.add_tween('sakubijak_backend.request_log_tween.RequestLogTweenFactory',
+                     under=INGRESS)
@@ -15,7 +15,14 @@ def includeme(config):
     
     # Rute untuk API Transaksi (Protected)
     config.add_route('api_transactions_collection', '/api/transactions')
+    # Harus didaftarkan sebelum api_transaction_item agar 'export'/'batch'/'import' tidak dianggap ID
+    config.add_route('api_transactions_export', '/api/transactions/export')
+    config.add_route('api_transactions_batch', '/api/transactions/batch')
+    config.add_route('api_transactions_import', '/api/transactions/import')
     config.add_route('api_transaction_item', '/api/transactions/{transaction_id}')
 
     # API Dashboard
-    config.add_route('api_dashboard_summary', '/api/dashboard/summary')
\ No newline at end of file
+    config.add_route('api_dashboard_summary', '/api/dashboard/summary')
+
+    # API Analitik
+    config.add_route('api_analytics_timeseries', '/api/analytics/timeseries')
\ No newline at end of file
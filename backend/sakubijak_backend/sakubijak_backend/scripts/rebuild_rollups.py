@@ -0,0 +1,48 @@
+import argparse
+import sys
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+
+from ..models.rollup import rebuild_monthly_totals
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Backfill / rebuild tabel monthly_category_totals dari tabel transactions.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--user-id',
+        type=int,
+        default=None,
+        help='Hanya rebuild rollup untuk satu pengguna (default: semua pengguna).',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    try:
+        with env['request'].tm:
+            dbsession = env['request'].dbsession
+            rows = rebuild_monthly_totals(dbsession, user_id=args.user_id)
+        print(f'Rollup monthly_category_totals dibangun ulang: {rows} baris.')
+    except OperationalError:
+        print('''
+Pyramid is having a problem using your SQL database.  The problem
+might be caused by one of the following things:
+
+1.  You may need to initialize your database tables with `alembic`.
+    Check your README.txt for description and try to run it.
+
+2.  Your database server may not be running.  Check that the
+    database server referred to by the "sqlalchemy.url" setting in
+    your "development.ini" file is running.
+            ''')
@@ -0,0 +1,244 @@
+import argparse
+import csv
+import datetime
+import io
+import random
+import sys
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+from zope.sqlalchemy import mark_changed
+
+from ..models import Category, Transaction, User
+from ..models.rollup import rebuild_monthly_totals
+from ..passwords import make_context
+
+# Ukuran dasar untuk --scale 1 (dikalikan dengan --scale)
+BASE_USERS = 100
+BASE_TRANSACTIONS = 100000
+DEFAULT_CATEGORIES = 10
+DEFAULT_YEARS = 3
+DEFAULT_PASSWORD = 'password123'
+CHUNK_SIZE = 5000
+
+TRANSACTION_COLUMNS = ['description', 'amount', 'date', 'category_id', 'user_id', 'created_at', 'updated_at']
+
+# Nama kategori beserta contoh deskripsi dan median nominal (Rupiah)
+CATEGORY_PROFILES = [
+    ('Makanan', ['Nasi goreng', 'Kopi', 'Makan siang', 'Bakso', 'Martabak'], 35000),
+    ('Transportasi', ['Ojek online', 'Bensin', 'Parkir', 'Tiket KRL', 'Tol'], 25000),
+    ('Belanja', ['Supermarket', 'Pakaian', 'Marketplace', 'Minimarket'], 150000),
+    ('Tagihan', ['Listrik', 'Air PDAM', 'Internet', 'Pulsa', 'BPJS'], 300000),
+    ('Hiburan', ['Bioskop', 'Langganan streaming', 'Konser', 'Game'], 75000),
+    ('Kesehatan', ['Apotek', 'Dokter', 'Vitamin', 'Laboratorium'], 120000),
+    ('Pendidikan', ['Buku', 'Kursus online', 'Alat tulis', 'Seminar'], 200000),
+    ('Donasi', ['Zakat', 'Sedekah', 'Galang dana'], 50000),
+    ('Rumah', ['Sewa kos', 'Perabot', 'Servis AC', 'Laundry'], 400000),
+    ('Lainnya', ['Hadiah', 'Potong rambut', 'Biaya admin'], 40000),
+]
+
+
+class SeedExistsError(ValueError):
+    """
+    Email pengguna untuk seed ini sudah ada di database (seed yang sama
+    dijalankan dua kali).
+    """
+
+
+def seed_email(seed, index):
+    return f'seed{seed}.user{index}@example.com'
+
+
+def transactions_per_user(rng, users, total):
+    """
+    Membagi ``total`` transaksi ke pengguna dengan distribusi berekor panjang
+    (sebagian kecil pengguna sangat aktif), seperti data produksi.
+    """
+    weights = [rng.paretovariate(1.5) for _ in range(users)]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    # Sisa pembulatan diberikan ke pengguna pertama agar total tepat
+    counts[0] += total - sum(counts)
+    return counts
+
+
+def generate_transactions(rng, user_id, categories, count, years, end_date, now):
+    """
+    Menghasilkan dict baris transaksi untuk satu pengguna. ``categories`` berisi
+    pasangan (category_id, profil) milik pengguna tersebut.
+    """
+    days = 365 * years
+    # Tiap pengguna punya preferensi kategori sendiri
+    weights = [rng.random() ** 2 + 0.05 for _ in categories]
+    for _ in range(count):
+        category_id, (_, descriptions, median) = rng.choices(categories, weights)[0]
+        # Transaksi lebih rapat di periode terbaru
+        day = end_date - datetime.timedelta(days=int(days * rng.random() ** 1.5))
+        amount = round(median * rng.lognormvariate(0, 0.6), -2) or 100
+        yield {
+            'description': rng.choice(descriptions),
+            'amount': amount,
+            'date': day,
+            'category_id': category_id,
+            'user_id': user_id,
+            'created_at': now,
+            'updated_at': now,
+        }
+
+
+def insert_rows(dbsession, rows):
+    """
+    Menulis satu chunk transaksi: COPY untuk PostgreSQL (psycopg2), selain itu
+    INSERT multi-baris lewat Core.
+    """
+    connection = dbsession.connection()
+    if connection.dialect.driver == 'psycopg2':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in TRANSACTION_COLUMNS])
+        buffer.seek(0)
+        cursor = connection.connection.driver_connection.cursor()
+        cursor.copy_expert(
+            f"COPY transactions ({', '.join(TRANSACTION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    else:
+        dbsession.execute(Transaction.__table__.insert(), rows)
+    mark_changed(dbsession)
+
+
+def seed_database(dbsession, users, transactions, categories=DEFAULT_CATEGORIES, years=DEFAULT_YEARS,
+                  seed=1, end_date=None, hashed_password=None, chunk_size=CHUNK_SIZE):
+    """
+    Mengisi database dengan ``users`` pengguna, ``categories`` kategori per
+    pengguna dan total ``transactions`` transaksi tersebar selama ``years``
+    tahun sampai ``end_date`` (default hari ini). Semua nilai acak berasal dari
+    ``random.Random(seed)`` sehingga dengan seed dan end_date yang sama hasilnya
+    identik. Mengembalikan daftar ID pengguna yang dibuat.
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    end_date = end_date or now.date()
+    if hashed_password is None:
+        hashed_password = make_context().hash(DEFAULT_PASSWORD)
+
+    emails = [seed_email(seed, i) for i in range(users)]
+    if dbsession.query(User.id).filter(User.email.in_(emails)).first() is not None:
+        raise SeedExistsError(f'Seed {seed} sudah pernah dimuat ke database ini; gunakan --seed lain.')
+
+    dbsession.execute(User.__table__.insert(), [
+        {'name': f'Pengguna {i}', 'email': seed_email(seed, i), 'hashed_password': hashed_password}
+        for i in range(users)
+    ])
+    user_ids = [
+        user_id for (user_id,) in dbsession.query(User.id)
+        .filter(User.email.in_(emails))
+        .order_by(User.id)
+    ]
+
+    profiles = [CATEGORY_PROFILES[j % len(CATEGORY_PROFILES)] for j in range(categories)]
+    dbsession.execute(Category.__table__.insert(), [
+        {'name': name if j < len(CATEGORY_PROFILES) else f'{name} {j}', 'description': 'Data seed', 'user_id': user_id}
+        for user_id in user_ids for j, (name, _, _) in enumerate(profiles)
+    ])
+    user_categories = {}
+    for category_id, user_id in (
+        dbsession.query(Category.id, Category.user_id)
+        .filter(Category.user_id.in_(user_ids))
+        .order_by(Category.id)
+    ):
+        user_categories.setdefault(user_id, []).append(category_id)
+
+    chunk = []
+    for user_id, count in zip(user_ids, transactions_per_user(rng, len(user_ids), transactions)):
+        categories_for_user = list(zip(user_categories[user_id], profiles))
+        for row in generate_transactions(rng, user_id, categories_for_user, count, years, end_date, now):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                insert_rows(dbsession, chunk)
+                chunk = []
+    if chunk:
+        insert_rows(dbsession, chunk)
+
+    # Rollup bulanan dibangun sekali di akhir, bukan per baris seperti jalur API;
+    # hanya untuk pengguna seed ini agar data lain di database tidak ditulis ulang
+    rebuild_monthly_totals(dbsession, user_ids=user_ids)
+    return user_ids
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Mengisi database dengan data transaksi sintetis dalam jumlah besar (deterministik per seed).',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument('--seed', type=int, default=1, help='Seed generator acak (default: 1).')
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help=f'Pengali ukuran data: 1 = {BASE_USERS} pengguna, {BASE_TRANSACTIONS} transaksi (default: 1).',
+    )
+    parser.add_argument('--users', type=int, default=None, help='Jumlah pengguna (menimpa --scale).')
+    parser.add_argument('--transactions', type=int, default=None, help='Total transaksi (menimpa --scale).')
+    parser.add_argument('--categories', type=int, default=DEFAULT_CATEGORIES, help='Kategori per pengguna.')
+    parser.add_argument('--years', type=int, default=DEFAULT_YEARS, help='Rentang tahun transaksi.')
+    parser.add_argument(
+        '--end-date', type=datetime.date.fromisoformat, default=None,
+        help='Tanggal transaksi terakhir, YYYY-MM-DD (default: hari ini).',
+    )
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Baris per INSERT/COPY.')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password semua pengguna seed.')
+    args = parser.parse_args(argv[1:])
+    if args.users is not None and args.users < 1:
+        parser.error('--users minimal 1.')
+    if args.scale <= 0:
+        parser.error('--scale harus lebih besar dari 0.')
+    if args.transactions is not None and args.transactions < 0:
+        parser.error('--transactions tidak boleh negatif.')
+    if args.categories < 1:
+        parser.error('--categories minimal 1.')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size minimal 1.')
+    return args
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    users = args.users if args.users is not None else max(1, round(BASE_USERS * args.scale))
+    transactions = args.transactions if args.transactions is not None else round(BASE_TRANSACTIONS * args.scale)
+
+    try:
+        with env['request'].tm:
+            dbsession = env['request'].dbsession
+            seed_database(
+                dbsession,
+                users=users,
+                transactions=transactions,
+                categories=args.categories,
+                years=args.years,
+                seed=args.seed,
+                end_date=args.end_date,
+                hashed_password=make_context().hash(args.password),
+                chunk_size=args.chunk_size,
+            )
+        print(f'Seed {args.seed}: {users} pengguna, {users * args.categories} kategori, {transactions} transaksi.')
+        print(f'Login contoh: {seed_email(args.seed, 0)} / {args.password}')
+    except SeedExistsError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except OperationalError:
+        print('''
+Pyramid is having a problem using your SQL database.  The problem
+might be caused by one of the following things:
+
+1.  You may need to initialize your database tables with `alembic`.
+    Check your README.txt for description and try to run it.
+
+2.  Your database server may not be running.  Check that the
+    database server referred to by the "sqlalchemy.url" setting in
+    your "development.ini" file is running.
+            ''')
@@ -1,8 +1,10 @@
+import hashlib
 import jwt
 from pyramid.authentication import CallbackAuthenticationPolicy
 from pyramid.interfaces import IAuthenticationPolicy
 from zope.interface import implementer
 
+from .cache import LRUCache
 from .models import User
 
 from pyramid.security import (
@@ -13,11 +15,25 @@ from pyramid.security import (
 
 @implementer(IAuthenticationPolicy)
 class JWTAuthenticationPolicy(CallbackAuthenticationPolicy):
-    def __init__(self, secret_key, algorithm='HS256', realm='Realm', auth_type='Bearer'):
+    def __init__(self, secret_key, algorithm='HS256', realm='Realm', auth_type='Bearer', cache_size=1024):
         self.secret_key = secret_key
         self.algorithm = algorithm
         self.realm = realm
         self.auth_type = auth_type.lower() # Simpan dalam lowercase untuk perbandingan case-insensitive
+        # Cache klaim token yang sudah diverifikasi: sha256(token) -> user_id,
+        # kedaluwarsa bersamaan dengan klaim 'exp' token. cache_size=0 menonaktifkan cache.
+        self.token_cache = LRUCache(maxsize=cache_size)
+
+    def cache_stats(self):
+        """
+        Statistik cache token (untuk monitoring).
+        """
+        return {
+            'size': len(self.token_cache),
+            'maxsize': self.token_cache.maxsize,
+            'hits': self.token_cache.hits,
+            'misses': self.token_cache.misses,
+        }
 
     def unauthenticated_userid(self, request):
         """
@@ -42,6 +58,13 @@ class JWTAuthenticationPolicy(CallbackAuthenticationPolicy):
         if not token:
             return None
 
+        # Token yang sama dipakai berulang kali sampai kedaluwarsa, jadi hasil
+        # verifikasinya di-cache agar tidak perlu HMAC verify + parse JSON setiap request
+        cache_key = hashlib.sha256(token.encode('utf-8')).digest()
+        cached_user_id = self.token_cache.get(cache_key)
+        if cached_user_id is not None:
+            return cached_user_id
+
         try:
             # Decode token
             payload = jwt.decode(
@@ -51,6 +74,8 @@ class JWTAuthenticationPolicy(CallbackAuthenticationPolicy):
             )
 
             user_id = payload.get('user_id')
+            if user_id is not None:
+                self.token_cache.set(cache_key, user_id, expires_at=payload.get('exp'))
             return user_id # Kembalikan user_id dari payload token
 
         except jwt.ExpiredSignatureError:
@@ -0,0 +1,167 @@
+"""
+Instrumentasi SQL per request: jumlah statement dan total waktu database
+dikumpulkan lewat event engine SQLAlchemy, dikirim sebagai header
+``Server-Timing`` dan dicatat ke log jika melewati anggaran.
+
+Setting::
+
+    sakubijak.sql.server_timing = true
+    sakubijak.sql.max_queries = 20     # 0 = tanpa batas
+    sakubijak.sql.max_db_ms = 500      # 0 = tanpa batas
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+
+from pyramid.settings import asbool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+# Statistik request yang sedang berjalan (None di luar request). ContextVar,
+# bukan thread-local: di bawah asgi.py beberapa request bergantian di thread
+# event loop yang sama
+_stats = contextvars.ContextVar('sakubijak_sql_stats', default=None)
+_listeners_lock = threading.Lock()
+_listeners_installed = False
+
+# Jumlah fingerprint yang dicantumkan di log saat anggaran terlampaui
+MAX_LOGGED_FINGERPRINTS = 5
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%\([^)]*\)s|:\w+|__\[POSTCOMPILE_\w+\])(?:\s*,\s*(?:\?|%\([^)]*\)s|:\w+))*\s*\)')
+_VALUES_LIST = re.compile(r'(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    """
+    Menormalkan SQL agar statement yang sama dengan parameter berbeda
+    dikelompokkan: literal, daftar IN (...) dan VALUES multi-baris diringkas.
+    """
+    sql = _WHITESPACE.sub(' ', statement).strip()
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(?)', sql)
+    sql = _VALUES_LIST.sub(r'\1, ...', sql)
+    return sql
+
+
+class QueryStats:
+    """
+    Akumulator statement SQL untuk satu request.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = {}  # fingerprint -> [jumlah, detik]
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        entry = self.fingerprints.setdefault(fingerprint(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000.0
+
+    def top_fingerprints(self, limit=MAX_LOGGED_FINGERPRINTS):
+        ranked = sorted(self.fingerprints.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        return [(sql, count, elapsed * 1000.0) for sql, (count, elapsed) in ranked[:limit]]
+
+
+def current_stats():
+    return _stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault('sakubijak.query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    starts = conn.info.get('sakubijak.query_start')
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(context):
+    # Statement yang gagal tidak memanggil after_cursor_execute; tanpa ini waktu
+    # mulainya tertinggal di conn.info, yang ikut terbawa ke checkout pool berikutnya
+    conn = context.connection
+    starts = conn.info.get('sakubijak.query_start') if conn is not None else None
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = current_stats()
+    if stats is not None and context.statement is not None:
+        stats.record(context.statement, elapsed)
+
+
+def install_listeners():
+    """
+    Memasang listener di kelas Engine (berlaku untuk semua engine, termasuk
+    yang dibuat setelahnya) tepat satu kali per proses.
+    """
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
+
+
+class SQLTimingTweenFactory:
+    def __init__(self, handler, registry):
+        self.handler = handler
+        self.registry = registry
+        settings = registry.settings
+        self.server_timing = asbool(settings.get('sakubijak.sql.server_timing', True))
+        self.max_queries = int(settings.get('sakubijak.sql.max_queries', 0) or 0)
+        self.max_db_ms = float(settings.get('sakubijak.sql.max_db_ms', 0) or 0)
+        install_listeners()
+
+    def __call__(self, request):
+        stats = QueryStats()
+        token = _stats.set(stats)
+        try:
+            response = self.handler(request)
+        finally:
+            _stats.reset(token)
+
+        if self.server_timing:
+            timing = f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"'
+            existing = response.headers.get('Server-Timing')
+            response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        if self.over_budget(stats):
+            log.warning(
+                'Anggaran SQL terlampaui: %s %s (route %s) menjalankan %d query, %.1f ms di database. '
+                'Fingerprint teratas:\n%s',
+                request.method, request.path,
+                request.matched_route.name if request.matched_route else '-',
+                stats.count, stats.duration_ms,
+                '\n'.join(f'  {count}x {elapsed:.1f} ms  {sql}' for sql, count, elapsed in stats.top_fingerprints()),
+            )
+        return response
+
+    def over_budget(self, stats):
+        return bool(
+            (self.max_queries and stats.count > self.max_queries)
+            or (self.max_db_ms and stats.duration_ms > self.max_db_ms)
+        )
+
+
+def includeme(config):
+    config.add_tween('sakubijak_backend.sql_timing_tween.SQLTimingTweenFactory',
+                     over='pyramid.tweens.excview_tween_factory')
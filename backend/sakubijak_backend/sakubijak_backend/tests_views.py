@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 import transaction
 import json
@@ -14,7 +15,8 @@ from .models import (
     get_tm_session,
     Base,
 )
-from .models.mymodel import User, Category, Transaction
+from .models.mymodel import User, Category, Transaction, MonthlyCategoryTotal
+from .models.rollup import rebuild_monthly_totals
 # Impor fungsi dari api_auth
 from .views.api_auth import get_password_hash, verify_password
 
@@ -45,6 +47,13 @@ def dummy_request(dbsession):
 class BaseTest(unittest.TestCase):
     """Base test case that sets up the database and important configurations"""
     def setUp(self):
+        # Cache in-process tidak boleh terbawa antar test (database baru di setiap test)
+        from .views.api_dashboard import summary_cache, closed_month_cache
+        from .views.api_categories import categories_cache
+        summary_cache.clear()
+        closed_month_cache.clear()
+        categories_cache.clear()
+
         self.config = testing.setUp(settings={
             'sqlalchemy.url': 'sqlite:///:memory:',
             'jwt.secret_key': 'testsecret',
@@ -127,6 +136,9 @@ class BaseTest(unittest.TestCase):
         # Simpan ID transaksi untuk digunakan di test
         self.lunch_transaction_id = lunch_transaction.id
         self.taxi_transaction_id = taxi_transaction.id
+
+        # Data fixture ditulis langsung lewat ORM, jadi rollup bulanan dibangun ulang
+        rebuild_monthly_totals(self.dbsession)
         
         # Commit hanya sekali di akhir setup
         transaction.commit()
@@ -238,6 +250,75 @@ class TestAuthentication(BaseTest):
         self.assertTrue('user' in response)
         self.assertEqual(response['user']['email'], 'test@example.com')
     
+    def test_login_rehashes_outdated_hash(self):
+        """Test that login upgrades a hash made with fewer bcrypt rounds"""
+        from .passwords import PasswordHasher, make_context
+
+        user = self.dbsession.query(User).filter_by(email='test@example.com').one()
+        user.hashed_password = make_context(4).hash('password123')
+        self.dbsession.flush()
+
+        request = dummy_request(self.dbsession)
+        request.registry = testing.DummyResource()
+        request.registry['password_hasher'] = PasswordHasher(rounds=5)
+        request.registry.settings = {'jwt.secret_key': 'testsecret'}
+        request.json_body = {'email': 'test@example.com', 'password': 'password123'}
+
+        self.login(request)
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue(user.hashed_password.startswith('$2b$05$'))
+        self.assertTrue(verify_password('password123', user.hashed_password))
+
+    def test_login_hasher_saturated(self):
+        """Test that a saturated hashing pool answers 503 with Retry-After"""
+        from .passwords import HasherSaturated
+
+        class SaturatedHasher:
+            def verify_and_update(self, password, hashed_password):
+                raise HasherSaturated()
+
+        request = dummy_request(self.dbsession)
+        request.registry = testing.DummyResource()
+        request.registry['password_hasher'] = SaturatedHasher()
+        request.json_body = {'email': 'test@example.com', 'password': 'password123'}
+
+        response = self.login(request)
+        self.assertEqual(request.response.status_code, 503)
+        self.assertTrue('Retry-After' in request.response.headers)
+        self.assertTrue('error' in response)
+
+    def test_register_hash_timeout(self):
+        """Test that a hash exceeding auth.hash_timeout answers 503 and keeps its slot until done"""
+        import time
+        from .passwords import hasher_from_settings
+
+        hasher = hasher_from_settings({
+            'auth.hash_workers': '1',
+            'auth.hash_queue_depth': '0',
+            'auth.hash_timeout': '0.001',
+            'auth.bcrypt_rounds': '4',
+        })
+        try:
+            request = dummy_request(self.dbsession)
+            request.registry = testing.DummyResource()
+            request.registry['password_hasher'] = hasher
+            request.json_body = {'name': 'Slow', 'email': 'slow@example.com', 'password': 'password123'}
+
+            # Worker 'spawn' baru butuh jauh lebih dari 1 ms untuk hash pertama
+            response = self.register(request)
+            self.assertEqual(request.response.status_code, 503)
+            self.assertTrue('Retry-After' in request.response.headers)
+            self.assertTrue('error' in response)
+
+            # Slot dikembalikan oleh job yang selesai, bukan oleh pemanggil yang menyerah
+            deadline = time.monotonic() + 30
+            while not hasher.slots.acquire(blocking=False):
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.05)
+            hasher.slots.release()
+        finally:
+            hasher.shutdown()
+
     def test_login_invalid_credentials(self):
         """Test login with invalid credentials"""
         # Gunakan existing user dari setup_test_data
@@ -254,6 +335,624 @@ class TestAuthentication(BaseTest):
         self.assertTrue('error' in response)
 
 
+class TestJWTAuthenticationPolicy(BaseTest):
+    """Test the verified-claims cache in JWTAuthenticationPolicy"""
+
+    def auth_request(self, token):
+        request = testing.DummyRequest()
+        request.headers['Authorization'] = f'Bearer {token}'
+        return request
+
+    def test_token_decoded_once(self):
+        """Test that a reused token is verified once and then served from cache"""
+        from .security import JWTAuthenticationPolicy
+
+        policy = JWTAuthenticationPolicy(secret_key='testsecret', cache_size=8)
+        token = self.create_jwt_token(self.test_user_id, 'test@example.com')
+
+        with patch('sakubijak_backend.security.jwt.decode', wraps=jwt.decode) as decode:
+            for _ in range(3):
+                self.assertEqual(policy.unauthenticated_userid(self.auth_request(token)), self.test_user_id)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(policy.cache_stats()['hits'], 2)
+        self.assertEqual(policy.cache_stats()['misses'], 1)
+
+    def test_expired_entry_evicted(self):
+        """Test that cached claims stop being served once the token expires"""
+        import time
+        from .security import JWTAuthenticationPolicy
+
+        policy = JWTAuthenticationPolicy(secret_key='testsecret', cache_size=8)
+        token = self.create_jwt_token(self.test_user_id, 'test@example.com')
+        self.assertEqual(policy.unauthenticated_userid(self.auth_request(token)), self.test_user_id)
+
+        # Epoch langsung, bukan datetime naive yang .timestamp()-nya dibaca sebagai waktu lokal
+        with patch('sakubijak_backend.cache.time.time', return_value=time.time() + 7200):
+            request = self.auth_request(token)
+            with patch('sakubijak_backend.security.jwt.decode', side_effect=jwt.ExpiredSignatureError):
+                self.assertIsNone(policy.unauthenticated_userid(request))
+        self.assertEqual(request.jwt_error, 'Token kedaluwarsa')
+        self.assertEqual(policy.cache_stats()['size'], 0)
+
+    def test_cache_is_bounded(self):
+        """Test that the cache never holds more than cache_size tokens"""
+        from .security import JWTAuthenticationPolicy
+
+        policy = JWTAuthenticationPolicy(secret_key='testsecret', cache_size=2)
+        for user_id in range(1, 5):
+            token = self.create_jwt_token(user_id, f'user{user_id}@example.com')
+            self.assertEqual(policy.unauthenticated_userid(self.auth_request(token)), user_id)
+        self.assertEqual(policy.cache_stats()['size'], 2)
+
+
+class TestPasswordHasher(unittest.TestCase):
+    """Test the bounded bcrypt worker pool"""
+
+    def test_admission_control(self):
+        """Test that calls beyond workers + queue depth are rejected immediately"""
+        from .passwords import HasherSaturated, PasswordHasher
+
+        hasher = PasswordHasher(rounds=4, workers=1, queue_depth=0)
+        try:
+            hashed = hasher.hash('password123')
+            self.assertEqual(hasher.verify_and_update('password123', hashed), (True, None))
+
+            # Slot satu-satunya sedang dipakai: permintaan berikutnya tidak boleh mengantre
+            hasher.slots.acquire()
+            try:
+                with self.assertRaises(HasherSaturated):
+                    hasher.hash('password123')
+            finally:
+                hasher.slots.release()
+        finally:
+            hasher.shutdown()
+
+    def test_calibrate_rounds_bounds(self):
+        """Test that calibration stays within the allowed rounds range"""
+        from .passwords import MAX_ROUNDS, MIN_ROUNDS, calibrate_rounds
+
+        self.assertEqual(calibrate_rounds(0.001), MIN_ROUNDS)
+        self.assertEqual(calibrate_rounds(10 ** 9), MAX_ROUNDS)
+        # Tidak pernah di bawah default passlib
+        self.assertGreaterEqual(MIN_ROUNDS, 12)
+
+    def test_settings_default_inline(self):
+        """Test that no worker processes are started unless auth.hash_workers is set"""
+        from .passwords import hasher_from_settings
+
+        hasher = hasher_from_settings({'auth.bcrypt_rounds': '4'})
+        try:
+            self.assertIsNone(hasher.executor)
+            self.assertEqual(hasher.verify_and_update('password123', hasher.hash('password123')), (True, None))
+        finally:
+            hasher.shutdown()
+
+
+class TestEngineSettings(unittest.TestCase):
+    """Test sakubijak.db.* engine settings and statement timeouts"""
+
+    SLOW_QUERY = (
+        "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000000) "
+        "SELECT count(*) FROM n"
+    )
+
+    def test_nested_keys_ignored(self):
+        """Test that nested sqlalchemy.* keys and pool sizing do not break SQLite engines"""
+        from .models import get_engine
+
+        engine = get_engine({
+            'sqlalchemy.url': 'sqlite://',
+            'sqlalchemy.replica.url': 'sqlite://',
+            'sakubijak.db.pool_size': '3',
+        })
+        with engine.connect() as conn:
+            self.assertEqual(conn.exec_driver_sql('SELECT 1').scalar(), 1)
+        self.assertTrue(engine.pool._pre_ping)
+
+    def test_sqlite_statement_timeout(self):
+        """Test that the emulated timeout interrupts a long statement only"""
+        from sqlalchemy.exc import OperationalError
+        from .models import get_engine
+
+        engine = get_engine({'sqlalchemy.url': 'sqlite://', 'sakubijak.db.statement_timeout': '50'})
+        with engine.connect() as conn:
+            with self.assertRaises(OperationalError):
+                conn.exec_driver_sql(self.SLOW_QUERY)
+            self.assertEqual(conn.exec_driver_sql('SELECT 1').scalar(), 1)
+
+    def test_route_override(self):
+        """Test that the view deriver applies the per-route timeout to the request session"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+        from .models import get_engine, get_session_factory
+        from .models.engine import install_session_timeouts, statement_timeout_view
+
+        settings = {
+            'sqlalchemy.url': 'sqlite://',
+            'sakubijak.db.statement_timeout': '0',
+            'sakubijak.db.statement_timeout.slow_route': '50',
+        }
+        engine = get_engine(settings)
+        session_factory = get_session_factory(engine)
+        install_session_timeouts(session_factory, engine)
+
+        def view(context, request):
+            return request.dbsession.execute(text(self.SLOW_QUERY)).scalar()
+
+        info = testing.DummyResource(settings=settings, options={'route_name': 'other_route'})
+        self.assertIs(statement_timeout_view(view, info), view)
+
+        info.options = {'route_name': 'slow_route'}
+        request = testing.DummyRequest()
+        request.dbsession = session_factory()
+        try:
+            with self.assertRaises(OperationalError):
+                statement_timeout_view(view, info)(None, request)
+        finally:
+            request.dbsession.close()
+
+
+class TestReplicaRouting(unittest.TestCase):
+    """Test routing request.dbsession between primary and read replica"""
+
+    def setUp(self):
+        self.config = testing.setUp(settings={
+            'sqlalchemy.url': 'sqlite:///:memory:',
+            'sqlalchemy.replica.url': 'sqlite://',
+            'sakubijak.db.replica_pin_seconds': '7',
+        })
+        self.config.include('.models')
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def make_request(self, method='GET', route_name='api_dashboard_summary', cookies=None):
+        from pyramid.request import Request, apply_request_extensions
+
+        request = Request.blank('/', method=method)
+        request.registry = self.config.registry
+        request.matched_route = testing.DummyResource(name=route_name) if route_name else None
+        request.tm = transaction.TransactionManager(explicit=True)
+        for name, value in (cookies or {}).items():
+            request.cookies[name] = value
+        apply_request_extensions(request)
+        return request
+
+    def bound_to_replica(self, request):
+        from .models.replica import REPLICA_SESSION_KEY
+        return request.dbsession.info.get(REPLICA_SESSION_KEY, False)
+
+    def test_read_routes_use_replica(self):
+        """Test that only safe methods on read-only routes go to the replica"""
+        self.assertTrue(self.bound_to_replica(self.make_request()))
+        self.assertEqual(str(self.make_request().dbsession.bind.url), 'sqlite://')
+        self.assertFalse(self.bound_to_replica(self.make_request(route_name='api_auth_login')))
+        self.assertFalse(self.bound_to_replica(self.make_request(route_name=None)))
+        self.assertFalse(self.bound_to_replica(self.make_request(method='POST')))
+
+    def test_write_pins_client_to_primary(self):
+        """Test the read-your-writes cookie after a successful write"""
+        from .models.replica import PIN_COOKIE
+
+        request = self.make_request(method='PUT', route_name='api_transaction_item')
+        request.dbsession
+        response = Response(status=200)
+        request._process_response_callbacks(response)
+        cookie = response.headers['Set-Cookie']
+        self.assertIn(f'{PIN_COOKIE}=1', cookie)
+        self.assertIn('Max-Age=7', cookie)
+
+        failed = self.make_request(method='POST', route_name='api_transactions_collection')
+        failed.dbsession
+        response = Response(status=400)
+        failed._process_response_callbacks(response)
+        self.assertNotIn('Set-Cookie', response.headers)
+
+        pinned = self.make_request(cookies={PIN_COOKIE: '1'})
+        self.assertFalse(self.bound_to_replica(pinned))
+
+    def test_write_pins_user_without_cookie(self):
+        """Test read-your-writes through the real JWT auth path for a client that never sends cookies"""
+        import tempfile
+        import time
+        from webtest import TestApp
+        from . import main
+        from .scripts.seed_db import seed_database, seed_email
+
+        with tempfile.TemporaryDirectory() as directory:
+            settings = {
+                'sqlalchemy.url': f'sqlite:///{directory}/primary.sqlite',
+                # Replica yang tertinggal: skema sama, data belum ada
+                'sqlalchemy.replica.url': f'sqlite:///{directory}/replica.sqlite',
+                'jwt.secret_key': 'testsecret',
+                'jwt.algorithm': 'HS256',
+                'auth.hash_workers': '0',
+            }
+            engines = [get_engine(settings), get_engine(settings, prefix='sqlalchemy.replica.')]
+            for engine in engines:
+                Base.metadata.create_all(engine)
+            with transaction.manager:
+                dbsession = get_tm_session(get_session_factory(engines[0]), transaction.manager)
+                seed_database(dbsession, users=1, transactions=0, categories=1, hashed_password='x')
+                user = dbsession.query(User).filter_by(email=seed_email(1, 0)).one()
+                user_id, category_id = user.id, user.categories[0].id
+
+            wsgi_app = main({}, **settings)
+            app = TestApp(wsgi_app)
+            token = jwt.encode({'user_id': user_id, 'exp': time.time() + 3600}, 'testsecret', algorithm='HS256')
+            headers = {'Authorization': f'Bearer {token}'}
+            try:
+                app.post_json('/api/transactions', {
+                    'description': 'Kopi', 'amount': '25000', 'date': '2024-05-01',
+                    'category_id': str(category_id),
+                }, headers=headers, status=201)
+                app.reset() # Klien lintas origin tidak menyimpan cookie pin
+
+                listed = app.get('/api/transactions', headers=headers).json['transactions']
+                self.assertEqual([t['description'] for t in listed], ['Kopi'])
+
+                # Setelah pin kedaluwarsa pembacaan kembali ke replica
+                router = wsgi_app.registry['dbsession_router']
+                router.pinned_users.clear()
+                self.assertEqual(app.get('/api/transactions', headers=headers).json['transactions'], [])
+            finally:
+                for engine in engines + [wsgi_app.registry['dbsession_factory'].kw['bind'],
+                                         wsgi_app.registry['dbsession_replica_factory'].kw['bind']]:
+                    engine.dispose()
+
+
+try:
+    import aiosqlite
+except ImportError:  # pragma: no cover - extra 'asgi' opsional
+    aiosqlite = None
+
+
+@unittest.skipIf(aiosqlite is None, 'aiosqlite is not installed')
+class TestASGIApp(unittest.TestCase):
+    """Test the ASGI entry point: async reads on the event loop, WSGI fallback for the rest"""
+
+    def setUp(self):
+        import tempfile
+        from .asgi import main as asgi_main
+        from .scripts.seed_db import seed_database, seed_email
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        settings = {
+            'sqlalchemy.url': f'sqlite:///{self.tmpdir.name}/asgi.sqlite',
+            'jwt.secret_key': 'testsecret',
+            'jwt.algorithm': 'HS256',
+            'auth.hash_workers': '0',
+        }
+        engine = get_engine(settings)
+        Base.metadata.create_all(engine)
+        with transaction.manager:
+            dbsession = get_tm_session(get_session_factory(engine), transaction.manager)
+            seed_database(dbsession, users=1, transactions=200, categories=3, hashed_password='x')
+            user = dbsession.query(User).filter_by(email=seed_email(1, 0)).one()
+            self.user_id, self.category_id = user.id, user.categories[0].id
+            self.category_name = user.categories[0].name
+        engine.dispose()
+
+        self.app = asgi_main({}, **settings)
+        self.wsgi_engine = self.app.registry['dbsession_factory'].kw['bind']
+        token = jwt.encode(
+            {'user_id': self.user_id, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+            'testsecret', algorithm='HS256',
+        )
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        asyncio.run(self.app.close())
+        self.wsgi_engine.dispose()
+        self.tmpdir.cleanup()
+
+    async def call(self, method, path, headers=None, body=b''):
+        """``body`` berupa bytes atau list potongan yang dikirim sebagai pesan terpisah."""
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'root_path': '',
+            'query_string': query.encode(), 'http_version': '1.1', 'scheme': 'http',
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+            'headers': [(k.lower().encode(), v.encode()) for k, v in dict(self.headers, **(headers or {})).items()],
+        }
+
+        chunks = list(body) if isinstance(body, list) else [body]
+        self.received = 0
+
+        async def receive():
+            self.received += 1
+            chunk = chunks.pop(0) if chunks else b''
+            return {'type': 'http.request', 'body': chunk, 'more_body': bool(chunks)}
+
+        messages = []
+        async def send(message):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+        start, chunks = messages[0], messages[1:]
+        headers = {k.decode(): v.decode() for k, v in start['headers']}
+        return start['status'], headers, b''.join(m['body'] for m in chunks)
+
+    def count_statements(self, engine, calls):
+        from sqlalchemy import event
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            results = asyncio.run(calls)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+        return results, len(statements)
+
+    def test_reads_use_async_engine(self):
+        """Test that read routes run on the asyncio engine with JWT auth and tweens applied"""
+        async def reads():
+            return await asyncio.gather(*(self.call('GET', '/api/dashboard/summary') for _ in range(5)))
+
+        (results, async_statements) = self.count_statements(self.app.engines[0].sync_engine, reads())
+        self.assertTrue(async_statements)
+        for status, headers, body in results:
+            self.assertEqual(status, 200)
+            self.assertIn('server-timing', headers)
+            self.assertIn('expenses_per_category', json.loads(body))
+
+        # Tanpa token: policy JWT yang sama menolak request
+        status, _, _ = asyncio.run(self.call('GET', '/api/dashboard/summary', headers={'Authorization': ''}))
+        self.assertEqual(status, 403)
+
+    def test_writes_fall_back_to_wsgi(self):
+        """Test that writes run through the WSGI app in a thread and are visible to async reads"""
+        status, headers, _ = asyncio.run(self.call('GET', '/api/dashboard/summary'))
+        etag = headers['etag']
+
+        payload = json.dumps({
+            'description': 'Kopi', 'amount': '18000',
+            'date': datetime.date.today().isoformat(), 'category_id': str(self.category_id),
+        }).encode()
+        (result, async_statements) = self.count_statements(self.app.engines[0].sync_engine, self.call(
+            'POST', '/api/transactions', headers={'Content-Type': 'application/json'}, body=payload,
+        ))
+        self.assertEqual(result[0], 201)
+        self.assertEqual(async_statements, 0)
+
+        status, headers, _ = asyncio.run(self.call('GET', '/api/dashboard/summary', headers={'If-None-Match': etag}))
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers['etag'], etag)
+        self.assertEqual(asyncio.run(self.call('GET', '/api/does-not-exist'))[0], 404)
+
+    def test_thread_path_streams_request_body(self):
+        """Test that a chunked CSV import is read from receive() while the view parses it"""
+        from .asgi import ReceiveStream
+
+        rows = ''.join(f'2024-03-{day:02d},Kopi {day},18000,{self.category_name}\n' for day in range(1, 29))
+        csv_body = ('date,description,amount,category\n' + rows).encode()
+        chunks = [csv_body[i:i + 100] for i in range(0, len(csv_body), 100)]
+
+        # Tanpa Content-Length (seperti chunked transfer encoding)
+        status, _, body = asyncio.run(self.call(
+            'POST', '/api/transactions/import', headers={'Content-Type': 'text/csv'}, body=chunks,
+        ))
+        self.assertEqual(status, 201, body)
+        self.assertEqual(json.loads(body)['imported'], 28)
+        self.assertEqual(self.received, len(chunks))
+
+        # ReceiveStream hanya meminta potongan berikutnya saat datanya dibutuhkan
+        async def partial_read():
+            messages = [b'abc', b'def']
+            calls = []
+
+            async def receive():
+                calls.append(1)
+                return {'type': 'http.request', 'body': messages.pop(0), 'more_body': bool(messages)}
+
+            stream = ReceiveStream(receive, asyncio.get_running_loop())
+            first = await asyncio.get_running_loop().run_in_executor(None, stream.read, 3)
+            return first, len(calls)
+
+        self.assertEqual(asyncio.run(partial_read()), (b'abc', 1))
+
+
+class TestSQLTimingTween(unittest.TestCase):
+    """Test per-request SQL counting, Server-Timing and budget logging"""
+
+    def test_server_timing_and_budget(self):
+        """Test that statements are counted per request and budget overruns are logged"""
+        from sqlalchemy import create_engine
+        from .sql_timing_tween import SQLTimingTweenFactory
+
+        engine = create_engine('sqlite://')
+
+        def handler(request):
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.exec_driver_sql(f'SELECT {i}')
+            return Response()
+
+        registry = testing.DummyResource(settings={'sakubijak.sql.max_queries': '2'})
+        tween = SQLTimingTweenFactory(handler, registry)
+        request = testing.DummyRequest(matched_route=None)
+
+        with self.assertLogs('sakubijak_backend.sql_timing_tween', level='WARNING') as logs:
+            response = tween(request)
+        self.assertRegex(response.headers['Server-Timing'], r'^db;dur=[\d.]+;desc="3 queries"$')
+        # Tiga SELECT dengan literal berbeda dikelompokkan menjadi satu fingerprint
+        self.assertIn('3x', logs.output[0])
+        self.assertIn('SELECT ?', logs.output[0])
+
+    def test_failed_statement_does_not_leak_start(self):
+        """Test that a failing statement is counted and leaves no start time on the pooled connection"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.exc import OperationalError
+        from .sql_timing_tween import SQLTimingTweenFactory
+
+        engine = create_engine('sqlite://')
+
+        def handler(request):
+            with engine.connect() as conn:
+                with self.assertRaises(OperationalError):
+                    conn.exec_driver_sql('SELECT * FROM tabel_tidak_ada')
+                conn.exec_driver_sql('SELECT 1')
+                request.info = conn.info
+            return Response()
+
+        tween = SQLTimingTweenFactory(handler, testing.DummyResource(settings={}))
+        request = testing.DummyRequest(matched_route=None)
+        response = tween(request)
+        self.assertIn('desc="2 queries"', response.headers['Server-Timing'])
+        self.assertEqual(request.info.get('sakubijak.query_start'), [])
+
+
+class TestCompressionTween(unittest.TestCase):
+    """Test gzip/deflate response compression"""
+
+    def run_tween(self, response, accept_encoding='gzip, deflate', **settings):
+        from pyramid.request import Request
+        from .compression_tween import CompressionTweenFactory
+
+        registry = testing.DummyResource(settings=dict({'sakubijak.compression.min_size': '100'}, **settings))
+        tween = CompressionTweenFactory(lambda request: response, registry)
+        headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+        return tween(Request.blank('/api/transactions', headers=headers))
+
+    def test_buffered_body(self):
+        """Test that large JSON bodies are compressed and small ones are left alone"""
+        import gzip
+        import zlib
+
+        body = json.dumps([{'description': 'Lunch', 'category_name': 'Food'}] * 50).encode()
+        response = self.run_tween(Response(body=body, content_type='application/json', etag='abc'))
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertEqual(gzip.decompress(response.body), body)
+        self.assertLess(response.content_length, len(body) // 5)
+        self.assertEqual(response.headers['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response.vary)
+
+        response = self.run_tween(Response(body=body, content_type='application/json'), 'deflate')
+        self.assertEqual(zlib.decompress(response.body), body)
+
+        small = self.run_tween(Response(body=b'{}', content_type='application/json'))
+        self.assertIsNone(small.content_encoding)
+        self.assertIn('Accept-Encoding', small.vary)
+
+        identity = self.run_tween(Response(body=body, content_type='application/json'), accept_encoding=None)
+        self.assertIsNone(identity.content_encoding)
+        self.assertEqual(identity.body, body)
+
+    def test_streaming_app_iter(self):
+        """Test that app_iter bodies are compressed chunk by chunk and closed"""
+        import gzip
+
+        closed = []
+
+        def rows():
+            try:
+                for i in range(1000):
+                    yield b'{"id": %d, "description": "Kopi"}\n' % i
+            finally:
+                closed.append(True)
+
+        response = self.run_tween(Response(app_iter=rows(), content_type='application/x-ndjson'))
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertIsNone(response.content_length)
+        data = b''.join(response.app_iter)
+        response.app_iter.close()
+        self.assertEqual(gzip.decompress(data).count(b'\n'), 1000)
+        self.assertEqual(closed, [True])
+
+
+class TestLogging(unittest.TestCase):
+    """Test the queued, sampled JSON logging handler"""
+
+    def make_logger(self, stream, **kwargs):
+        import logging
+        from .logutil import JSONFormatter, QueueingHandler
+
+        handler = QueueingHandler(stream, **kwargs)
+        handler.setFormatter(JSONFormatter())
+        logger = logging.getLogger(f'sakubijak_backend.tests.{self.id()}')
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        self.addCleanup(handler.close)
+        return logger, handler
+
+    def test_json_lines_with_request_context(self):
+        """Test that records carry request id, route and exception text"""
+        import io
+        from .logutil import current_request
+
+        stream = io.StringIO()
+        logger, handler = self.make_logger(stream)
+        request = testing.DummyRequest(request_id='req-1', matched_route=testing.DummyResource(name='api_x'))
+        token = current_request.set(request)
+        try:
+            logger.info('Halo %s', 'dunia', extra={'status': 200})
+            try:
+                raise ValueError('rusak')
+            except ValueError:
+                logger.exception('Gagal')
+        finally:
+            current_request.reset(token)
+        handler.stop()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines[0]['msg'], 'Halo dunia')
+        self.assertEqual((lines[0]['request_id'], lines[0]['route'], lines[0]['status']), ('req-1', 'api_x', 200))
+        self.assertIn('ValueError: rusak', lines[1]['exc'])
+
+    def test_debug_sampling(self):
+        """Test that DEBUG records are sampled while warnings always pass"""
+        import io
+
+        stream = io.StringIO()
+        logger, handler = self.make_logger(stream, debug_sample_rate=0.25)
+        for i in range(8):
+            logger.debug('Event %s', i)
+        logger.warning('Peringatan')
+        handler.stop()
+
+        messages = [json.loads(line)['msg'] for line in stream.getvalue().splitlines()]
+        self.assertEqual(messages, ['Event 0', 'Event 4', 'Peringatan'])
+
+
+class TestJSONRenderer(unittest.TestCase):
+    """Test the project-wide JSON renderer"""
+
+    def test_native_types(self):
+        """Test that Decimal, date and datetime encode the same with and without orjson"""
+        from decimal import Decimal
+        from . import renderers
+
+        value = {
+            'amount': Decimal('15.50'),
+            'date': datetime.date(2024, 1, 31),
+            'created_at': datetime.datetime(2024, 1, 31, 8, 30, 0, 125000),
+            'name': 'Makan siang',
+        }
+        expected = {
+            'amount': 15.5,
+            'date': '2024-01-31',
+            'created_at': '2024-01-31T08:30:00.125000',
+            'name': 'Makan siang',
+        }
+        self.assertEqual(json.loads(renderers.dumps(value)), expected)
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(json.loads(renderers.dumps(value)), expected)
+
+    def test_sets_json_content_type(self):
+        """Test that the renderer returns bytes and marks the response as JSON"""
+        from .renderers import JSONRenderer
+
+        request = testing.DummyRequest()
+        body = JSONRenderer(None)({'ok': True}, {'request': request})
+        self.assertEqual(json.loads(body), {'ok': True})
+        self.assertEqual(request.response.content_type, 'application/json')
+
+
 class TestCategoryAPI(BaseTest):
     """Test Category API endpoints"""
     
@@ -282,19 +981,66 @@ class TestCategoryAPI(BaseTest):
         request = dummy_request(self.dbsession)
         request.authenticated_userid = self.test_user_id
         
-        response = self.list_categories(request)
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue('categories' in response.json)
-        self.assertGreaterEqual(len(response.json['categories']), 2)
+        response = self.list_categories(request).json
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue('categories' in response)
+        self.assertGreaterEqual(len(response['categories']), 2)
         
         # Pastikan kategori Food ada dalam response
         found_food = False
-        for cat in response.json['categories']:
+        for cat in response['categories']:
             if cat['name'] == 'Food':
                 found_food = True
                 break
         self.assertTrue(found_food, "Category 'Food' should be present in the response")
     
+    def test_list_categories_etag_and_cache(self):
+        """Test 304 handling, cached body reuse and invalidation by category writes"""
+        from sqlalchemy import event
+        from .views.api_categories import categories_cache
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        response = self.list_categories(request)
+        etag = response.etag
+        self.assertTrue(etag)
+        self.assertIn(self.test_user_id, categories_cache)
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = self.dbsession.get_bind()
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            request.headers['If-None-Match'] = f'"{etag}"'
+            self.assertEqual(self.list_categories(request).status_code, 304)
+
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            self.assertEqual(self.list_categories(request).body, response.body)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+        # Hanya query ETag, daftar kategori disajikan dari cache
+        self.assertEqual(len(statements), 2, statements)
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'category_id': self.transport_category_id}
+        request.json_body = {'name': 'Commute'}
+        self.update_category(request)
+        self.assertNotIn(self.test_user_id, categories_cache)
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.headers['If-None-Match'] = f'"{etag}"'
+        response = self.list_categories(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.etag, etag)
+        self.assertIn('Commute', [c['name'] for c in response.json['categories']])
+
     @patch('transaction.manager')
     def test_create_category(self, mock_transaction_manager):
         """Test creating a new category"""
@@ -331,9 +1077,9 @@ class TestCategoryAPI(BaseTest):
         
         try:
             response = self.create_category(request)
-            self.assertEqual(response.status_code, 201)
-            self.assertTrue('category' in response.json)
-            self.assertEqual(response.json['category']['name'], 'Entertainment')
+            self.assertEqual(request.response.status_code, 201)
+            self.assertTrue('category' in response)
+            self.assertEqual(response['category']['name'], 'Entertainment')
             
             # Verify category was created
             category = self.dbsession.query(Category).filter_by(name='Entertainment').first()
@@ -350,9 +1096,9 @@ class TestCategoryAPI(BaseTest):
         request.matchdict = {'category_id': self.food_category_id}
         
         response = self.get_category(request)
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue('category' in response.json)
-        self.assertEqual(response.json['category']['name'], 'Food')
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue('category' in response)
+        self.assertEqual(response['category']['name'], 'Food')
     
     def test_update_category(self):
         """Test updating a category"""
@@ -365,9 +1111,9 @@ class TestCategoryAPI(BaseTest):
         }
         
         response = self.update_category(request)
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue('category' in response.json)
-        self.assertEqual(response.json['category']['name'], 'Groceries')
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue('category' in response)
+        self.assertEqual(response['category']['name'], 'Groceries')
         
         # Verify category was updated
         category = self.dbsession.query(Category).filter(Category.id == self.food_category_id).first()
@@ -399,13 +1145,19 @@ class TestTransactionAPI(BaseTest):
             create_transaction_view,
             get_transaction_detail_view,
             update_transaction_view,
-            delete_transaction_view
+            delete_transaction_view,
+            export_transactions_view,
+            create_transactions_batch_view
         )
         
         self.config.add_route('api_transactions_collection', '/api/transactions')
+        self.config.add_route('api_transactions_export', '/api/transactions/export')
+        self.config.add_route('api_transactions_batch', '/api/transactions/batch')
         self.config.add_route('api_transaction_item', '/api/transactions/{transaction_id}')
         
         self.list_transactions = get_transactions_view
+        self.export_transactions = export_transactions_view
+        self.create_transactions_batch = create_transactions_batch_view
         self.create_transaction = create_transaction_view
         self.get_transaction = get_transaction_detail_view
         self.update_transaction = update_transaction_view
@@ -418,18 +1170,182 @@ class TestTransactionAPI(BaseTest):
         request.params = {}  # Empty params for default filters
         
         response = self.list_transactions(request)
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue('transactions' in response.json)
-        self.assertGreaterEqual(len(response.json['transactions']), 2)
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue('transactions' in response)
+        self.assertGreaterEqual(len(response['transactions']), 2)
         
         # Cari transaksi Lunch dalam response
         found_lunch = False
-        for trans in response.json['transactions']:
+        for trans in response['transactions']:
             if trans['description'] == 'Lunch':
                 found_lunch = True
                 break
         self.assertTrue(found_lunch, "Transaction 'Lunch' should be present in the response")
-    
+
+    def test_list_transactions_keyset_pagination(self):
+        """Test walking the transaction list page by page with limit + cursor"""
+        seen = []
+        cursor = None
+        while True:
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            request.params = {'limit': '1'}
+            if cursor:
+                request.params['cursor'] = cursor
+
+            response = self.list_transactions(request)
+            self.assertEqual(request.response.status_code, 200)
+            self.assertLessEqual(len(response['transactions']), 1)
+            seen.extend(t['description'] for t in response['transactions'])
+            cursor = response['next_cursor']
+            if not cursor:
+                break
+
+        # Urutan sama dengan mode tanpa pagination: terbaru lebih dulu, tanpa duplikat
+        self.assertEqual(seen, ['Lunch', 'Taxi'])
+
+    def test_list_transactions_query_count(self):
+        """Test that the list endpoint does not issue one query per row (N+1)"""
+        from sqlalchemy import event
+
+        for i in range(20):
+            self.dbsession.add(Transaction(
+                description=f"Snack {i}",
+                amount=1.00,
+                date=datetime.date.today(),
+                user_id=self.test_user_id,
+                category_id=self.food_category_id
+            ))
+        self.dbsession.flush()
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = self.dbsession.get_bind()
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            request.params = {}
+            response = self.list_transactions(request)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+
+        self.assertEqual(request.response.status_code, 200)
+        self.assertEqual(len(response['transactions']), 22)
+        self.assertTrue(all(t['category_name'] != 'N/A' for t in response['transactions']))
+        # Jumlah statement harus konstan, tidak bertambah seiring jumlah baris
+        self.assertLessEqual(len(statements), 2, statements)
+
+    def test_list_transactions_skips_identity_map(self):
+        """Test that the list endpoint fetches plain rows, not Transaction instances"""
+        self.dbsession.expunge_all()
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params = {}
+
+        response = self.list_transactions(request)
+        self.assertEqual(len(response['transactions']), 2)
+        self.assertFalse(any(isinstance(obj, (Transaction, Category)) for obj in self.dbsession.identity_map.values()))
+
+    def test_list_transactions_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        from pyramid.httpexceptions import HTTPBadRequest
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params = {'limit': '10', 'cursor': 'bukan-cursor'}
+
+        with self.assertRaises(HTTPBadRequest):
+            self.list_transactions(request)
+
+    def test_created_at_required_for_keyset(self):
+        """Test that created_at cannot be NULL, so every row has a position in the keyset order"""
+        from sqlalchemy import insert
+        from sqlalchemy.exc import IntegrityError
+
+        with self.assertRaises(IntegrityError), self.dbsession.begin_nested():
+            self.dbsession.execute(insert(Transaction.__table__).values(
+                description="Legacy row", amount=1.00, date=datetime.date.today(),
+                user_id=self.test_user_id, category_id=self.food_category_id, created_at=None,
+            ))
+
+    def search(self, **params):
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params = params
+        return [t['description'] for t in self.list_transactions(request)['transactions']]
+
+    def test_search_transactions(self):
+        """Test ranked full-text search combined with filters and kept in sync by triggers"""
+        from pyramid.httpexceptions import HTTPBadRequest
+
+        self.dbsession.add_all([
+            Transaction(description="Lunch with team, lunch again", amount=30.00, date=datetime.date(2024, 1, 5),
+                        user_id=self.test_user_id, category_id=self.food_category_id),
+            Transaction(description="Taxi after late lunch meeting", amount=12.00, date=datetime.date(2024, 1, 6),
+                        user_id=self.test_user_id, category_id=self.transport_category_id),
+        ])
+        self.dbsession.flush()
+
+        # Prefix per kata, tidak peka huruf besar; dari dua deskripsi sepanjang
+        # sama, yang menyebut "lunch" dua kali lebih relevan
+        results = self.search(q='LUN')
+        self.assertEqual(len(results), 3)
+        self.assertLess(results.index('Lunch with team, lunch again'),
+                        results.index('Taxi after late lunch meeting'))
+        self.assertEqual(self.search(q='lunch taxi'), ['Taxi after late lunch meeting'])
+        self.assertEqual(self.search(q='lunch', category_id=str(self.transport_category_id)),
+                         ['Taxi after late lunch meeting'])
+        self.assertEqual(self.search(q='lunch', from_date='2024-01-01', to_date='2024-01-05'),
+                         ['Lunch with team, lunch again'])
+        self.assertEqual(len(self.search(q='lunch', limit='1')), 1)
+
+        # Update dan delete ikut memperbarui index pencarian
+        taxi = self.dbsession.get(Transaction, self.taxi_transaction_id)
+        taxi.description = 'Airport shuttle'
+        self.dbsession.flush()
+        self.assertEqual(self.search(q='shuttle'), ['Airport shuttle'])
+        self.assertEqual(self.search(q='taxi'), ['Taxi after late lunch meeting'])
+
+        with self.assertRaises(HTTPBadRequest):
+            self.search(q='  !! ')
+        with self.assertRaises(HTTPBadRequest):
+            self.search(q='lunch', limit='10', cursor='abc')
+
+    def test_export_transactions_ndjson(self):
+        """Test streaming transactions as NDJSON"""
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params = {'format': 'ndjson', 'category_id': str(self.food_category_id)}
+
+        response = self.export_transactions(request)
+        self.assertEqual(response.content_type, 'application/x-ndjson')
+
+        rows = [json.loads(line) for line in b''.join(response.app_iter).decode('utf-8').splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['description'], 'Lunch')
+        self.assertEqual(rows[0]['category_name'], 'Food')
+        self.assertEqual(rows[0]['amount'], 15.5)
+
+    def test_export_transactions_csv(self):
+        """Test streaming transactions as CSV"""
+        import csv
+        import io
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params = {'format': 'csv'}
+
+        response = self.export_transactions(request)
+        self.assertEqual(response.content_type, 'text/csv')
+
+        body = b''.join(response.app_iter).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['description'] for row in rows], ['Lunch', 'Taxi'])
+        self.assertEqual(rows[1]['category_name'], 'Transport')
+
     @patch('transaction.manager')
     def test_create_transaction(self, mock_transaction_manager):
         """Test creating a new transaction"""
@@ -478,13 +1394,62 @@ class TestTransactionAPI(BaseTest):
             
             try:
                 response = self.create_transaction(request)
-                self.assertEqual(response.status_code, 201)
-                self.assertTrue('transaction' in response.json)
-                self.assertEqual(response.json['transaction']['description'], 'Coffee')
+                self.assertEqual(request.response.status_code, 201)
+                self.assertTrue('transaction' in response)
+                self.assertEqual(response['transaction']['description'], 'Coffee')
             finally:
                 # Restore original method
                 self.dbsession.add = original_add
     
+    @patch('transaction.manager')
+    def test_create_transactions_batch(self, mock_transaction_manager):
+        """Test creating several transactions in one request"""
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.json_body = [
+            {'description': f'Offline {i}', 'amount': '2.50', 'date': '2024-03-0%d' % (i + 1),
+             'category_id': str(self.transport_category_id)}
+            for i in range(3)
+        ]
+
+        response = self.create_transactions_batch(request)
+        self.assertEqual(request.response.status_code, 201)
+        created = response['transactions']
+        self.assertEqual([t['description'] for t in created], ['Offline 0', 'Offline 1', 'Offline 2'])
+        self.assertTrue(all(t['category_name'] == 'Transport' for t in created))
+
+        stored = self.dbsession.query(Transaction).filter(Transaction.id.in_([t['id'] for t in created])).all()
+        self.assertEqual(sorted(t.description for t in stored), ['Offline 0', 'Offline 1', 'Offline 2'])
+        rollup = self.dbsession.query(MonthlyCategoryTotal).filter_by(
+            user_id=self.test_user_id, year_month='2024-03', category_id=self.transport_category_id
+        ).one()
+        self.assertEqual((float(rollup.total), rollup.count), (7.5, 3))
+
+    def test_create_transactions_batch_reports_item_errors(self):
+        """Test that invalid items are reported per index and nothing is stored"""
+        from pyramid.httpexceptions import HTTPBadRequest
+
+        other_user = User(name="Other", email="other@example.com", hashed_password="x")
+        self.dbsession.add(other_user)
+        self.dbsession.flush()
+        foreign_category = Category(name="Foreign", user_id=other_user.id)
+        self.dbsession.add(foreign_category)
+        self.dbsession.flush()
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.json_body = {'transactions': [
+            {'description': 'Valid', 'amount': '1.00', 'date': '2024-03-01', 'category_id': str(self.food_category_id)},
+            {'description': 'Negative', 'amount': '-1', 'date': '2024-03-01', 'category_id': str(self.food_category_id)},
+            {'description': 'Foreign', 'amount': '1.00', 'date': '2024-03-01', 'category_id': str(foreign_category.id)},
+        ]}
+
+        with self.assertRaises(HTTPBadRequest) as ctx:
+            self.create_transactions_batch(request)
+        errors = ctx.exception.json_body['errors']
+        self.assertEqual([e['index'] for e in errors], [1, 2])
+        self.assertEqual(self.dbsession.query(Transaction).filter_by(description='Valid').count(), 0)
+
     def test_get_transaction(self):
         """Test getting a single transaction"""
         request = dummy_request(self.dbsession)
@@ -492,9 +1457,9 @@ class TestTransactionAPI(BaseTest):
         request.matchdict = {'transaction_id': self.lunch_transaction_id}
         
         response = self.get_transaction(request)
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue('transaction' in response.json)
-        self.assertEqual(response.json['transaction']['description'], 'Lunch')
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue('transaction' in response)
+        self.assertEqual(response['transaction']['description'], 'Lunch')
     
     def test_update_transaction(self):
         """Test updating a transaction"""
@@ -509,9 +1474,9 @@ class TestTransactionAPI(BaseTest):
         }
         
         response = self.update_transaction(request)
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue('transaction' in response.json)
-        self.assertEqual(response.json['transaction']['description'], 'Updated lunch')
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue('transaction' in response)
+        self.assertEqual(response['transaction']['description'], 'Updated lunch')
         
         # Verify transaction was updated
         transaction_obj = self.dbsession.query(Transaction).filter(Transaction.id == self.lunch_transaction_id).first()
@@ -532,6 +1497,390 @@ class TestTransactionAPI(BaseTest):
         self.assertIsNone(transaction_obj)
 
 
+class TestTransactionImport(BaseTest):
+    """Test CSV bank-statement import"""
+
+    def setUp(self):
+        super().setUp()
+        from .views.api_import import import_transactions_view
+
+        self.config.add_route('api_transactions_import', '/api/transactions/import')
+        self.import_transactions = import_transactions_view
+
+    def csv_request(self, body):
+        import io
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.content_type = 'text/csv'
+        request.body_file = io.BytesIO(body.encode('utf-8'))
+        return request
+
+    @patch('transaction.manager')
+    def test_import_csv(self, mock_transaction_manager):
+        """Test importing rows, mapping category names and skipping bad rows"""
+        from .views import api_import
+
+        body = (
+            "date,description,amount,category\n"
+            "2024-05-01,Nasi goreng,20000,food\n"
+            "2024-05-02,Ojek,15000,Transport\n"
+            "2024-05-03,Unknown,5000,Hobby\n"
+            "2024-05-04,Bad amount,abc,Food\n"
+            "2024-05-05,Es teh,5000, Food \n"
+        )
+        # Chunk kecil agar jalur flush per chunk ikut teruji
+        with patch.object(api_import, 'IMPORT_CHUNK_SIZE', 2):
+            request = self.csv_request(body)
+            response = self.import_transactions(request)
+
+        self.assertEqual(request.response.status_code, 201)
+        self.assertEqual(response['imported'], 3)
+        self.assertEqual(response['skipped'], 2)
+        self.assertEqual([e['line'] for e in response['errors']], [4, 5])
+
+        imported = self.dbsession.query(Transaction).filter(
+            Transaction.date >= datetime.date(2024, 5, 1), Transaction.date < datetime.date(2024, 6, 1)
+        ).all()
+        self.assertEqual(sorted(t.description for t in imported), ['Es teh', 'Nasi goreng', 'Ojek'])
+        rollup = self.dbsession.query(MonthlyCategoryTotal).filter_by(
+            user_id=self.test_user_id, year_month='2024-05', category_id=self.food_category_id
+        ).one()
+        self.assertEqual((float(rollup.total), rollup.count), (25000.0, 2))
+
+    @patch('transaction.manager')
+    def test_import_csv_multipart_streamed(self, mock_transaction_manager):
+        """Test that the 'file' part of a multipart upload is read incrementally"""
+        import io
+        from pyramid.httpexceptions import HTTPBadRequest
+        from .views import api_import
+
+        csv_body = (
+            "date,description,amount,category\r\n"
+            "2024-07-01,Nasi goreng,20000,Food\r\n"
+            "2024-07-02,Ojek,15000,Transport\r\n"
+        )
+        body = (
+            '--XyZ\r\nContent-Disposition: form-data; name="note"\r\n\r\nmutasi juli\r\n'
+            '--XyZ\r\nContent-Disposition: form-data; name="file"; filename="juli.csv"\r\n'
+            'Content-Type: text/csv\r\n\r\n' + csv_body + '\r\n--XyZ--\r\n'
+        ).encode('utf-8')
+
+        def multipart_request(body):
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            request.content_type = 'multipart/form-data'
+            request.headers['Content-Type'] = 'multipart/form-data; boundary=XyZ'
+            request.body_file = io.BytesIO(body)
+            return request
+
+        # Potongan baca kecil agar delimiter terbelah di antara dua potongan
+        with patch.object(api_import, 'MULTIPART_READ_SIZE', 5):
+            request = multipart_request(body)
+            self.assertEqual(api_import.import_stream(request).read().decode('utf-8'), csv_body)
+            response = self.import_transactions(multipart_request(body))
+        self.assertEqual((response['imported'], response['skipped']), (2, 0))
+
+        with self.assertRaises(HTTPBadRequest):
+            self.import_transactions(multipart_request(body.replace(b'name="file"', b'name="upload"')))
+
+    def test_import_csv_missing_columns(self):
+        """Test that a CSV without the required header is rejected"""
+        from pyramid.httpexceptions import HTTPBadRequest
+
+        with self.assertRaises(HTTPBadRequest):
+            self.import_transactions(self.csv_request("tanggal,jumlah\n2024-05-01,1000\n"))
+
+
+class TestMonthlyRollup(BaseTest):
+    """Test that monthly_category_totals follows every transaction write"""
+
+    def setUp(self):
+        super().setUp()
+
+        from .views.api_transactions import (
+            create_transaction_view,
+            update_transaction_view,
+            delete_transaction_view
+        )
+
+        self.create_transaction = create_transaction_view
+        self.update_transaction = update_transaction_view
+        self.delete_transaction = delete_transaction_view
+
+    def rollup_rows(self):
+        return {
+            (r.user_id, r.year_month, r.category_id): (float(r.total), r.count)
+            for r in self.dbsession.query(MonthlyCategoryTotal).all()
+        }
+
+    def expected_rows(self):
+        expected = {}
+        for t in self.dbsession.query(Transaction).all():
+            key = (t.user_id, t.date.strftime('%Y-%m'), t.category_id)
+            total, count = expected.get(key, (0.0, 0))
+            expected[key] = (total + float(t.amount), count + 1)
+        return expected
+
+    @patch('transaction.manager')
+    def test_rollup_tracks_create_update_delete(self, mock_transaction_manager):
+        """Test create, move across month/category, and delete"""
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.json_body = {
+            'description': 'Groceries',
+            'amount': '40.25',
+            'date': '2024-01-31',
+            'category_id': str(self.food_category_id)
+        }
+        response = self.create_transaction(request)
+        new_id = response['transaction']['id']
+        self.assertEqual(self.rollup_rows(), self.expected_rows())
+
+        # Pindah ke bulan lain dan kategori lain sekaligus
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'transaction_id': new_id}
+        request.json_body = {
+            'amount': '10.00',
+            'date': '2024-02-01',
+            'category_id': str(self.transport_category_id)
+        }
+        self.update_transaction(request)
+        rows = self.rollup_rows()
+        self.assertEqual(rows, self.expected_rows())
+        self.assertNotIn((self.test_user_id, '2024-01', self.food_category_id), rows)
+        self.assertEqual(rows[(self.test_user_id, '2024-02', self.transport_category_id)], (10.0, 1))
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'transaction_id': new_id}
+        self.delete_transaction(request)
+        rows = self.rollup_rows()
+        self.assertEqual(rows, self.expected_rows())
+        self.assertNotIn((self.test_user_id, '2024-02', self.transport_category_id), rows)
+
+    @patch('transaction.manager')
+    def test_rollup_rounds_like_stored_amount(self, mock_transaction_manager):
+        """Test that amounts with more than two decimals round the same way in the row and the rollup"""
+        from decimal import Decimal
+        key = (self.test_user_id, '2024-03', self.food_category_id)
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.json_body = {
+            'description': 'Parkir',
+            'amount': '0.125',
+            'date': '2024-03-05',
+            'category_id': str(self.food_category_id)
+        }
+        response = self.create_transaction(request)
+        new_id = response['transaction']['id']
+        self.assertEqual(self.dbsession.get(Transaction, new_id).amount, Decimal('0.13'))
+        self.assertEqual(self.rollup_rows()[key], (0.13, 1))
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'transaction_id': new_id}
+        request.json_body = {'amount': '2.005'}
+        self.update_transaction(request)
+        self.assertEqual(self.dbsession.get(Transaction, new_id).amount, Decimal('2.01'))
+        self.assertEqual(self.rollup_rows(), self.expected_rows())
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'transaction_id': new_id}
+        self.delete_transaction(request)
+        self.assertNotIn(key, self.rollup_rows())
+
+    def test_rebuild_matches_raw_transactions(self):
+        """Test that the rebuild script logic reproduces the rollup from scratch"""
+        self.dbsession.query(MonthlyCategoryTotal).delete()
+        rebuild_monthly_totals(self.dbsession, user_id=self.test_user_id)
+        self.assertEqual(self.rollup_rows(), self.expected_rows())
+
+
+class TestSeedDatabase(unittest.TestCase):
+    """Test the synthetic data seeder used by seed_sakubijak_backend_db and the benchmarks"""
+
+    def seed(self, seed):
+        from .scripts.seed_db import seed_database
+        engine = get_engine({'sqlalchemy.url': 'sqlite:///:memory:'})
+        Base.metadata.create_all(engine)
+        dbsession = get_session_factory(engine)()
+        seed_database(
+            dbsession, users=3, transactions=500, categories=4, seed=seed,
+            end_date=datetime.date(2026, 6, 30), hashed_password='x',
+        )
+        return dbsession
+
+    def snapshot(self, dbsession):
+        return [
+            (r.user_id, r.category_id, r.description, float(r.amount), r.date)
+            for r in dbsession.query(Transaction).order_by(Transaction.id)
+        ]
+
+    def test_same_seed_is_deterministic(self):
+        """Test that the same seed and end date produce identical rows"""
+        first, second = self.seed(7), self.seed(7)
+        self.assertEqual(self.snapshot(first), self.snapshot(second))
+        self.assertNotEqual(self.snapshot(first), self.snapshot(self.seed(8)))
+
+    def test_seed_sizes_and_rollup(self):
+        """Test row counts, date range and that the monthly rollup is built"""
+        dbsession = self.seed(7)
+        self.assertEqual(dbsession.query(User).count(), 3)
+        self.assertEqual(dbsession.query(Category).count(), 12)
+        rows = self.snapshot(dbsession)
+        self.assertEqual(len(rows), 500)
+        self.assertLessEqual(max(r[4] for r in rows), datetime.date(2026, 6, 30))
+        self.assertGreater(min(r[4] for r in rows), datetime.date(2023, 6, 30))
+        self.assertEqual(
+            sum(r.count for r in dbsession.query(MonthlyCategoryTotal)), 500
+        )
+
+    def test_seed_rebuilds_only_seeded_users(self):
+        """Test that seeding on top of existing data leaves other users' rollups untouched"""
+        from .scripts.seed_db import seed_database
+
+        dbsession = self.seed(7)
+        # Penanda: rollup pengguna lama sengaja dikosongkan; seed berikutnya tidak boleh membangunnya ulang
+        dbsession.query(MonthlyCategoryTotal).delete()
+        new_user_ids = seed_database(
+            dbsession, users=2, transactions=100, categories=4, seed=8,
+            end_date=datetime.date(2026, 6, 30), hashed_password='x',
+        )
+        self.assertEqual(
+            {r.user_id for r in dbsession.query(MonthlyCategoryTotal)}, set(new_user_ids)
+        )
+        self.assertEqual(sum(r.count for r in dbsession.query(MonthlyCategoryTotal)), 100)
+
+    def test_repeated_seed_rejected(self):
+        """Test that loading the same seed twice fails before inserting anything"""
+        from .scripts.seed_db import SeedExistsError, seed_database
+
+        dbsession = self.seed(7)
+        with self.assertRaises(SeedExistsError):
+            seed_database(dbsession, users=3, transactions=10, seed=7, hashed_password='x')
+        self.assertEqual(dbsession.query(User).count(), 3)
+
+    def test_parse_args_validation(self):
+        """Test that sizes that would break the generator are rejected on the command line"""
+        from .scripts.seed_db import parse_args
+
+        self.assertEqual(parse_args(['seed', 'development.ini', '--users', '1']).users, 1)
+        for option, value in (('--users', '0'), ('--categories', '0'), ('--transactions', '-1'), ('--scale', '0')):
+            with patch('sys.stderr'), self.assertRaises(SystemExit):
+                parse_args(['seed', 'development.ini', option, value])
+
+
+class TestTransactionIndexes(BaseTest):
+    """EXPLAIN check: hot-path transaction queries must be served in index order"""
+
+    def explain(self, statement):
+        from sqlalchemy import text
+
+        engine = self.dbsession.get_bind()
+        sql = str(statement.compile(engine, compile_kwargs={'literal_binds': True}))
+        with engine.connect() as conn:
+            return [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+    def assert_no_sort(self, plan):
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+        self.assertTrue(any('ix_transactions_user_id_' in step for step in plan), plan)
+
+    def test_list_query_uses_index_order(self):
+        """Test that the transaction list query is not sorted in memory"""
+        from sqlalchemy import and_, select
+
+        statement = (
+            select(Transaction, Category.name)
+            .outerjoin(Category, and_(Category.id == Transaction.category_id, Category.user_id == self.test_user_id))
+            .where(Transaction.user_id == self.test_user_id)
+            .order_by(Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+            .limit(51)
+        )
+        self.assert_no_sort(self.explain(statement))
+
+    def test_dashboard_latest_query_uses_index_order(self):
+        """Test that the dashboard latest-transactions query is not sorted in memory"""
+        from sqlalchemy import select
+
+        statement = (
+            select(Transaction, Category.name)
+            .join(Category, Transaction.category_id == Category.id)
+            .where(Transaction.user_id == self.test_user_id)
+            .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+            .limit(5)
+        )
+        self.assert_no_sort(self.explain(statement))
+
+
+class TestAnalyticsTimeseries(BaseTest):
+    """Test the bucketed spend time series endpoint"""
+
+    def setUp(self):
+        super().setUp()
+
+        from .views.api_analytics import get_timeseries_view
+
+        self.config.add_route('api_analytics_timeseries', '/api/analytics/timeseries')
+        self.get_timeseries = get_timeseries_view
+
+        # 2024-01-07 hari Minggu, 2024-01-08 Senin: minggu berbeda
+        for day, amount, category_id in [
+            (datetime.date(2024, 1, 7), 10.00, self.food_category_id),
+            (datetime.date(2024, 1, 8), 20.00, self.food_category_id),
+            (datetime.date(2024, 1, 8), 5.25, self.transport_category_id),
+            (datetime.date(2024, 3, 31), 7.00, self.food_category_id),
+        ]:
+            self.dbsession.add(Transaction(description='Seed', amount=amount, date=day,
+                                           user_id=self.test_user_id, category_id=category_id))
+        self.dbsession.flush()
+
+    def timeseries(self, **params):
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params = params
+        return self.get_timeseries(request)
+
+    def test_buckets_are_filled(self):
+        """Test day/week/month bucketing with zero-filled gaps"""
+        response = self.timeseries(**{'from': '2024-01-01', 'to': '2024-04-15', 'bucket': 'month'})
+        self.assertEqual(response['buckets'], ['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01'])
+        self.assertEqual(response['totals'], [35.25, 0.0, 7.0, 0.0])
+        self.assertEqual(response['counts'], [3, 0, 1, 0])
+
+        response = self.timeseries(**{'from': '2024-01-03', 'to': '2024-01-16', 'bucket': 'week'})
+        self.assertEqual(response['buckets'], ['2024-01-01', '2024-01-08', '2024-01-15'])
+        self.assertEqual(response['totals'], [10.0, 25.25, 0.0])
+
+        response = self.timeseries(**{'from': '2024-01-06', 'to': '2024-01-09', 'bucket': 'day',
+                                      'category_id': str(self.food_category_id)})
+        self.assertEqual(response['buckets'], ['2024-01-06', '2024-01-07', '2024-01-08', '2024-01-09'])
+        self.assertEqual(response['totals'], [0.0, 10.0, 20.0, 0.0])
+
+    def test_python_fallback_matches_numpy(self):
+        """Test that the pure-Python bucket fill gives the same arrays as NumPy"""
+        from .views import api_analytics
+
+        params = {'from': '2023-12-20', 'to': '2024-04-02'}
+        for bucket in ('day', 'week', 'month'):
+            expected = self.timeseries(bucket=bucket, **params)
+            with patch.object(api_analytics, 'numpy', None):
+                self.assertEqual(self.timeseries(bucket=bucket, **params), expected)
+
+    def test_invalid_parameters(self):
+        """Test validation of bucket, dates, range length and category ownership"""
+        from pyramid.httpexceptions import HTTPBadRequest, HTTPNotFound
+
+        for params in ({'bucket': 'year'}, {'from': '2024-13-01'}, {'from': '2024-02-01', 'to': '2024-01-01'},
+                       {'from': '2000-01-01', 'to': '2024-01-01', 'bucket': 'day'}, {'category_id': 'x'}):
+            with self.assertRaises(HTTPBadRequest):
+                self.timeseries(**params)
+        with self.assertRaises(HTTPNotFound):
+            self.timeseries(category_id='999999')
+
+
 class TestDashboard(BaseTest):
     """Test Dashboard API endpoint"""
     
@@ -558,4 +1907,242 @@ class TestDashboard(BaseTest):
         self.assertTrue('latest_transactions' in summary_data)
         self.assertTrue('top_category_this_month' in summary_data)
         self.assertTrue('total_transactions_this_month' in summary_data)
-        self.assertTrue('expenses_per_category' in summary_data)
\ No newline at end of file
+        self.assertTrue('expenses_per_category' in summary_data)
+
+    def test_dashboard_summary_current_month_only(self):
+        """Test that monthly figures only include transactions from the current month"""
+        from sqlalchemy import event
+        from .views.api_dashboard import month_bounds
+
+        month_start, next_month_start = month_bounds(datetime.date.today())
+        # Transaksi bulan lalu tidak boleh ikut dihitung
+        self.dbsession.add(Transaction(
+            description="Last month",
+            amount=100.00,
+            date=month_start - datetime.timedelta(days=1),
+            user_id=self.test_user_id,
+            category_id=self.food_category_id
+        ))
+        self.dbsession.flush()
+
+        this_month = self.dbsession.query(Transaction).filter(
+            Transaction.user_id == self.test_user_id,
+            Transaction.date >= month_start,
+            Transaction.date < next_month_start
+        ).all()
+        expected_total = float(sum(t.amount for t in this_month))
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = self.dbsession.get_bind()
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            response = self.get_dashboard_summary(request)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+
+        summary_data = response.json
+        self.assertAlmostEqual(summary_data['total_expenses_this_month'], expected_total)
+        self.assertEqual(summary_data['total_transactions_this_month'], len(this_month))
+        self.assertAlmostEqual(
+            sum(item['total'] for item in summary_data['expenses_per_category']), expected_total
+        )
+        if this_month:
+            self.assertEqual(
+                summary_data['top_category_this_month'], summary_data['expenses_per_category'][0]
+            )
+        # 1 query versi data (ETag) + 2 query ringkasan
+        self.assertLessEqual(len(statements), 3, statements)
+
+    def test_dashboard_summary_etag(self):
+        """Test ETag / 304 handling driven by the user's data version"""
+        from sqlalchemy import event
+        from .models.versioning import bump_data_version
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        response = self.get_dashboard_summary(request)
+        self.assertEqual(response.status_code, 200)
+        etag = response.etag
+        self.assertTrue(etag)
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = self.dbsession.get_bind()
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            request.headers['If-None-Match'] = f'"{etag}"'
+            response = self.get_dashboard_summary(request)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+
+        self.assertEqual(response.status_code, 304)
+        # Hanya query versi data, tanpa query agregat
+        self.assertEqual(len(statements), 1, statements)
+
+        bump_data_version(self.dbsession, self.test_user_id)
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.headers['If-None-Match'] = f'"{etag}"'
+        response = self.get_dashboard_summary(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.etag, etag)
+        self.assertTrue('expenses_per_category' in response.json)
+
+    def past_month_summary(self, month, etag=None):
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.params['month'] = month
+        if etag:
+            request.headers['If-None-Match'] = f'"{etag}"'
+        return self.get_dashboard_summary(request)
+
+    @patch('transaction.manager')
+    def test_dashboard_closed_month_cache(self, mock_transaction_manager):
+        """Test that a past month is cached until a write touches that month"""
+        from sqlalchemy import event
+        from .views.api_transactions import create_transaction_view, update_transaction_view
+
+        def create(description, day):
+            request = dummy_request(self.dbsession)
+            request.authenticated_userid = self.test_user_id
+            request.json_body = {
+                'description': description,
+                'amount': '12.00',
+                'date': day,
+                'category_id': str(self.food_category_id)
+            }
+            return create_transaction_view(request)['transaction']['id']
+
+        old_id = create('Old groceries', '2024-01-15')
+        response = self.past_month_summary('2024-01')
+        self.assertEqual(response.status_code, 200)
+        summary_data = response.json
+        self.assertEqual(summary_data['month'], '2024-01')
+        self.assertEqual(summary_data['total_transactions_this_month'], 1)
+        # Transaksi terakhir dibatasi ke bulan yang diminta
+        self.assertEqual([t['description'] for t in summary_data['latest_transactions']], ['Old groceries'])
+        etag = response.etag
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = self.dbsession.get_bind()
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            response = self.past_month_summary('2024-01')
+            not_modified = self.past_month_summary('2024-01', etag=etag)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+        self.assertEqual(response.etag, etag)
+        self.assertEqual(not_modified.status_code, 304)
+        # Dari cache: hanya query versi bulan per request
+        self.assertEqual(len(statements), 2, statements)
+
+        # Penulisan di bulan lain tidak mengusangkan bulan tersebut
+        create('Coffee', datetime.date.today().isoformat())
+        create('Feb rent', '2024-02-01')
+        self.assertEqual(self.past_month_summary('2024-01', etag=etag).status_code, 304)
+
+        # Perubahan deskripsi saja tetap mengubah isi ringkasan bulan itu
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'transaction_id': old_id}
+        request.json_body = {'description': 'Old groceries (market)'}
+        update_transaction_view(request)
+        response = self.past_month_summary('2024-01', etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.etag, etag)
+        self.assertEqual(response.json['latest_transactions'][0]['description'], 'Old groceries (market)')
+
+    def test_closed_month_cache_survives_database_reset(self):
+        """Test that a cached month body does not match again after the month versions restart"""
+        from .models import MonthlyDataVersion
+        from .models.versioning import bump_month_versions, get_month_version
+
+        key = [(self.test_user_id, '2024-01')]
+        bump_month_versions(self.dbsession, key)
+        etag = self.past_month_summary('2024-01').etag
+
+        # Database di-reset: versi bulan dimulai lagi dari 1 dengan data berbeda
+        self.dbsession.query(MonthlyDataVersion).delete()
+        bump_month_versions(self.dbsession, key)
+        self.assertEqual(get_month_version(self.dbsession, self.test_user_id, '2024-01'), 1)
+        response = self.past_month_summary('2024-01', etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.etag, etag)
+
+    def test_dashboard_month_parameter(self):
+        """Test the current month via ?month and invalid values"""
+        from pyramid.httpexceptions import HTTPBadRequest
+        from .models.rollup import year_month
+
+        current = year_month(datetime.date.today())
+        response = self.past_month_summary(current)
+        self.assertEqual(response.json['month'], current)
+        self.assertEqual(response.json['total_transactions_this_month'], self.dbsession.query(Transaction).filter(
+            Transaction.date >= datetime.date.today().replace(day=1)
+        ).count())
+
+        for value in ('2024-13', '2024', 'januari'):
+            with self.assertRaises(HTTPBadRequest):
+                self.past_month_summary(value)
+
+    def test_dashboard_empty_month_types(self):
+        """Test that an empty month renders the same numeric types as a month with data"""
+        summary_data = self.past_month_summary('2000-01').json
+        self.assertEqual(summary_data['total_expenses_this_month'], 0)
+        self.assertIsInstance(summary_data['total_expenses_this_month'], float)
+        self.assertIsInstance(summary_data['top_category_this_month']['total'], float)
+        self.assertEqual(summary_data['total_transactions_this_month'], 0)
+
+    def test_category_rename_bumps_month_versions(self):
+        """Test that renaming a category invalidates every cached month"""
+        from .views.api_categories import update_category_view
+        from .models.versioning import get_month_version, rollup_months
+
+        months = {year_month for _, year_month in rollup_months(self.dbsession, self.test_user_id)}
+        self.assertTrue(months)
+        before = {ym: get_month_version(self.dbsession, self.test_user_id, ym) for ym in months}
+
+        request = dummy_request(self.dbsession)
+        request.authenticated_userid = self.test_user_id
+        request.matchdict = {'category_id': self.food_category_id}
+        request.json_body = {'name': 'Meals'}
+        update_category_view(request)
+
+        for ym in months:
+            self.assertEqual(get_month_version(self.dbsession, self.test_user_id, ym), before[ym] + 1)
+
+
+class TestSpillCache(unittest.TestCase):
+    """Test the memory + disk cache used for closed dashboard months"""
+
+    def test_disk_round_trip(self):
+        import tempfile
+        from .cache import SpillCache
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SpillCache(maxsize=1, directory=directory)
+            cache.set((1, '2024-01'), ('1-2024-01-m3', b'{"month":"2024-01"}'))
+            cache.set((1, '2024-02'), ('1-2024-02-m1', b'{}'))
+
+            # Tergeser dari memori tetapi masih dibaca dari disk, juga oleh instance lain
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get((1, '2024-01')), ('1-2024-01-m3', b'{"month":"2024-01"}'))
+            other = SpillCache(directory=directory)
+            self.assertEqual(other.get((1, '2024-02')), ('1-2024-02-m1', b'{}'))
+
+            other.pop((1, '2024-02'))
+            cache.clear()
+            self.assertIsNone(cache.get((1, '2024-02')))
+            self.assertIsNone(SpillCache().get((1, '2024-01')))
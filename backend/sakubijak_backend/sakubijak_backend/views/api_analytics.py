@@ -0,0 +1,210 @@
+"""
+Analitik pengeluaran: deret waktu total per hari/minggu/bulan.
+
+Agregasi dilakukan di database dengan satu GROUP BY atas tanggal yang sudah
+dipotong ke awal bucket; bucket kosong diisi nol di Python (vektor NumPy jika
+terpasang, loop biasa jika tidak). Respons berupa array paralel agar ringkas
+untuk chart.
+"""
+import datetime
+
+from pyramid.httpexceptions import HTTPBadRequest, HTTPForbidden, HTTPNotFound
+from pyramid.view import view_config
+from sqlalchemy import Date, cast, func, literal_column, select
+
+from ..models import Category, Transaction
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy opsional
+    numpy = None
+
+VIEW_PERMISSION = 'view_self'
+
+BUCKETS = ('day', 'week', 'month')
+# Rentang default jika 'from' tidak dikirim, dihitung mundur dari 'to'
+DEFAULT_SPAN_DAYS = {'day': 30, 'week': 7 * 12, 'month': 365}
+# Batas jumlah bucket per respons (sekitar tiga tahun harian)
+MAX_BUCKETS = 1100
+
+
+def parse_date_param(request, name, default=None):
+    value = request.params.get(name)
+    if not value:
+        return default
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise HTTPBadRequest(json_body={'error': f'Format {name} tidak valid (YYYY-MM-DD).'})
+
+
+def bucket_start(day, bucket):
+    """
+    Awal bucket yang memuat ``day``: tanggal itu sendiri, Senin pada minggu
+    tersebut (ISO, sama dengan date_trunc('week') PostgreSQL), atau tanggal 1.
+    """
+    if bucket == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, bucket):
+    if bucket == 'week':
+        return day + datetime.timedelta(days=7)
+    if bucket == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=1)
+
+
+def bucket_count(first, last, bucket):
+    if bucket == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    step = 7 if bucket == 'week' else 1
+    return (last - first).days // step + 1
+
+
+def bucket_key(dialect_name, bucket):
+    """
+    Ekspresi SQL yang memotong Transaction.date ke awal bucket, atau None jika
+    dialek tidak dikenal (agregasi per hari lalu dipotong di Python).
+    """
+    if dialect_name == 'postgresql':
+        return cast(func.date_trunc(literal_column(f"'{bucket}'"), Transaction.date), Date)
+    if dialect_name == 'sqlite':
+        if bucket == 'week':
+            # strftime('%w'): 0 = Minggu; mundur ke Senin
+            return func.date(
+                Transaction.date, func.printf('-%d days', (func.strftime('%w', Transaction.date) + 6) % 7)
+            )
+        if bucket == 'month':
+            return func.strftime('%Y-%m-01', Transaction.date)
+        return func.date(Transaction.date)
+    return None
+
+
+def as_date(value):
+    # SQLite mengembalikan string 'YYYY-MM-DD', PostgreSQL date
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def fill_buckets(rows, first, last, bucket):
+    """
+    Menyusun array paralel (buckets, totals, counts) dari ``rows`` berisi
+    (awal bucket, total, jumlah); bucket tanpa transaksi bernilai nol.
+    """
+    if numpy is not None:
+        return fill_buckets_numpy(rows, first, last, bucket)
+    return fill_buckets_python(rows, first, last, bucket)
+
+
+def fill_buckets_numpy(rows, first, last, bucket):
+    unit = 'M' if bucket == 'month' else 'D'
+    step = 7 if bucket == 'week' else 1
+    start = numpy.datetime64(first, unit)
+    size = bucket_count(first, last, bucket)
+    starts = start + numpy.arange(size) * step
+
+    totals = numpy.zeros(size)
+    counts = numpy.zeros(size, dtype=numpy.int64)
+    if rows:
+        keys, sums, numbers = zip(*rows)
+        positions = (numpy.array(keys, dtype=f'datetime64[{unit}]') - start).astype(numpy.int64) // step
+        # add.at menjumlahkan posisi yang sama (baris per hari pada dialek tanpa bucket_key)
+        numpy.add.at(totals, positions, numpy.array(sums, dtype=float))
+        numpy.add.at(counts, positions, numpy.array(numbers, dtype=numpy.int64))
+
+    buckets = numpy.datetime_as_string(starts.astype('datetime64[D]'), unit='D')
+    return buckets.tolist(), numpy.round(totals, 2).tolist(), counts.tolist()
+
+
+def fill_buckets_python(rows, first, last, bucket):
+    index = {}
+    buckets = []
+    day = first
+    while day <= last:
+        index[day] = len(buckets)
+        buckets.append(day)
+        day = next_bucket(day, bucket)
+
+    totals = [0.0] * len(buckets)
+    counts = [0] * len(buckets)
+    for key, total, count in rows:
+        position = index[key]
+        totals[position] += float(total)
+        counts[position] += count
+    return [day.isoformat() for day in buckets], [round(total, 2) for total in totals], counts
+
+
+@view_config(
+    route_name='api_analytics_timeseries',
+    request_method='GET',
+    renderer='json',
+    permission=VIEW_PERMISSION
+)
+def get_timeseries_view(request):
+    """
+    Total pengeluaran per bucket (day/week/month) dalam rentang from..to
+    (inklusif), opsional untuk satu kategori. ``buckets`` berisi tanggal awal
+    tiap bucket; ``totals`` dan ``counts`` sejajar dengannya.
+    """
+    user_id = request.authenticated_userid
+    if not user_id:
+        raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
+
+    bucket = request.params.get('bucket', 'month')
+    if bucket not in BUCKETS:
+        raise HTTPBadRequest(json_body={'error': 'Bucket tidak valid (day, week atau month).'})
+
+    to_date = parse_date_param(request, 'to', datetime.date.today())
+    from_date = parse_date_param(request, 'from', to_date - datetime.timedelta(days=DEFAULT_SPAN_DAYS[bucket]))
+    if from_date > to_date:
+        raise HTTPBadRequest(json_body={'error': "Tanggal 'from' tidak boleh setelah 'to'."})
+
+    first, last = bucket_start(from_date, bucket), bucket_start(to_date, bucket)
+    if bucket_count(first, last, bucket) > MAX_BUCKETS:
+        raise HTTPBadRequest(json_body={'error': f'Rentang terlalu panjang (maksimal {MAX_BUCKETS} bucket).'})
+
+    criteria = [
+        Transaction.user_id == user_id,
+        Transaction.date >= from_date,
+        Transaction.date <= to_date,
+    ]
+    category_id = request.params.get('category_id')
+    if category_id:
+        try:
+            category_id = int(category_id)
+        except ValueError:
+            raise HTTPBadRequest(json_body={'error': 'Format category_id tidak valid.'})
+        owned = request.dbsession.query(Category.id).filter_by(id=category_id, user_id=user_id).first()
+        if owned is None:
+            raise HTTPNotFound(json_body={'error': 'Kategori tidak ditemukan atau Anda tidak memiliki akses.'})
+        criteria.append(Transaction.category_id == category_id)
+    else:
+        category_id = None
+
+    dbsession = request.dbsession
+    key = bucket_key(dbsession.get_bind().dialect.name, bucket)
+    group = key if key is not None else Transaction.date
+    rows = dbsession.execute(
+        select(group.label('bucket'), func.sum(Transaction.amount), func.count())
+        .where(*criteria)
+        .group_by(group)
+    ).all()
+    rows = [(bucket_start(as_date(day), bucket), total, count) for day, total, count in rows]
+
+    buckets, totals, counts = fill_buckets(rows, first, last, bucket)
+    return {
+        'bucket': bucket,
+        'from': from_date,
+        'to': to_date,
+        'category_id': category_id,
+        'buckets': buckets,
+        'totals': totals,
+        'counts': counts,
+    }
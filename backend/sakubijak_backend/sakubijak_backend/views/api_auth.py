@@ -1,14 +1,22 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import HTTPBadRequest, HTTPUnauthorized, HTTPCreated
 import transaction
-from passlib.context import CryptContext
 import jwt
 import datetime
+import logging
 
 from ..models import User
+from ..passwords import HasherUnavailable, PasswordHasher
 
-# Konfigurasi context untuk hashing password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+log = logging.getLogger(__name__)
+
+# Hasher inline untuk pemakaian di luar request (test, script) dan fallback
+# jika aplikasi tidak mendaftarkan 'password_hasher' (lihat passwords.includeme)
+default_hasher = PasswordHasher()
+pwd_context = default_hasher.context
+
+# Detik yang disarankan ke klien saat pool hashing penuh
+HASHER_RETRY_AFTER = 1
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -16,6 +24,14 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def get_password_hasher(request):
+    return request.registry.get('password_hasher') or default_hasher
+
+def hasher_unavailable(request):
+    request.response.status_code = 503
+    request.response.headers['Retry-After'] = str(HASHER_RETRY_AFTER)
+    return {'error': 'Server sedang sibuk, silakan coba lagi sebentar.'}
+
 @view_config(route_name='api_auth_register', request_method='POST', renderer='json')
 def register_view(request):
     """
@@ -49,12 +65,15 @@ def register_view(request):
         if existing_user:
             request.response.status_code = 409 # Conflict
             return {'error': 'Email sudah terdaftar.'}
-    except Exception as e:
-        print(f"Database error while checking existing user: {e}")
+    except Exception:
+        log.exception("Database error while checking existing user")
         request.response.status_code = 500
         return {'error': 'Terjadi masalah pada server saat memeriksa email.'}
 
-    hashed_password = get_password_hash(password)
+    try:
+        hashed_password = get_password_hasher(request).hash(password)
+    except HasherUnavailable:
+        return hasher_unavailable(request)
     new_user = User(name=name, email=email, hashed_password=hashed_password)
     
     try:
@@ -73,8 +92,8 @@ def register_view(request):
             'message': 'Registrasi berhasil!',
             'user': user_data
         }
-    except Exception as e:
-        print(f"Error saat menyimpan user: {e}")
+    except Exception:
+        log.exception("Error saat menyimpan user")
         request.response.status_code = 500
         return {'error': 'Gagal menyimpan pengguna ke database.'}
 
@@ -100,12 +119,22 @@ def login_view(request):
 
     try:
         user = request.dbsession.query(User).filter_by(email=email).first()
-    except Exception as e:
-        print(f"Database error while fetching user: {e}")
+    except Exception:
+        log.exception("Database error while fetching user")
         request.response.status_code = 500
         return {'error': 'Terjadi masalah pada server saat mengambil data pengguna.'}
 
-    if user and verify_password(password, user.hashed_password):
+    password_valid = False
+    if user:
+        try:
+            password_valid, new_hash = get_password_hasher(request).verify_and_update(password, user.hashed_password)
+        except HasherUnavailable:
+            return hasher_unavailable(request)
+        if password_valid and new_hash:
+            # Hash lama memakai parameter usang (misalnya rounds lebih kecil): simpan hash baru
+            user.hashed_password = new_hash
+
+    if password_valid:
         # Login berhasil, buat JWT
         settings = request.registry.settings
         secret_key = settings.get('jwt.secret_key')
@@ -113,7 +142,7 @@ def login_view(request):
         expiration_delta_seconds = int(settings.get('jwt.expiration_delta_seconds', 3600))
 
         if not secret_key:
-            print("ERROR: JWT Secret Key tidak dikonfigurasi!")
+            log.error("JWT Secret Key tidak dikonfigurasi!")
             request.response.status_code = 500
             return {'error': 'Konfigurasi server error.'}
 
@@ -125,8 +154,8 @@ def login_view(request):
         
         try:
             token = jwt.encode(payload, secret_key, algorithm=algorithm)
-        except Exception as e:
-            print(f"Error encoding JWT: {e}")
+        except Exception:
+            log.exception("Error encoding JWT")
             request.response.status_code = 500
             return {'error': 'Gagal membuat token autentikasi.'}
 
@@ -174,7 +203,7 @@ def users_me_view(request):
         else:
             request.response.status_code = 404 # Not Found
             return {'error': 'Pengguna tidak ditemukan.'}
-    except Exception as e:
-        print(f"Database error while fetching user details: {e}")
+    except Exception:
+        log.exception("Database error while fetching user details")
         request.response.status_code = 500
         return {'error': 'Terjadi masalah pada server saat mengambil detail pengguna.'}
\ No newline at end of file
@@ -1,20 +1,66 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import (
     HTTPBadRequest, 
-    HTTPCreated, 
-    HTTPOk, 
     HTTPForbidden, 
     HTTPNotFound, # Untuk item tidak ditemukan
-    HTTPNoContent # Untuk delete sukses
+    HTTPNoContent, # Untuk delete sukses
+    HTTPNotModified
 )
+from pyramid.response import Response
+from sqlalchemy import func
 import transaction
+import logging
 
+from ..cache import LRUCache, etag_matches
 from ..models import Category, User 
+from ..models.versioning import bump_data_version, bump_user_month_versions
+from ..renderers import dumps
+
+log = logging.getLogger(__name__)
 
 # Permission strings
 VIEW_PERMISSION = 'view_self'
 EDIT_PERMISSION = 'edit_self'
 
+# Kolom yang dikirim pada daftar kategori, diambil sebagai row ringan
+CATEGORY_COLUMNS = (
+    Category.id,
+    Category.name,
+    Category.description,
+    Category.created_at,
+    Category.updated_at,
+)
+
+# Cache body daftar kategori yang sudah dirender per pengguna: user_id -> (etag, body).
+# Dikosongkan oleh create/update/delete kategori; di proses worker lain entri
+# usang tetap tidak terpakai karena etag-nya tidak cocok lagi.
+CATEGORIES_CACHE_SIZE = 1024
+categories_cache = LRUCache(maxsize=CATEGORIES_CACHE_SIZE)
+
+def categories_etag(dbsession, user_id):
+    """
+    ETag daftar kategori dari jumlah kategori dan updated_at terbaru: create dan
+    update selalu menaikkan updated_at terbaru, delete mengubah jumlah.
+    Tidak ikut berubah oleh penulisan transaksi (berbeda dengan data_version).
+    """
+    count, last_updated = dbsession.query(
+        func.count(Category.id), func.max(Category.updated_at)
+    ).filter(Category.user_id == user_id).one()
+    stamp = last_updated.strftime('%Y%m%d%H%M%S%f') if last_updated else '0'
+    return f'c{user_id}-{count}-{stamp}'
+
+def category_row_to_dict(row):
+    """
+    Serializer bersama row kategori (CATEGORY_COLUMNS) ke dict respons.
+    """
+    return {
+        'id': row.id,
+        'name': row.name,
+        'description': row.description,
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+    }
+
 # Fungsi create_category_view dan get_categories_view
 @view_config(
     route_name='api_categories_collection',
@@ -44,6 +90,8 @@ def create_category_view(request):
         with transaction.manager:
             request.dbsession.add(new_category)
             request.dbsession.flush()
+            bump_data_version(request.dbsession, user_id)
+        categories_cache.pop(user_id)
 
         category_data = {
             'id': new_category.id,
@@ -51,12 +99,13 @@ def create_category_view(request):
             'description': new_category.description,
             'user_id': new_category.user_id
         }
-        return HTTPCreated(json_body={
+        request.response.status_code = 201
+        return {
             'message': 'Kategori berhasil ditambahkan!',
             'category': category_data
-        })
-    except Exception as e:
-        print(f"Error saat menyimpan kategori: {e}")
+        }
+    except Exception:
+        log.exception("Error saat menyimpan kategori")
         raise HTTPBadRequest(json_body={'error': 'Gagal menyimpan kategori ke database.'})
 
 @view_config(
@@ -66,25 +115,38 @@ def create_category_view(request):
     permission=VIEW_PERMISSION
 )
 def get_categories_view(request):
+    """
+    Daftar kategori pengguna yang login. Respons diberi ETag (lihat
+    categories_etag); If-None-Match yang cocok dijawab 304 dan body yang sama
+    disajikan dari cache tanpa query dan serialisasi ulang.
+    """
     user_id = request.authenticated_userid
     if not user_id:
         raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
 
     try:
-        categories = request.dbsession.query(Category).filter_by(user_id=user_id).order_by(Category.name).all()
-        
-        categories_data = [
-            {
-                'id': category.id,
-                'name': category.name,
-                'description': category.description,
-                'created_at': category.created_at.isoformat() if category.created_at else None,
-                'updated_at': category.updated_at.isoformat() if category.updated_at else None,
-            } for category in categories
-        ]
-        return HTTPOk(json_body={'categories': categories_data})
-    except Exception as e:
-        print(f"Error saat mengambil kategori: {e}")
+        etag = categories_etag(request.dbsession, user_id)
+
+        if etag_matches(request, etag):
+            response = HTTPNotModified()
+            response.etag = etag
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        cached = categories_cache.get(user_id)
+        if cached is not None and cached[0] == etag:
+            body = cached[1]
+        else:
+            categories = request.dbsession.query(*CATEGORY_COLUMNS).filter(Category.user_id == user_id).order_by(Category.name).all()
+            body = dumps({'categories': [category_row_to_dict(row) for row in categories]})
+            categories_cache.set(user_id, (etag, body))
+
+        response = Response(body=body, content_type='application/json', charset='utf-8')
+        response.etag = etag
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    except Exception:
+        log.exception("Error saat mengambil kategori")
         request.response.status_code = 500
         return {'error': 'Gagal mengambil data kategori dari server.'}
 
@@ -116,12 +178,12 @@ def get_category_detail_view(request):
             'name': category.name,
             'description': category.description,
             'user_id': category.user_id,
-            'created_at': category.created_at.isoformat() if category.created_at else None,
-            'updated_at': category.updated_at.isoformat() if category.updated_at else None,
+            'created_at': category.created_at,
+            'updated_at': category.updated_at,
         }
-        return HTTPOk(json_body={'category': category_data})
-    except Exception as e:
-        print(f"Error saat mengambil detail kategori: {e}")
+        return {'category': category_data}
+    except Exception:
+        log.exception("Error saat mengambil detail kategori")
         request.response.status_code = 500
         return {'error': 'Gagal mengambil detail kategori dari server.'}
 
@@ -167,22 +229,26 @@ def update_category_view(request):
             
             # SQLAlchemy akan mendeteksi perubahan dan session akan di-flush/commit oleh transaction manager
             request.dbsession.flush() # Untuk mendapatkan data terupdate jika ada trigger/default di DB
+            bump_data_version(request.dbsession, user_id)
+            # Nama kategori tampil di ringkasan setiap bulan
+            bump_user_month_versions(request.dbsession, user_id)
 
             updated_category_data = {
                 'id': category.id,
                 'name': category.name,
                 'description': category.description,
                 'user_id': category.user_id,
-                'updated_at': category.updated_at.isoformat() if category.updated_at else None,
+                'updated_at': category.updated_at,
             }
-        return HTTPOk(json_body={
+        categories_cache.pop(user_id)
+        return {
             'message': 'Kategori berhasil diperbarui!',
             'category': updated_category_data
-        })
+        }
     except HTTPNotFound: # Re-raise HTTPNotFound agar tidak ditangkap sebagai error umum
         raise
-    except Exception as e:
-        print(f"Error saat memperbarui kategori: {e}")
+    except Exception:
+        log.exception("Error saat memperbarui kategori")
         raise HTTPBadRequest(json_body={'error': 'Gagal memperbarui kategori di database.'})
 
 
@@ -210,13 +276,18 @@ def delete_category_view(request):
             if not category:
                 raise HTTPNotFound(json_body={'error': 'Kategori tidak ditemukan atau Anda tidak memiliki akses.'})
 
+            # Sebelum delete: baris rollup kategori ini (penanda bulan yang terdampak)
+            # ikut terhapus bersama transaksinya
+            bump_user_month_versions(request.dbsession, user_id)
             request.dbsession.delete(category)
+            bump_data_version(request.dbsession, user_id)
             # request.dbsession.flush() # Tidak selalu perlu flush eksplisit untuk delete sebelum commit oleh TM
 
+        categories_cache.pop(user_id)
         return HTTPNoContent() # Status 204 No Content, tidak ada body respons
     except HTTPNotFound: # Re-raise HTTPNotFound
         raise
-    except Exception as e:
-        print(f"Error saat menghapus kategori: {e}")
+    except Exception:
+        log.exception("Error saat menghapus kategori")
         # Bisa jadi ada constraint error jika kategori masih digunakan dan tidak ada cascade
         raise HTTPBadRequest(json_body={'error': 'Gagal menghapus kategori. Mungkin masih ada transaksi terkait.'})
\ No newline at end of file
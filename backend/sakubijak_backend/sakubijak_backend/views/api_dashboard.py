@@ -1,12 +1,63 @@
 from pyramid.view import view_config
-from pyramid.httpexceptions import HTTPForbidden, HTTPOk
-from sqlalchemy import func, extract
-from datetime import datetime, date
+from pyramid.httpexceptions import HTTPBadRequest, HTTPForbidden, HTTPNotModified
+from pyramid.response import Response
+from sqlalchemy import func
+from datetime import date, datetime
+from decimal import Decimal
 
-from ..models import Transaction, Category
+from ..cache import LRUCache, SpillCache, etag_matches
+from ..models import Transaction, Category, MonthlyCategoryTotal
+from ..models.rollup import year_month
+from ..models.versioning import get_data_version, get_month_stamp
+from ..renderers import dumps
 
 VIEW_PERMISSION = 'view_self'
 
+# Cache body ringkasan yang sudah dirender untuk bulan berjalan (dan bulan yang
+# belum lewat): (user_id, 'YYYY-MM') -> (etag, body). Entri otomatis usang saat
+# versi data pengguna berubah karena etag tidak cocok lagi.
+DASHBOARD_CACHE_SIZE = 1024
+summary_cache = LRUCache(maxsize=DASHBOARD_CACHE_SIZE)
+
+# Ringkasan bulan yang sudah lewat hampir tidak pernah berubah, jadi disimpan
+# tanpa batas waktu (LRU, opsional spill ke disk lewat sakubijak.dashboard.cache_dir).
+# Validasinya memakai versi per bulan (models/versioning.py) yang hanya naik jika
+# penulisan menyentuh transaksi bertanggal di bulan tersebut.
+CLOSED_MONTH_CACHE_SIZE = 8192
+closed_month_cache = SpillCache(maxsize=CLOSED_MONTH_CACHE_SIZE)
+
+
+def includeme(config):
+    """
+    Membaca sakubijak.dashboard.closed_cache_size dan sakubijak.dashboard.cache_dir
+    (kosong = hanya memori).
+    """
+    settings = config.get_settings()
+    size = settings.get('sakubijak.dashboard.closed_cache_size')
+    closed_month_cache.configure(
+        maxsize=int(size) if size not in (None, '') else CLOSED_MONTH_CACHE_SIZE,
+        directory=settings.get('sakubijak.dashboard.cache_dir'),
+    )
+
+
+def month_bounds(day):
+    """
+    Mengembalikan (awal bulan, awal bulan berikutnya) untuk tanggal yang diberikan.
+    """
+    month_start = day.replace(day=1)
+    if month_start.month == 12:
+        return month_start, month_start.replace(year=month_start.year + 1, month=1)
+    return month_start, month_start.replace(month=month_start.month + 1)
+
+def parse_month(value):
+    """
+    Awal bulan dari string 'YYYY-MM', atau raise HTTPBadRequest.
+    """
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise HTTPBadRequest(json_body={'error': 'Format month tidak valid (YYYY-MM).'})
+
 @view_config(
     route_name='api_dashboard_summary',
     request_method='GET',
@@ -15,30 +66,100 @@ VIEW_PERMISSION = 'view_self'
 )
 def get_dashboard_summary_view(request):
     """
-    Menyediakan data ringkasan untuk dashboard pengguna yang sedang login.
+    Menyediakan data ringkasan untuk dashboard pengguna yang sedang login,
+    untuk bulan berjalan atau bulan lain lewat ``?month=YYYY-MM``.
+
+    Bulan berjalan diberi ETag berdasarkan versi data pengguna. Bulan yang
+    sudah lewat memakai versi bulan itu saja dan body-nya disimpan di
+    closed_month_cache. If-None-Match yang cocok dijawab 304 sebelum query
+    agregat apa pun dijalankan.
     """
     user_id = request.authenticated_userid
     if not user_id:
         raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
 
-    dbsession = request.dbsession
     today = date.today()
-    current_month = today.month
-    current_year = today.year
+    current_month = today.replace(day=1)
+    month_param = request.params.get('month')
+    month = parse_month(month_param) if month_param else current_month
+    ym = year_month(month)
+    key = (user_id, ym)
+
+    if month < current_month:
+        cache = closed_month_cache
+        # Token acak di versi bulan mencegah body lama di cache disk cocok lagi
+        # setelah database di-reset/restore (counter versi mulai ulang)
+        etag = f'{user_id}-{ym}-m{get_month_stamp(request.dbsession, user_id, ym)}'
+    else:
+        cache = summary_cache
+        version = get_data_version(request.dbsession, user_id)
+        # Bulan ikut menjadi bagian ETag karena angka "bulan ini" berganti saat bulan berganti
+        etag = f'{user_id}-{version}-{ym}'
+
+    if etag_matches(request, etag):
+        response = HTTPNotModified()
+        response.etag = etag
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
 
-    # 1. Total Pengeluaran Bulan Ini
-    total_expenses_query = dbsession.query(func.sum(Transaction.amount))\
+    cached = cache.get(key)
+    if cached is not None and cached[0] == etag:
+        body = cached[1]
+    else:
+        # Tanpa ?month (bulan berjalan) transaksi terakhir diambil dari seluruh
+        # riwayat seperti sebelumnya; untuk bulan lain dibatasi ke bulan itu
+        summary_data = build_dashboard_summary(request.dbsession, user_id, month, latest_in_month=month != current_month)
+        body = dumps(summary_data)
+        cache.set(key, (etag, body))
+
+    response = Response(body=body, content_type='application/json', charset='utf-8')
+    response.etag = etag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def build_dashboard_summary(dbsession, user_id, today, latest_in_month=False):
+    """
+    Menghitung isi ringkasan dashboard untuk bulan dari tanggal ``today``.
+    Dengan ``latest_in_month`` transaksi terakhir dibatasi ke bulan tersebut.
+    """
+    # 1. Agregat bulan ini per kategori, dibaca dari rollup monthly_category_totals
+    # (beberapa baris per pengguna) alih-alih memindai tabel transactions
+    monthly_rows = dbsession.query(
+            Category.name,
+            func.sum(MonthlyCategoryTotal.total).label('total_amount'),
+            func.sum(MonthlyCategoryTotal.count).label('transaction_count')
+        )\
+        .join(MonthlyCategoryTotal, Category.id == MonthlyCategoryTotal.category_id)\
         .filter(
-            Transaction.user_id == user_id,
-            extract('year', Transaction.date) == current_year,
-            extract('month', Transaction.date) == current_month
-        ).scalar()
-    total_expenses = float(total_expenses_query) if total_expenses_query else 0.0
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.year_month == year_month(today)
+        )\
+        .group_by(Category.name)\
+        .all()
+
+    # Total, jumlah transaksi, kategori teratas dan data pie chart diturunkan
+    # dari hasil agregat yang sama
+    expenses_per_category = sorted(
+        ({'name': cat_name, 'total': total} for cat_name, total, _ in monthly_rows),
+        key=lambda item: item['total'],
+        reverse=True
+    )
+    # Decimal juga untuk bulan kosong agar tipe di JSON tidak bergantung pada data
+    total_expenses = sum((total for _, total, _ in monthly_rows), Decimal('0'))
+    total_transactions_count = sum(count for _, _, count in monthly_rows)
+    top_category = expenses_per_category[0] if expenses_per_category else {'name': "N/A", 'total': Decimal('0')}
 
     # 2. Transaksi Terakhir (5 Transaksi)
     latest_transactions_query = dbsession.query(Transaction, Category.name)\
         .join(Category, Transaction.category_id == Category.id)\
-        .filter(Transaction.user_id == user_id)\
+        .filter(Transaction.user_id == user_id)
+    if latest_in_month:
+        month_start, next_month_start = month_bounds(today)
+        latest_transactions_query = latest_transactions_query.filter(
+            Transaction.date >= month_start, Transaction.date < next_month_start
+        )
+    latest_transactions_query = latest_transactions_query\
         .order_by(Transaction.date.desc(), Transaction.created_at.desc())\
         .limit(5).all()
 
@@ -46,58 +167,14 @@ def get_dashboard_summary_view(request):
         {
             'id': t.id,
             'description': t.description,
-            'amount': float(t.amount),
-            'date': t.date.isoformat(),
+            'amount': t.amount,
+            'date': t.date,
             'category_name': cat_name
         } for t, cat_name in latest_transactions_query
     ]
 
-    # 3. Kategori Teratas Bulan Ini (Berdasarkan Jumlah Pengeluaran)
-    top_category_query = dbsession.query(Category.name, func.sum(Transaction.amount).label('total'))\
-        .join(Transaction, Category.id == Transaction.category_id)\
-        .filter(
-            Transaction.user_id == user_id,
-            extract('year', Transaction.date) == current_year,
-            extract('month', Transaction.date) == current_month
-        )\
-        .group_by(Category.name)\
-        .order_by(func.sum(Transaction.amount).desc())\
-        .first()
-
-    top_category = {
-        'name': top_category_query[0] if top_category_query else "N/A",
-        'total': float(top_category_query[1]) if top_category_query else 0.0
-    }
-
-    # 4. Jumlah Total Transaksi Bulan Ini
-    total_transactions_count = dbsession.query(func.count(Transaction.id))\
-        .filter(
-            Transaction.user_id == user_id,
-            extract('year', Transaction.date) == current_year,
-            extract('month', Transaction.date) == current_month
-        ).scalar() or 0
-
-    # 5. Pengeluaran per Kategori Bulan Ini (untuk Pie Chart)
-    expenses_per_category_query = dbsession.query(
-            Category.name, 
-            func.sum(Transaction.amount).label('total_amount')
-        )\
-        .join(Transaction, Category.id == Transaction.category_id)\
-        .filter(
-            Transaction.user_id == user_id,
-            extract('year', Transaction.date) == current_year,
-            extract('month', Transaction.date) == current_month
-        )\
-        .group_by(Category.name)\
-        .order_by(func.sum(Transaction.amount).desc())\
-        .all()
-
-    expenses_per_category = [
-        {'name': cat_name, 'total': float(total)} 
-        for cat_name, total in expenses_per_category_query
-    ]
-
     summary_data = {
+        'month': year_month(today),
         'total_expenses_this_month': total_expenses,
         'latest_transactions': latest_transactions,
         'top_category_this_month': top_category,
@@ -105,4 +182,4 @@ def get_dashboard_summary_view(request):
         'expenses_per_category': expenses_per_category
     }
 
-    return HTTPOk(json_body=summary_data)
\ No newline at end of file
+    return summary_data
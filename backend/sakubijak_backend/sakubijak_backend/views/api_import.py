@@ -0,0 +1,222 @@
+from pyramid.view import view_config
+from pyramid.httpexceptions import (
+    HTTPBadRequest,
+    HTTPForbidden
+)
+import transaction
+import logging
+import datetime
+import csv
+import io
+import re
+from email.message import Message
+
+from ..models import Category
+from ..models.rollup import add_rollup_delta, apply_rollup_deltas
+from ..models.versioning import bump_data_version
+from .api_transactions import insert_transaction_rows, parse_new_transaction
+
+log = logging.getLogger(__name__)
+
+EDIT_PERMISSION = 'edit_self'
+
+# Jumlah baris per INSERT multi-baris saat import
+IMPORT_CHUNK_SIZE = 1000
+# Batas jumlah error baris yang dikembalikan di respons
+MAX_REPORTED_ERRORS = 100
+REQUIRED_COLUMNS = {'date', 'description', 'amount', 'category'}
+
+# Ukuran baca dari body request dan batas header satu part multipart
+MULTIPART_READ_SIZE = 64 * 1024
+MAX_PART_HEADER_SIZE = 16 * 1024
+
+_PART_NAME = re.compile(r'(?:^|;)\s*name="([^"]*)"', re.IGNORECASE)
+
+
+class MultipartFieldReader(io.RawIOBase):
+    """
+    Membaca isi satu field dari body multipart/form-data secara bertahap
+    langsung dari stream request. request.POST tidak dipakai karena WebOb
+    mem-parse seluruh upload terlebih dahulu sebelum baris pertama bisa dibaca.
+    Part lain dilewati; memori yang dipakai sebatas satu potongan baca.
+    """
+    def __init__(self, stream, boundary, field):
+        self.stream = stream
+        self.field = field
+        self.delimiter = b'\r\n--' + boundary
+        # CRLF di depan agar delimiter pertama (tanpa CRLF) ikut cocok
+        self.buffer = b'\r\n'
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def _fill(self):
+        chunk = self.stream.read(MULTIPART_READ_SIZE)
+        self.buffer += chunk
+        return bool(chunk)
+
+    def find_field(self):
+        """
+        Maju ke awal isi field; False jika field tidak ada di body.
+        """
+        keep = len(self.delimiter) - 1
+        while True:
+            index = self.buffer.find(self.delimiter)
+            while index < 0:
+                self.buffer = self.buffer[-keep:]
+                if not self._fill():
+                    return False
+                index = self.buffer.find(self.delimiter)
+            self.buffer = self.buffer[index + len(self.delimiter):]
+
+            while b'\r\n\r\n' not in self.buffer and not self.buffer.startswith(b'--'):
+                if len(self.buffer) > MAX_PART_HEADER_SIZE or not self._fill():
+                    return False
+            if self.buffer.startswith(b'--'):
+                # Delimiter penutup: tidak ada part lagi
+                return False
+
+            head, self.buffer = self.buffer.split(b'\r\n\r\n', 1)
+            for line in head.decode('latin-1').split('\r\n'):
+                name, _, value = line.partition(':')
+                if name.strip().lower() == 'content-disposition':
+                    match = _PART_NAME.search(value)
+                    if match and match.group(1) == self.field:
+                        return True
+
+    def readinto(self, b):
+        if self.done:
+            return 0
+        keep = len(self.delimiter) - 1
+        while True:
+            index = self.buffer.find(self.delimiter)
+            if index >= 0:
+                available = index
+                break
+            # Ekor buffer bisa jadi awal delimiter, jadi ditahan sampai data berikutnya
+            if len(self.buffer) > keep:
+                available = len(self.buffer) - keep
+                break
+            if not self._fill():
+                # Body terpotong: kembalikan sisa data apa adanya
+                available = len(self.buffer)
+                break
+        if available == 0:
+            self.done = True
+            return 0
+        size = min(len(b), available)
+        b[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+def import_stream(request):
+    """
+    Mengembalikan stream biner isi CSV: field 'file' untuk upload multipart,
+    atau body request apa adanya (Content-Type: text/csv). Keduanya dibaca
+    bertahap dari body request.
+    """
+    if request.content_type == 'multipart/form-data':
+        header = Message()
+        header['Content-Type'] = request.headers.get('Content-Type', '')
+        boundary = header.get_param('boundary')
+        if not boundary:
+            raise HTTPBadRequest(json_body={'error': 'Boundary multipart tidak ditemukan.'})
+        reader = MultipartFieldReader(request.body_file, boundary.encode('latin-1'), 'file')
+        if not reader.find_field():
+            raise HTTPBadRequest(json_body={'error': "Field 'file' wajib diisi."})
+        return io.BufferedReader(reader, MULTIPART_READ_SIZE)
+    return request.body_file
+
+
+@view_config(
+    route_name='api_transactions_import',
+    request_method='POST',
+    renderer='json',
+    permission=EDIT_PERMISSION
+)
+def import_transactions_view(request):
+    """
+    Import mutasi rekening dari CSV dengan kolom date, description, amount, category
+    (nama kategori). CSV dibaca baris demi baris dari stream request dan disimpan
+    per chunk dengan INSERT multi-baris, tanpa membuat objek ORM Transaction,
+    sehingga memori tetap terbatas berapa pun jumlah barisnya. Baris yang tidak
+    valid dilewati dan dilaporkan dengan nomor barisnya.
+    """
+    user_id = request.authenticated_userid
+    if not user_id:
+        raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
+
+    reader = csv.DictReader(io.TextIOWrapper(import_stream(request), encoding='utf-8-sig', newline=''))
+    columns = {name.strip().lower() for name in (reader.fieldnames or []) if name}
+    if not REQUIRED_COLUMNS <= columns:
+        missing = ', '.join(sorted(REQUIRED_COLUMNS - columns))
+        raise HTTPBadRequest(json_body={'error': f'Kolom CSV tidak lengkap: {missing}.'})
+
+    # Semua kategori pengguna dimuat sekali: nama (case-insensitive) -> id
+    category_ids = {}
+    for category_id, name in (
+        request.dbsession.query(Category.id, Category.name)
+        .filter(Category.user_id == user_id)
+        .order_by(Category.id)
+    ):
+        category_ids.setdefault(name.strip().lower(), category_id)
+
+    imported = 0
+    skipped = 0
+    errors = []
+    deltas = {}
+    chunk = []
+
+    def flush_chunk():
+        now = datetime.datetime.utcnow()
+        for row in chunk:
+            row['created_at'] = row['updated_at'] = now
+        insert_transaction_rows(request.dbsession, chunk)
+        chunk.clear()
+
+    try:
+        with transaction.manager:
+            for raw in reader:
+                row = {(key or '').strip().lower(): (value or '').strip() for key, value in raw.items()}
+                try:
+                    category_id = category_ids.get(row.get('category', '').lower())
+                    if category_id is None:
+                        raise ValueError(f"Kategori '{row.get('category', '')}' tidak ditemukan.")
+                    fields = parse_new_transaction({
+                        'description': row.get('description'),
+                        'amount': row.get('amount'),
+                        'date': row.get('date'),
+                        'category_id': str(category_id),
+                    })
+                except ValueError as e:
+                    skipped += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({'line': reader.line_num, 'error': str(e)})
+                    continue
+
+                fields['user_id'] = user_id
+                chunk.append(fields)
+                add_rollup_delta(deltas, user_id, fields['date'], fields['category_id'], fields['amount'])
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    imported += len(chunk)
+                    flush_chunk()
+
+            if chunk:
+                imported += len(chunk)
+                flush_chunk()
+            if imported:
+                apply_rollup_deltas(request.dbsession, deltas)
+                bump_data_version(request.dbsession, user_id)
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise HTTPBadRequest(json_body={'error': f'File CSV tidak valid: {e}'})
+    except Exception:
+        log.exception("Error saat import transaksi")
+        raise HTTPBadRequest(json_body={'error': 'Gagal menyimpan transaksi ke database.'})
+
+    result = {'imported': imported, 'skipped': skipped, 'errors': errors}
+    if not imported:
+        raise HTTPBadRequest(json_body=dict(result, error='Tidak ada transaksi valid untuk diimport.'))
+    request.response.status_code = 201
+    return dict(result, message=f'{imported} transaksi berhasil diimport!')
@@ -1,21 +1,82 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import (
     HTTPBadRequest,
-    HTTPCreated,
-    HTTPOk,
     HTTPForbidden,
     HTTPNotFound,
     HTTPNoContent
 )
+from pyramid.response import Response
+from sqlalchemy import and_, insert, or_, select
+from zope.sqlalchemy import mark_changed
 import transaction
 import datetime
+import logging
+import base64
+import json
+import csv
+import io
 
 from ..models import Transaction, Category, User 
+from ..models.rollup import (
+    add_rollup_delta,
+    apply_rollup_deltas,
+    apply_transaction_change,
+    rollup_snapshot,
+    to_cents,
+)
+from ..models.search import apply_search, search_terms
+from ..models.versioning import bump_data_version
+from ..renderers import dumps
+
+log = logging.getLogger(__name__)
 
 # Permission string yang sudah definisikan
 VIEW_PERMISSION = 'view_self'
 EDIT_PERMISSION = 'edit_self'
 
+# Batas ukuran halaman untuk mode pagination (keyset) pada daftar transaksi
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Batas jumlah item untuk POST /api/transactions/batch
+MAX_BATCH_SIZE = 500
+
+# Jumlah baris per batch yang diambil dari server-side cursor saat export
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = [
+    'id', 'date', 'description', 'amount', 'category_id',
+    'category_name', 'created_at', 'updated_at',
+]
+
+# Kolom yang dikirim untuk satu transaksi (daftar dan detail). Diambil sebagai
+# row ringan, bukan instance Transaction, karena jalur baca tidak butuh ORM.
+TRANSACTION_COLUMNS = (
+    Transaction.id,
+    Transaction.description,
+    Transaction.amount,
+    Transaction.date,
+    Transaction.category_id,
+    Transaction.user_id,
+    Transaction.created_at,
+    Transaction.updated_at,
+)
+
+def transaction_row_to_dict(row):
+    """
+    Serializer bersama row transaksi (TRANSACTION_COLUMNS + category_name) ke dict respons.
+    """
+    return {
+        'id': row.id,
+        'description': row.description,
+        'amount': row.amount, # Decimal/date di-encode oleh renderer JSON
+        'date': row.date,
+        'category_id': row.category_id,
+        'category_name': row.category_name or "N/A",
+        'user_id': row.user_id,
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+    }
+
 # Helper untuk validasi tanggal
 def validate_date_format(date_string):
     try:
@@ -24,24 +85,54 @@ def validate_date_format(date_string):
     except ValueError:
         return False
 
-@view_config(
-    route_name='api_transactions_collection',
-    request_method='POST',
-    renderer='json',
-    permission=EDIT_PERMISSION
-)
-def create_transaction_view(request):
-    user_id = request.authenticated_userid
-    if not user_id:
-        # Seharusnya sudah ditangani permission, tapi sebagai fallback
-        raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
-
+def encode_cursor(t):
+    """
+    Membuat cursor opaque dari posisi (date, created_at, id) sebuah transaksi
+    (instance Transaction atau row dengan kolom yang sama).
+    """
+    position = [
+        t.date.isoformat(),
+        t.created_at.isoformat(),
+        t.id,
+    ]
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Kebalikan dari encode_cursor. Mengembalikan tuple (date, created_at, id),
+    atau raise ValueError jika cursor rusak.
+    """
     try:
-        json_body = request.json_body
-        print(f"--- Backend: Menerima JSON body (create_transaction_view) ---: {json_body}")
-    except ValueError:
-        print("--- Backend: Gagal parsing JSON body (create_transaction_view) ---")
-        raise HTTPBadRequest(json_body={'error': 'Permintaan JSON tidak valid.'})
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_str, created_at_str, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        date_obj = datetime.date.fromisoformat(date_str)
+        created_at = datetime.datetime.fromisoformat(created_at_str)
+        return date_obj, created_at, int(transaction_id)
+    except (TypeError, ValueError):
+        raise ValueError('Cursor tidak valid.')
+
+def parse_amount(amount_str):
+    """
+    Mengubah string jumlah menjadi Decimal dua desimal (lihat ``to_cents``).
+    Nilai yang sama dipakai untuk baris transaksi dan delta rollup.
+    Raise ValueError jika bukan angka positif.
+    """
+    try:
+        amount = to_cents(amount_str)
+        if amount <= 0:
+            raise ValueError("Jumlah harus positif.")
+    except (ArithmeticError, ValueError): # InvalidOperation untuk teks, NaN, atau Infinity
+        raise ValueError('Jumlah harus berupa angka positif.')
+    return amount
+
+def parse_new_transaction(json_body):
+    """
+    Validasi payload transaksi baru (dipakai oleh create tunggal dan batch).
+    Mengembalikan dict kolom Transaction, atau raise ValueError berisi pesan error.
+    """
+    if not isinstance(json_body, dict):
+        raise ValueError('Permintaan JSON tidak valid.')
 
     description = json_body.get('description')
     amount_str = json_body.get('amount') # Frontend mengirim ini sebagai string
@@ -60,63 +151,250 @@ def create_transaction_view(request):
         missing_fields.append("ID kategori")
 
     if missing_fields:
-        error_message = f"{', '.join(missing_fields).capitalize()} wajib diisi dan valid."
-        print(f"--- Backend: Validasi GAGAL (create) --- Pesan: {error_message}")
-        raise HTTPBadRequest(json_body={'error': error_message})
+        raise ValueError(f"{', '.join(missing_fields).capitalize()} wajib diisi dan valid.")
 
-    try:
-        amount = float(amount_str)
-        if amount <= 0:
-            raise ValueError("Jumlah harus positif.")
-    except ValueError:
-        raise HTTPBadRequest(json_body={'error': 'Jumlah harus berupa angka positif.'})
+    amount = parse_amount(amount_str)
 
     if not validate_date_format(date_str):
-        raise HTTPBadRequest(json_body={'error': 'Format tanggal tidak valid (YYYY-MM-DD).'})
+        raise ValueError('Format tanggal tidak valid (YYYY-MM-DD).')
     date_obj = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
 
     try:
         category_id_int = int(category_id_str) # Konversi ID kategori ke integer
     except ValueError:
-        raise HTTPBadRequest(json_body={'error': 'ID Kategori tidak valid (bukan angka).'})
+        raise ValueError('ID Kategori tidak valid (bukan angka).')
+
+    return {
+        'description': description.strip(), # Trim spasi
+        'amount': amount,
+        'date': date_obj,
+        'category_id': category_id_int,
+    }
+
+def insert_transaction_rows(dbsession, rows, returning_ids=False):
+    """
+    Insert banyak baris transaksi sekaligus lewat Core (executemany / INSERT
+    multi-baris) tanpa membuat objek ORM Transaction. Jika ``returning_ids``,
+    mengembalikan daftar ID sesuai urutan ``rows``.
+    """
+    table = Transaction.__table__
+    if returning_ids:
+        statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        new_ids = dbsession.execute(statement, rows).scalars().all()
+    else:
+        dbsession.execute(insert(table), rows)
+        new_ids = None
+    # Statement Core tidak ditandai otomatis oleh zope.sqlalchemy
+    mark_changed(dbsession)
+    return new_ids
+
+def transaction_filters(request, user_id):
+    """
+    Menerjemahkan filter query string (from_date, to_date, category_id) menjadi
+    daftar kriteria SQLAlchemy. Dipakai bersama oleh daftar transaksi dan export.
+    """
+    from_date_str = request.params.get('from_date')
+    to_date_str = request.params.get('to_date')
+    category_id_filter = request.params.get('category_id')
+
+    criteria = [Transaction.user_id == user_id]
+    if from_date_str:
+        if not validate_date_format(from_date_str):
+            raise HTTPBadRequest(json_body={'error': 'Format from_date tidak valid (YYYY-MM-DD).'})
+        criteria.append(Transaction.date >= datetime.datetime.strptime(from_date_str, '%Y-%m-%d').date())
+    if to_date_str:
+        if not validate_date_format(to_date_str):
+            raise HTTPBadRequest(json_body={'error': 'Format to_date tidak valid (YYYY-MM-DD).'})
+        criteria.append(Transaction.date <= datetime.datetime.strptime(to_date_str, '%Y-%m-%d').date())
+    if category_id_filter:
+        try:
+            cat_id = int(category_id_filter)
+        except ValueError:
+            raise HTTPBadRequest(json_body={'error': 'Format category_id tidak valid.'})
+        category = request.dbsession.query(Category).filter_by(id=cat_id, user_id=user_id).first()
+        if category:
+            criteria.append(Transaction.category_id == cat_id)
+    return criteria
+
+def parse_search(request):
+    """
+    Kata kunci pencarian dari parameter ``q`` (lihat models/search.py), atau
+    None jika tidak ada pencarian.
+    """
+    q = request.params.get('q')
+    if q is None:
+        return None
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPBadRequest(json_body={'error': 'Kata kunci pencarian (q) tidak valid.'})
+    return terms
+
+def keyset_after(date_obj, created_at, transaction_id):
+    """
+    Predikat seek untuk urutan (date desc, created_at desc, id desc):
+    hanya baris yang posisinya setelah cursor. Tidak memakai OFFSET sehingga
+    biaya halaman ke-N sama dengan halaman pertama. Kolom created_at NOT NULL,
+    jadi perbandingannya berlaku untuk setiap baris.
+    """
+    return or_(
+        Transaction.date < date_obj,
+        and_(Transaction.date == date_obj, Transaction.created_at < created_at),
+        and_(
+            Transaction.date == date_obj,
+            Transaction.created_at == created_at,
+            Transaction.id < transaction_id,
+        ),
+    )
+
+@view_config(
+    route_name='api_transactions_collection',
+    request_method='POST',
+    renderer='json',
+    permission=EDIT_PERMISSION
+)
+def create_transaction_view(request):
+    user_id = request.authenticated_userid
+    if not user_id:
+        # Seharusnya sudah ditangani permission, tapi sebagai fallback
+        raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
+
+    try:
+        json_body = request.json_body
+        log.debug("Menerima JSON body transaksi baru: %s", json_body)
+    except ValueError:
+        log.debug("Gagal parsing JSON body transaksi baru")
+        raise HTTPBadRequest(json_body={'error': 'Permintaan JSON tidak valid.'})
+
+    try:
+        fields = parse_new_transaction(json_body)
+    except ValueError as e:
+        log.debug("Validasi transaksi baru gagal: %s", e)
+        raise HTTPBadRequest(json_body={'error': str(e)})
+    category_id_int = fields['category_id']
 
     category = request.dbsession.query(Category).filter_by(id=category_id_int, user_id=user_id).first()
     if not category:
         raise HTTPBadRequest(json_body={'error': 'Kategori tidak valid atau bukan milik Anda.'})
 
-    new_transaction = Transaction(
-        description=description.strip(), # Trim spasi
-        amount=amount,
-        date=date_obj,
-        user_id=user_id,
-        category_id=category_id_int
-    )
+    new_transaction = Transaction(user_id=user_id, **fields)
     
     try:
         with transaction.manager:
             request.dbsession.add(new_transaction)
             request.dbsession.flush()
+            apply_transaction_change(request.dbsession, after=rollup_snapshot(new_transaction))
+            bump_data_version(request.dbsession, user_id)
 
         transaction_data = {
             'id': new_transaction.id,
             'description': new_transaction.description,
-            'amount': float(new_transaction.amount),
-            'date': new_transaction.date.isoformat(),
+            'amount': new_transaction.amount,
+            'date': new_transaction.date,
             'category_id': new_transaction.category_id,
             'user_id': new_transaction.user_id,
             'category_name': category.name,
-            'created_at': new_transaction.created_at.isoformat() if new_transaction.created_at else None,
-            'updated_at': new_transaction.updated_at.isoformat() if new_transaction.updated_at else None,
+            'created_at': new_transaction.created_at,
+            'updated_at': new_transaction.updated_at,
         }
-        return HTTPCreated(json_body={
+        request.response.status_code = 201
+        return {
             'message': 'Transaksi berhasil ditambahkan!',
             'transaction': transaction_data
-        })
-    except Exception as e:
-        print(f"Error saat menyimpan transaksi: {e}")
-        # Sebaiknya log error ini dengan lebih detail
+        }
+    except Exception:
+        log.exception("Error saat menyimpan transaksi")
+        raise HTTPBadRequest(json_body={'error': 'Gagal menyimpan transaksi ke database.'})
+
+
+@view_config(
+    route_name='api_transactions_batch',
+    request_method='POST',
+    renderer='json',
+    permission=EDIT_PERMISSION
+)
+def create_transactions_batch_view(request):
+    """
+    Menambahkan banyak transaksi sekaligus (misalnya sinkronisasi entri offline).
+    Body berupa array transaksi (atau {"transactions": [...]}) dengan validasi yang
+    sama seperti create tunggal. Semua item disimpan dalam satu transaksi database
+    dengan satu INSERT multi-baris; jika ada item yang tidak valid, tidak ada yang
+    disimpan dan error dilaporkan per item (berdasarkan index).
+    """
+    user_id = request.authenticated_userid
+    if not user_id:
+        raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
+
+    try:
+        json_body = request.json_body
+    except ValueError:
+        raise HTTPBadRequest(json_body={'error': 'Permintaan JSON tidak valid.'})
+
+    items = json_body.get('transactions') if isinstance(json_body, dict) else json_body
+    if not isinstance(items, list) or not items:
+        raise HTTPBadRequest(json_body={'error': 'Daftar transaksi wajib diisi.'})
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPBadRequest(json_body={'error': f'Maksimal {MAX_BATCH_SIZE} transaksi per batch.'})
+
+    errors = []
+    parsed = []
+    for index, item in enumerate(items):
+        try:
+            parsed.append((index, parse_new_transaction(item)))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    # Kepemilikan kategori diperiksa sekali untuk semua category_id yang berbeda
+    category_ids = {fields['category_id'] for _, fields in parsed}
+    category_names = dict(
+        request.dbsession.query(Category.id, Category.name)
+        .filter(Category.user_id == user_id, Category.id.in_(category_ids))
+        .all()
+    ) if category_ids else {}
+    for index, fields in parsed:
+        if fields['category_id'] not in category_names:
+            errors.append({'index': index, 'error': 'Kategori tidak valid atau bukan milik Anda.'})
+
+    if errors:
+        errors.sort(key=lambda e: e['index'])
+        raise HTTPBadRequest(json_body={'error': 'Sebagian transaksi tidak valid.', 'errors': errors})
+
+    now = datetime.datetime.utcnow()
+    rows = [
+        dict(fields, user_id=user_id, created_at=now, updated_at=now)
+        for _, fields in parsed
+    ]
+
+    try:
+        with transaction.manager:
+            new_ids = insert_transaction_rows(request.dbsession, rows, returning_ids=True)
+            deltas = {}
+            for row in rows:
+                add_rollup_delta(deltas, user_id, row['date'], row['category_id'], row['amount'])
+            apply_rollup_deltas(request.dbsession, deltas)
+            bump_data_version(request.dbsession, user_id)
+    except Exception:
+        log.exception("Error saat menyimpan batch transaksi")
         raise HTTPBadRequest(json_body={'error': 'Gagal menyimpan transaksi ke database.'})
 
+    transactions_data = [
+        {
+            'id': new_id,
+            'description': row['description'],
+            'amount': row['amount'],
+            'date': row['date'],
+            'category_id': row['category_id'],
+            'user_id': user_id,
+            'category_name': category_names[row['category_id']],
+            'created_at': now,
+            'updated_at': now,
+        } for new_id, row in zip(new_ids, rows)
+    ]
+    request.response.status_code = 201
+    return {
+        'message': f'{len(transactions_data)} transaksi berhasil ditambahkan!',
+        'transactions': transactions_data
+    }
+
 
 @view_config(
     route_name='api_transactions_collection',
@@ -129,54 +407,168 @@ def get_transactions_view(request):
     if not user_id:
         raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
 
-    from_date_str = request.params.get('from_date')
-    to_date_str = request.params.get('to_date')
-    category_id_filter = request.params.get('category_id')
+    limit_str = request.params.get('limit')
+    cursor = request.params.get('cursor')
+
+    # Mode pagination bersifat opt-in: aktif jika 'limit' atau 'cursor' dikirim
+    paginate = bool(limit_str or cursor)
+    limit = DEFAULT_PAGE_SIZE
+    if limit_str:
+        try:
+            limit = int(limit_str)
+        except ValueError:
+            raise HTTPBadRequest(json_body={'error': 'Format limit tidak valid.'})
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise HTTPBadRequest(json_body={'error': f'Limit harus di antara 1 dan {MAX_PAGE_SIZE}.'})
     
     try:
-        query = request.dbsession.query(Transaction).filter_by(user_id=user_id)
-        if from_date_str:
-            if not validate_date_format(from_date_str):
-                raise HTTPBadRequest(json_body={'error': 'Format from_date tidak valid (YYYY-MM-DD).'})
-            query = query.filter(Transaction.date >= datetime.datetime.strptime(from_date_str, '%Y-%m-%d').date())
-        if to_date_str:
-            if not validate_date_format(to_date_str):
-                raise HTTPBadRequest(json_body={'error': 'Format to_date tidak valid (YYYY-MM-DD).'})
-            query = query.filter(Transaction.date <= datetime.datetime.strptime(to_date_str, '%Y-%m-%d').date())
-        if category_id_filter:
+        criteria = transaction_filters(request, user_id)
+        terms = parse_search(request)
+        if terms and cursor:
+            # Hasil pencarian diurutkan berdasarkan relevansi, bukan posisi keyset
+            raise HTTPBadRequest(json_body={'error': 'Parameter cursor tidak bisa digabung dengan q.'})
+
+        # Nama kategori diambil dalam statement yang sama (outer join) agar tidak
+        # ada query tambahan per baris transaksi
+        query = (
+            request.dbsession.query(*TRANSACTION_COLUMNS, Category.name.label("category_name"))
+            .outerjoin(Category, and_(Category.id == Transaction.category_id, Category.user_id == user_id))
+            .filter(*criteria)
+        )
+
+        if cursor:
             try:
-                cat_id = int(category_id_filter)
-                category = request.dbsession.query(Category).filter_by(id=cat_id, user_id=user_id).first()
-                if category: query = query.filter(Transaction.category_id == cat_id)
-            except ValueError:
-                raise HTTPBadRequest(json_body={'error': 'Format category_id tidak valid.'})
-
-        transactions_result = query.order_by(Transaction.date.desc(), Transaction.created_at.desc()).all()
-        transactions_data = []
-        for t in transactions_result:
-            # Ambil nama kategori. Lebih efisien jika di-join, tapi ini juga bisa
-            category = request.dbsession.query(Category).filter_by(id=t.category_id, user_id=user_id).first()
-            category_name = category.name if category else "N/A"
-            
-            transactions_data.append({
-                'id': t.id, 
-                'description': t.description, 
-                'amount': float(t.amount), # Pastikan amount adalah float untuk JSON
-                'date': t.date.isoformat(), 
-                'category_id': t.category_id,
-                'category_name': category_name, 
-                'user_id': t.user_id,
-                'created_at': t.created_at.isoformat() if t.created_at else None,
-                'updated_at': t.updated_at.isoformat() if t.updated_at else None,
-            })
-        return HTTPOk(json_body={'transactions': transactions_data})
+                query = query.filter(keyset_after(*decode_cursor(cursor)))
+            except ValueError as e:
+                raise HTTPBadRequest(json_body={'error': str(e)})
+
+        order = [Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc()]
+        if terms:
+            query, rank = apply_search(query, request.dbsession.get_bind().dialect.name, terms)
+            if rank is not None:
+                order.insert(0, rank)
+        query = query.order_by(*order)
+        next_cursor = None
+        if terms and paginate:
+            # Pencarian: 'limit' membatasi jumlah hasil teratas, tanpa halaman berikutnya
+            transactions_result = query.limit(limit).all()
+        elif paginate:
+            # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+            transactions_result = query.limit(limit + 1).all()
+            if len(transactions_result) > limit:
+                transactions_result = transactions_result[:limit]
+                next_cursor = encode_cursor(transactions_result[-1])
+        else:
+            transactions_result = query.all()
+        transactions_data = [transaction_row_to_dict(row) for row in transactions_result]
+        if paginate:
+            return {'transactions': transactions_data, 'next_cursor': next_cursor}
+        return {'transactions': transactions_data}
     except HTTPBadRequest: raise
-    except Exception as e:
-        print(f"Error saat mengambil transaksi: {e}")
+    except Exception:
+        log.exception("Error saat mengambil transaksi")
         request.response.status_code = 500
         return {'error': 'Gagal mengambil data transaksi dari server.'}
 
 
+def iter_export_batches(engine, statement):
+    """
+    Menjalankan statement pada koneksi tersendiri dengan server-side cursor
+    (yield_per) dan menghasilkan baris per batch. Koneksi dibuka saat iterasi
+    pertama dan ditutup ketika generator selesai atau ditutup oleh server WSGI.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=EXPORT_BATCH_SIZE
+        ).execute(statement)
+        for batch in result.partitions():
+            yield batch
+
+def export_row_values(row):
+    values = dict(row._mapping)
+    values['category_name'] = values['category_name'] or "N/A"
+    return values
+
+def iter_ndjson(batches):
+    # Decimal/date/datetime di-encode langsung oleh encoder renderer JSON
+    for batch in batches:
+        yield b''.join(dumps(export_row_values(row)) + b'\n' for row in batch)
+
+def csv_row_values(row):
+    values = export_row_values(row)
+    values['date'] = row.date.isoformat()
+    values['created_at'] = row.created_at.isoformat() if row.created_at else None
+    values['updated_at'] = row.updated_at.isoformat() if row.updated_at else None
+    return values
+
+def iter_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue().encode('utf-8')
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(csv_row_values(row) for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', iter_ndjson),
+    'csv': ('text/csv', iter_csv),
+}
+
+@view_config(
+    route_name='api_transactions_export',
+    request_method='GET',
+    permission=VIEW_PERMISSION
+)
+def export_transactions_view(request):
+    """
+    Export transaksi pengguna sebagai NDJSON atau CSV. Mendukung filter yang sama
+    dengan daftar transaksi. Baris di-stream per batch lewat app_iter sehingga
+    memori worker tidak bergantung pada panjang riwayat transaksi.
+    """
+    user_id = request.authenticated_userid
+    if not user_id:
+        raise HTTPForbidden(json_body={'error': 'Autentikasi diperlukan.'})
+
+    export_format = request.params.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPBadRequest(json_body={'error': 'Format export tidak valid (ndjson atau csv).'})
+    content_type, serializer = EXPORT_FORMATS[export_format]
+
+    # Validasi filter dilakukan sebelum streaming dimulai agar error tetap 400
+    criteria = transaction_filters(request, user_id)
+    terms = parse_search(request)
+    statement = (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Transaction.description,
+            Transaction.amount,
+            Transaction.category_id,
+            Category.name.label('category_name'),
+            Transaction.created_at,
+            Transaction.updated_at,
+        )
+        .outerjoin(Category, and_(Category.id == Transaction.category_id, Category.user_id == user_id))
+        .where(*criteria)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+    )
+
+    engine = request.dbsession.get_bind()
+    if terms:
+        # Export hasil pencarian tetap berurutan tanggal, tanpa ranking
+        statement, _ = apply_search(statement, engine.dialect.name, terms)
+    response = Response(
+        content_type=content_type,
+        charset='utf-8',
+        app_iter=serializer(iter_export_batches(engine, statement)),
+    )
+    response.content_disposition = f'attachment; filename="transactions.{export_format}"'
+    return response
+
+
 @view_config(
     route_name='api_transaction_item',
     request_method='GET',
@@ -198,7 +590,7 @@ def get_transaction_detail_view(request):
 
     try:
         transaction_result = (
-            request.dbsession.query(Transaction, Category.name.label("category_name"))
+            request.dbsession.query(*TRANSACTION_COLUMNS, Category.name.label("category_name"))
             .join(Category, Transaction.category_id == Category.id)
             .filter(Transaction.id == transaction_id, Transaction.user_id == user_id)
             .first()
@@ -206,18 +598,10 @@ def get_transaction_detail_view(request):
         if not transaction_result:
             raise HTTPNotFound(json_body={'error': 'Transaksi tidak ditemukan atau Anda tidak memiliki akses.'})
 
-        t, category_name = transaction_result
-        transaction_data = {
-            'id': t.id, 'description': t.description, 'amount': float(t.amount),
-            'date': t.date.isoformat(), 'category_id': t.category_id,
-            'category_name': category_name, 'user_id': t.user_id,
-            'created_at': t.created_at.isoformat() if t.created_at else None,
-            'updated_at': t.updated_at.isoformat() if t.updated_at else None,
-        }
-        return HTTPOk(json_body={'transaction': transaction_data})
+        return {'transaction': transaction_row_to_dict(transaction_result)}
     except HTTPNotFound: raise 
-    except Exception as e:
-        print(f"Error saat mengambil detail transaksi: {e}")
+    except Exception:
+        log.exception("Error saat mengambil detail transaksi")
         request.response.status_code = 500
         return {'error': 'Gagal mengambil detail transaksi dari server.'}
 
@@ -255,6 +639,7 @@ def update_transaction_view(request):
             transaction_to_update = request.dbsession.query(Transaction).filter_by(id=transaction_id, user_id=user_id).first()
             if not transaction_to_update:
                 raise HTTPNotFound(json_body={'error': 'Transaksi tidak ditemukan atau Anda tidak memiliki akses.'})
+            rollup_before = rollup_snapshot(transaction_to_update) # Bulan/kategori lama untuk rollup
 
             if description is not None:
                 if not isinstance(description, str) or not description.strip():
@@ -263,9 +648,7 @@ def update_transaction_view(request):
             
             if amount_str is not None:
                 try:
-                    amount = float(amount_str)
-                    if amount <= 0: raise ValueError("Jumlah harus positif.")
-                    transaction_to_update.amount = amount
+                    transaction_to_update.amount = parse_amount(amount_str)
                 except ValueError:
                     raise HTTPBadRequest(json_body={'error': 'Jumlah harus berupa angka positif jika diupdate.'})
 
@@ -287,18 +670,20 @@ def update_transaction_view(request):
                     raise HTTPBadRequest(json_body={'error': 'ID Kategori tidak valid jika diupdate.'})
             
             request.dbsession.flush()
+            apply_transaction_change(request.dbsession, before=rollup_before, after=rollup_snapshot(transaction_to_update))
+            bump_data_version(request.dbsession, user_id)
 
             updated_transaction_data = {
                 'id': transaction_to_update.id, 'description': transaction_to_update.description,
-                'amount': float(transaction_to_update.amount), 'date': transaction_to_update.date.isoformat(),
+                'amount': transaction_to_update.amount, 'date': transaction_to_update.date,
                 'category_id': transaction_to_update.category_id, 'category_name': category_name_for_response,
                 'user_id': transaction_to_update.user_id,
-                'updated_at': transaction_to_update.updated_at.isoformat() if transaction_to_update.updated_at else None,
+                'updated_at': transaction_to_update.updated_at,
             }
-        return HTTPOk(json_body={'message': 'Transaksi berhasil diperbarui!', 'transaction': updated_transaction_data})
+        return {'message': 'Transaksi berhasil diperbarui!', 'transaction': updated_transaction_data}
     except (HTTPNotFound, HTTPBadRequest): raise
-    except Exception as e:
-        print(f"Error saat memperbarui transaksi: {e}")
+    except Exception:
+        log.exception("Error saat memperbarui transaksi")
         raise HTTPBadRequest(json_body={'error': 'Gagal memperbarui transaksi di database.'})
 
 
@@ -324,9 +709,11 @@ def delete_transaction_view(request):
             if not transaction_to_delete:
                 raise HTTPNotFound(json_body={'error': 'Transaksi tidak ditemukan atau Anda tidak memiliki akses.'}) 
             request.dbsession.delete(transaction_to_delete)
+            apply_transaction_change(request.dbsession, before=rollup_snapshot(transaction_to_delete))
+            bump_data_version(request.dbsession, user_id)
         return HTTPNoContent() 
     except HTTPNotFound: raise
     except HTTPBadRequest: raise # Jika ada dari validasi ID
-    except Exception as e:
-        print(f"Error saat menghapus transaksi (ID: {transaction_id}): {e}")
+    except Exception:
+        log.exception("Error saat menghapus transaksi (ID: %s)", transaction_id)
         raise HTTPBadRequest(json_body={'error': 'Gagal menghapus transaksi. Terjadi masalah internal.'})
\ No newline at end of file
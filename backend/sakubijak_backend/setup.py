@@ -22,12 +22,35 @@ requires = [
     'waitress',
 ]
 
+# Encoder JSON cepat untuk renderer 'json'; tanpa ini dipakai modul json standar
+fast_json_require = [
+    'orjson',
+]
+
 tests_require = [
     'WebTest >= 1.3.1',  # py3 compat
     'pytest>=3.7.4',
     'pytest-cov',
 ]
 
+# Pengisian bucket kosong /api/analytics/timeseries secara vektor; tanpa ini dipakai loop Python
+analytics_require = [
+    'numpy',
+]
+
+# Entry point ASGI (sakubijak_backend.asgi): engine asyncio dan server ASGI
+asgi_require = [
+    'SQLAlchemy[asyncio]',
+    'asyncpg',
+    'aiosqlite',
+    'uvicorn',
+]
+
+# Benchmark per endpoint (lihat benchmarks/pytest.ini)
+benchmark_require = tests_require + [
+    'pytest-benchmark',
+]
+
 setup(
     name='sakubijak_backend',
     version='0.0',
@@ -48,6 +71,10 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'fast_json': fast_json_require,
+        'analytics': analytics_require,
+        'asgi': asgi_require,
+        'benchmark': benchmark_require,
     },
     install_requires=requires,
     entry_points={
@@ -56,6 +83,8 @@ setup(
         ],
         'console_scripts': [
             'initialize_sakubijak_backend_db = sakubijak_backend.scripts.initialize_db:main',
+            'rebuild_sakubijak_backend_rollups = sakubijak_backend.scripts.rebuild_rollups:main',
+            'seed_sakubijak_backend_db = sakubijak_backend.scripts.seed_db:main',
         ],
     },
 )